@@ -0,0 +1,75 @@
+"""add keyset indexes for archive listing
+
+Revision ID: 11606efb2e9a
+Revises: 481d6da29d55
+Create Date: 2026-10-18 14:05:31.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '11606efb2e9a'
+down_revision: Union[str, Sequence[str], None] = '481d6da29d55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text('deleted_at IS NULL')
+KEYSET = [sa.text('created_at DESC'), sa.text('id DESC')]
+
+# (name, table, columns, unique, where)
+INDEXES = [
+    # get_course_archives: course_id = ? ORDER BY created_at DESC, id DESC,
+    # resuming after a (created_at, id) cursor
+    (
+        'ix_archives_course_id_created_at_id_active', 'archives',
+        ['course_id', *KEYSET], False, ACTIVE,
+    ),
+    # ... with professor = ?, the most selective of the listing filters
+    (
+        'ix_archives_course_id_professor_created_at_id_active', 'archives',
+        ['course_id', 'professor', *KEYSET], False, ACTIVE,
+    ),
+]
+
+# Superseded by the keyset index above, which covers the same queries.
+REPLACED = (
+    'ix_archives_course_id_created_at_active', 'archives',
+    ['course_id', sa.text('created_at DESC')], False, ACTIVE,
+)
+
+
+def _create(name, table, columns, unique, where) -> None:
+    # A failed concurrent build leaves an INVALID index behind; drop it first.
+    op.drop_index(
+        name, table_name=table, if_exists=True, postgresql_concurrently=True,
+    )
+    op.create_index(
+        name, table, columns, unique=unique,
+        postgresql_where=where, postgresql_concurrently=True,
+    )
+
+
+def _drop(name, table, _columns, _unique, _where) -> None:
+    op.drop_index(
+        name, table_name=table, if_exists=True, postgresql_concurrently=True,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for index in INDEXES:
+            _create(*index)
+        _drop(*REPLACED)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        _create(*REPLACED)
+        for index in reversed(INDEXES):
+            _drop(*index)
@@ -0,0 +1,88 @@
+"""add partial indexes for active rows
+
+Revision ID: 481d6da29d55
+Revises: 01075665e961
+Create Date: 2026-10-18 09:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '481d6da29d55'
+down_revision: Union[str, Sequence[str], None] = '01075665e961'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text('deleted_at IS NULL')
+
+# (name, table, columns, unique, where)
+INDEXES = [
+    # get_course_archives: course_id = ? ORDER BY created_at DESC
+    (
+        'ix_archives_course_id_created_at_active', 'archives',
+        ['course_id', sa.text('created_at DESC')], False, ACTIVE,
+    ),
+    # _fetch_archive_discussion_messages: archive_id = ? ORDER BY id DESC
+    (
+        'ix_archive_discussion_messages_archive_id_id_active',
+        'archive_discussion_messages',
+        ['archive_id', sa.text('id DESC')], False, ACTIVE,
+    ),
+    # Course lookups/upserts by (name, category) among live courses
+    (
+        'uq_courses_name_category_active', 'courses',
+        ['name', 'category'], True, ACTIVE,
+    ),
+    # OAuth callback looks users up by provider identity
+    (
+        'ix_users_oauth_provider_oauth_sub', 'users',
+        ['oauth_provider', 'oauth_sub'], False, None,
+    ),
+]
+
+
+def _check_duplicate_courses() -> None:
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT name, category, count(*) FROM courses "
+        "WHERE deleted_at IS NULL GROUP BY name, category HAVING count(*) > 1"
+    )).all()
+    if duplicates:
+        listed = ', '.join(
+            f'{name} ({category}) x{count}' for name, category, count in duplicates
+        )
+        raise RuntimeError(
+            'Cannot create uq_courses_name_category_active; merge or soft-delete '
+            f'duplicate active courses first: {listed}'
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _check_duplicate_courses()
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction. A failed
+    # concurrent build leaves an INVALID index behind, so drop any leftover
+    # before building it again.
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique, where in INDEXES:
+            op.drop_index(
+                name, table_name=table, if_exists=True,
+                postgresql_concurrently=True,
+            )
+            op.create_index(
+                name, table, columns, unique=unique,
+                postgresql_where=where, postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _unique, _where in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, if_exists=True,
+                postgresql_concurrently=True,
+            )
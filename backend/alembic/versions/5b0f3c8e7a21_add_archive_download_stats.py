@@ -0,0 +1,55 @@
+"""add archive download stats
+
+Revision ID: 5b0f3c8e7a21
+Revises: ec382cdb8983
+Create Date: 2026-10-18 19:12:03.845127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0f3c8e7a21'
+down_revision: Union[str, Sequence[str], None] = 'ec382cdb8983'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Monthly partitions are created ahead of time by the rollup job; the
+    # default partition catches anything outside them.
+    op.create_table('archive_download_events',
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('archive_id', sa.Integer(), nullable=False),
+    sa.Column('downloads', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket', 'archive_id'),
+    postgresql_partition_by='RANGE (bucket)'
+    )
+    op.execute(
+        'CREATE TABLE archive_download_events_default '
+        'PARTITION OF archive_download_events DEFAULT'
+    )
+    op.create_table('archive_downloads_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('archive_id', sa.Integer(), nullable=False),
+    sa.Column('downloads', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'archive_id')
+    )
+    op.create_table('archive_downloads_weekly',
+    sa.Column('week', sa.Date(), nullable=False),
+    sa.Column('archive_id', sa.Integer(), nullable=False),
+    sa.Column('downloads', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('week', 'archive_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('archive_downloads_weekly')
+    op.drop_table('archive_downloads_daily')
+    # Dropping the parent drops every partition with it.
+    op.drop_table('archive_download_events')
@@ -0,0 +1,60 @@
+"""add trigram search indexes
+
+Revision ID: d84a9dfc4df8
+Revises: 11606efb2e9a
+Create Date: 2026-10-18 16:22:09.517340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd84a9dfc4df8'
+down_revision: Union[str, Sequence[str], None] = '11606efb2e9a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match SEARCH_KEY_SQL in app/models/models.py.
+SEARCH_KEY = 'lower(normalize({column}, NFKC))'
+
+# (name, table, column) searched by /search
+INDEXES = [
+    ('ix_courses_name_trgm', 'courses', 'name'),
+    ('ix_archives_name_trgm', 'archives', 'name'),
+    ('ix_archives_professor_trgm', 'archives', 'professor'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction. A failed
+    # concurrent build leaves an INVALID index behind, so drop any leftover
+    # before building it again.
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.drop_index(
+                name, table_name=table, if_exists=True,
+                postgresql_concurrently=True,
+            )
+            op.create_index(
+                name, table,
+                [sa.text(f'{SEARCH_KEY.format(column=column)} gin_trgm_ops')],
+                postgresql_using='gin',
+                postgresql_where=sa.text('deleted_at IS NULL'),
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _column in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, if_exists=True,
+                postgresql_concurrently=True,
+            )
+    # pg_trgm is left installed; other objects may depend on it.
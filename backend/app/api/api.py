@@ -6,7 +6,9 @@ from app.api.services import (
     auth,
     courses,
     meme,
+    metrics,
     notifications,
+    search,
     statistics,
     users,
 )
@@ -20,6 +22,8 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(meme.router, tags=["meme"])
 api_router.include_router(statistics.router, tags=["statistics"])
 api_router.include_router(ai_exam.router, prefix="/ai-exam", tags=["ai-exam"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
 api_router.include_router(
     notifications.router, prefix="/notifications", tags=["notifications"]
 )
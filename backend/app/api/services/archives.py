@@ -1,19 +1,50 @@
 import io
 import os
 import uuid
+from typing import List
 
 from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile, status
+from sqlalchemy.dialects.postgresql import insert
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
 from app.db.session import get_session
-from app.models.models import Archive, Course, CourseCategory, User
-from app.utils.auth import get_current_user
-from app.utils.storage import get_minio_client
+from app.db.writes import insert_returning
+from app.models.models import (
+    Archive,
+    ArchiveUrlBatchRequest,
+    ArchiveUrlBatchResponse,
+    ArchiveUrlPurpose,
+    Course,
+    CourseCategory,
+    TrendingArchive,
+    User,
+)
+from app.utils.auth import get_current_user, get_request_user
+from app.utils.catalog import (
+    bump_course_archives_version,
+    bump_course_catalog_version,
+)
+from app.utils.downloads import record_downloads
+from app.utils.storage import (
+    DOWNLOAD_URL_EXPIRES,
+    PREVIEW_URL_EXPIRES,
+    get_minio_client,
+    presigned_get_urls,
+)
+from app.utils.trending import (
+    DOWNLOAD_WEIGHT,
+    PREVIEW_WEIGHT,
+    get_trending_archives,
+    record_archive_hits,
+)
 
 router = APIRouter()
 
+ARCHIVE_URL_BATCH_MAX = 50
+TRENDING_MAX_LIMIT = 50
+
 
 @router.post("/upload")
 async def upload_archive(
@@ -31,12 +62,7 @@ async def upload_archive(
     """
     Upload a new archive and create course if not exists
     """
-    user_query = select(User).where(
-        User.id == current_user.user_id, User.deleted_at.is_(None)
-    )
-    user_result = await db.execute(user_query)
-    user = user_result.scalar_one_or_none()
-
+    user = await get_request_user(db, current_user.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -49,10 +75,21 @@ async def upload_archive(
     course = result.scalar_one_or_none()
 
     if not course:
-        course = Course(name=subject, category=category)
-        db.add(course)
+        # Concurrent uploads for a new subject race here; the unique partial
+        # index on (name, category) lets the loser reuse the winner's row.
+        created = await db.execute(
+            insert(Course)
+            .values(name=subject, category=category)
+            .on_conflict_do_nothing(
+                index_elements=["name", "category"],
+                index_where=Course.deleted_at.is_(None),
+            )
+        )
         await db.commit()
-        await db.refresh(course)
+        if created.rowcount:
+            await bump_course_catalog_version()
+        result = await db.execute(query)
+        course = result.scalar_one()
 
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(
@@ -85,20 +122,21 @@ async def upload_archive(
             content_type="application/pdf",
         )
 
-        archive = Archive(
-            course_id=course.id,
-            name=filename,
-            professor=professor,
-            archive_type=archive_type,
-            has_answers=has_answers,
-            object_name=object_name,
-            academic_year=academic_year,
-            uploader_id=current_user.user_id,
+        archive = await insert_returning(
+            db,
+            Archive(
+                course_id=course.id,
+                name=filename,
+                professor=professor,
+                archive_type=archive_type,
+                has_answers=has_answers,
+                object_name=object_name,
+                academic_year=academic_year,
+                uploader_id=current_user.user_id,
+            ),
         )
-
-        db.add(archive)
         await db.commit()
-        await db.refresh(archive)
+        await bump_course_archives_version(course.id)
 
         return {
             "success": True,
@@ -121,3 +159,68 @@ async def upload_archive(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload file: {str(e)}",
         )
+
+
+@router.post("/urls", response_model=ArchiveUrlBatchResponse)
+async def get_archive_urls(
+    payload: ArchiveUrlBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Presigned preview or download URLs for up to ARCHIVE_URL_BATCH_MAX
+    archives at once. Downloads count once per archive per batch. IDs that
+    do not name a live archive are listed in ``missing``.
+    """
+    archive_ids = list(dict.fromkeys(payload.archive_ids))
+    if not archive_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="No archive IDs given"
+        )
+    if len(archive_ids) > ARCHIVE_URL_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {ARCHIVE_URL_BATCH_MAX} archives per request",
+        )
+
+    query = (
+        select(
+            Archive.id,
+            Archive.name,
+            Archive.object_name,
+            Archive.course_id,
+            Course.name.label("course_name"),
+            Course.category.label("course_category"),
+        )
+        .join(Course, Course.id == Archive.course_id)
+        .where(Archive.id.in_(archive_ids), Archive.deleted_at.is_(None))
+    )
+    rows = (await db.execute(query)).all()
+    if payload.purpose == ArchiveUrlPurpose.DOWNLOAD:
+        await record_downloads(db, [row.id for row in rows])
+        await record_archive_hits(rows, weight=DOWNLOAD_WEIGHT)
+        expires = DOWNLOAD_URL_EXPIRES
+    else:
+        await record_archive_hits(rows, weight=PREVIEW_WEIGHT)
+        expires = PREVIEW_URL_EXPIRES
+
+    signed = presigned_get_urls([row.object_name for row in rows], expires=expires)
+    urls = {row.id: signed[row.object_name] for row in rows}
+    return ArchiveUrlBatchResponse(
+        urls=urls,
+        missing=[archive_id for archive_id in archive_ids if archive_id not in urls],
+    )
+
+
+@router.get("/trending", response_model=List[TrendingArchive])
+async def get_trending(
+    category: CourseCategory | None = None,
+    limit: int = 20,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Archives downloaded and previewed most lately, overall or within one
+    course category. Served from Redis alone.
+    """
+    safe_limit = max(1, min(int(limit or 20), TRENDING_MAX_LIMIT))
+    return await get_trending_archives(category, limit=safe_limit)
@@ -1,4 +1,6 @@
+import logging
 import secrets
+import time
 from datetime import datetime, timezone
 from urllib.parse import urlencode
 
@@ -10,12 +12,21 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
 from app.db.session import get_session
+from app.db.writes import insert_returning
 from app.models.models import User
 from app.services.auth import oauth_callback
-from app.utils.auth import authenticate_user, blacklist_token, get_current_user
-from app.utils.jwt import jwt
+from app.utils.activity import record_login, record_logout
+from app.utils.auth import (
+    authenticate_user,
+    blacklist_token,
+    create_access_token,
+    get_current_user,
+    invalidate_principal,
+    revoke_user_tokens,
+)
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 @router.post("/login")
@@ -34,22 +45,9 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Update last_login timestamp
-    user.last_login = datetime.now(timezone.utc)
-    await db.commit()
-    await db.refresh(user)
-
-    payload = {
-        "uid": user.id,
-        "email": user.email,
-        "name": user.name,
-        "is_admin": user.is_admin,
-        "exp": int(
-            datetime.now(timezone.utc).timestamp()
-            + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
-        ),
-    }
-    token = jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    await record_login(db, user.id)
+
+    token = await create_access_token(user)
 
     return {"access_token": token, "token_type": "bearer"}
 
@@ -86,6 +84,8 @@ async def auth_callback_endpoint(
     if not info.get("sub") or not info.get("email"):
         raise HTTPException(status_code=400, detail="Invalid OAuth response")
 
+    timings = dict(info.get("timings") or {})
+    db_start = time.perf_counter()
     now = datetime.now(timezone.utc)
 
     result = await db.execute(
@@ -96,40 +96,46 @@ async def auth_callback_endpoint(
     user = result.scalar_one_or_none()
 
     if user is None:
-        user = User(
-            oauth_provider=info["provider"],
-            oauth_sub=info["sub"],
-            email=info["email"],
-            name=info["name"],
-            nickname=info["name"],
-            is_local=False,
-            last_login=now,
+        user = await insert_returning(
+            db,
+            User(
+                oauth_provider=info["provider"],
+                oauth_sub=info["sub"],
+                email=info["email"],
+                name=info["name"],
+                nickname=info["name"],
+                is_local=False,
+                last_login=now,
+            ),
         )
-        db.add(user)
         await db.commit()
-        await db.refresh(user)
     else:
         if user.deleted_at is not None:
             user.deleted_at = None
-        user.last_login = now
-        await db.commit()
-        await db.refresh(user)
-
-    payload = {
-        "uid": user.id,
-        "email": user.email,
-        "name": user.name,
-        "is_admin": user.is_admin,
-        "exp": int(
-            datetime.now(timezone.utc).timestamp()
-            + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
-        ),
-    }
-    token = jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+            await db.commit()
+            await invalidate_principal(user.id)
+        await record_login(db, user.id)
+    timings["db"] = (time.perf_counter() - db_start) * 1000
+
+    token_start = time.perf_counter()
+    token = await create_access_token(user)
+    timings["token"] = (time.perf_counter() - token_start) * 1000
+
+    logger.info(
+        "OAuth login timings (ms): %s",
+        ", ".join(f"{phase}={ms:.1f}" for phase, ms in timings.items()),
+    )
 
     frontend_url = settings.FRONTEND_URL
     redirect_url = f"{frontend_url}/login/callback?token={token}"
-    return RedirectResponse(url=redirect_url)
+    return RedirectResponse(
+        url=redirect_url,
+        headers={
+            "Server-Timing": ", ".join(
+                f"{phase};dur={ms:.1f}" for phase, ms in timings.items()
+            )
+        },
+    )
 
 
 @router.post("/logout")
@@ -141,18 +147,20 @@ async def logout(
     """
     Logout endpoint that blacklists the current token and updates logout time
     """
-    # Update user's last logout time
-    result = await db.execute(
-        select(User).where(User.id == current_user.user_id, User.deleted_at.is_(None))
-    )
-    user = result.scalar_one_or_none()
-    if user:
-        user.last_logout = datetime.now(timezone.utc)
-        await db.commit()
+    await record_logout(db, current_user.user_id)
 
     # Blacklist the token
     auth_header = request.headers.get("Authorization")
     if auth_header and auth_header.startswith("Bearer "):
         token = auth_header.split(" ")[1]
-        blacklist_token(token)
+        await blacklist_token(token)
     return {"message": "Successfully logged out"}
+
+
+@router.post("/logout/all")
+async def logout_all(current_user=Depends(get_current_user)):
+    """
+    Revoke every token issued to the current user, signing out all sessions
+    """
+    await revoke_user_tokens(current_user.user_id)
+    return {"message": "Successfully logged out of all sessions"}
@@ -1,46 +1,88 @@
+import base64
 import json
-from datetime import datetime, timedelta, timezone
-from typing import List
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Annotated, List
 
 from fastapi import (
     APIRouter,
     Depends,
     Form,
+    Header,
     HTTPException,
+    Response,
     WebSocket,
     WebSocketDisconnect,
     status,
 )
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db.session import get_session
+from app.core.responses import read_columns, row_dicts
+from app.db.session import get_read_session, get_session
+from app.db.writes import insert_returning, update_returning
 from app.models.models import (
     Archive,
+    ArchiveBulkAction,
+    ArchiveBulkOperation,
+    ArchiveBulkRequest,
+    ArchiveBulkResponse,
+    ArchiveBulkResult,
     ArchiveDiscussionMessage,
     ArchiveDiscussionMessageRead,
     ArchiveRead,
     ArchiveType,
     ArchiveUpdateCourse,
     Course,
+    CourseCategory,
     CourseCreate,
+    CourseFacets,
     CourseInfo,
     CourseRead,
     CoursesByCategory,
     CourseUpdate,
+    FacetCount,
     User,
     UserRoles,
 )
 from app.utils.auth import get_current_user
 from app.utils.auth_ws import get_ws_token_payload
-from app.utils.storage import presigned_get_url
+from app.utils.cache import TTLCache
+from app.utils.catalog import (
+    bump_course_archives_version,
+    bump_course_catalog_version,
+    course_catalog_etag,
+    etag_matches,
+    get_cached_course_catalog,
+    get_course_archives_version,
+    get_course_catalog_version,
+    set_cached_course_catalog,
+)
+from app.utils.downloads import get_pending_downloads, record_downloads
+from app.utils.storage import (
+    DOWNLOAD_URL_EXPIRES,
+    PREVIEW_URL_EXPIRES,
+    presigned_get_url,
+)
+from app.utils.trending import (
+    DOWNLOAD_WEIGHT,
+    PREVIEW_WEIGHT,
+    forget_trending_archives,
+    record_archive_hits,
+    refresh_trending_archives,
+)
 
 router = APIRouter()
 
 # In-memory connection registry (single-process broadcast).
 _discussion_connections_by_archive: dict[int, set[WebSocket]] = {}
 DISCUSSION_MESSAGE_MAX_LENGTH = 200
+# archives.id is a 32-bit integer column.
+ARCHIVE_ID_MAX = 2**31 - 1
 
 
 def _discussion_public_display_name(
@@ -55,32 +97,83 @@ def _discussion_public_display_name(
 @router.get("", response_model=CoursesByCategory)
 async def get_categorized_courses(
     current_user: User = Depends(get_current_user),
+    # The primary, not a replica: a rebuild right after a version bump must
+    # not cache rows the replica has not replayed yet. The session only
+    # connects when the catalog is actually rebuilt.
     db: AsyncSession = Depends(get_session),
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
     """
     Get all courses grouped by category.
-    Returns courses with their IDs grouped by category.
+    Returns courses with their IDs grouped by category. The serialized
+    catalog is cached per process under the catalog version kept in Redis,
+    and clients revalidating with its ETag get a 304.
     """
-    query = select(Course).where(Course.deleted_at.is_(None))
-    result = await db.execute(query)
-    courses = result.scalars().all()
+    version = await get_course_catalog_version()
+    headers = {"ETag": course_catalog_etag(version), "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body = get_cached_course_catalog(version)
+    if body is None:
+        query = select(Course).where(Course.deleted_at.is_(None)).order_by(Course.id)
+        result = await db.execute(query)
+        courses = result.scalars().all()
+
+        categorized_courses = CoursesByCategory()
+        for course in courses:
+            course_info = CourseInfo(id=course.id, name=course.name)
+            getattr(categorized_courses, course.category).append(course_info)
 
-    categorized_courses = CoursesByCategory()
-    for course in courses:
-        course_info = CourseInfo(id=course.id, name=course.name)
-        getattr(categorized_courses, course.category).append(course_info)
+        body = categorized_courses.model_dump_json().encode()
+        set_cached_course_catalog(version, body)
 
-    return categorized_courses
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _encode_archive_cursor(archive) -> str:
+    raw = f"{archive['created_at'].isoformat()}|{archive['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_archive_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, archive_id = (
+            base64.urlsafe_b64decode(padded).decode().rsplit("|", 1)
+        )
+        created_at = datetime.fromisoformat(created_at)
+        archive_id = int(archive_id)
+        # Values outside the column types would fail in the database instead.
+        if created_at.tzinfo is None or not 0 < archive_id <= ARCHIVE_ID_MAX:
+            raise ValueError(cursor)
+        return created_at.astimezone(timezone.utc), archive_id
+    except (ValueError, OverflowError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
 
 
 @router.get("/{course_id}/archives", response_model=List[ArchiveRead])
 async def get_course_archives(
     course_id: int,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
+    academic_year_min: int | None = None,
+    academic_year_max: int | None = None,
+    archive_type: ArchiveType | None = None,
+    professor: str | None = None,
+    has_answers: bool | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
 ):
     """
-    Get all archives for a specific course.
+    Get archives for a specific course, newest first, optionally filtered.
+    Without ``limit`` or ``cursor`` every matching archive is returned.
+    Otherwise at most ``limit`` (default 50, max 100) are returned and the
+    ``X-Next-Cursor`` response header, when present, is the ``cursor`` for
+    the next page.
     """
     course_query = select(Course).where(
         Course.id == course_id, Course.deleted_at.is_(None)
@@ -95,16 +188,152 @@ async def get_course_archives(
         )
 
     query = (
-        select(Archive)
+        select(*read_columns(Archive, ArchiveRead))
         .where(Archive.course_id == course_id, Archive.deleted_at.is_(None))
-        .order_by(Archive.created_at.desc())
+        .order_by(Archive.created_at.desc(), Archive.id.desc())
     )
-    result = await db.execute(query)
-    archives = result.scalars().all()
+    if academic_year_min is not None:
+        query = query.where(Archive.academic_year >= academic_year_min)
+    if academic_year_max is not None:
+        query = query.where(Archive.academic_year <= academic_year_max)
+    if archive_type is not None:
+        query = query.where(Archive.archive_type == archive_type)
+    if professor is not None:
+        query = query.where(Archive.professor == professor)
+    if has_answers is not None:
+        query = query.where(Archive.has_answers.is_(has_answers))
+
+    if limit is None and cursor is None:
+        result = await db.execute(query)
+        return await _archive_reads(row_dicts(result))
 
+    safe_limit = max(1, min(int(limit or 50), 100))
+    if cursor is not None:
+        created_at, archive_id = _decode_archive_cursor(cursor)
+        query = query.where(
+            tuple_(Archive.created_at, Archive.id) < tuple_(created_at, archive_id)
+        )
+    # One extra row tells whether another page follows.
+    result = await db.execute(query.limit(safe_limit + 1))
+    archives = row_dicts(result)
+
+    if len(archives) > safe_limit:
+        archives = archives[:safe_limit]
+        response.headers["X-Next-Cursor"] = _encode_archive_cursor(archives[-1])
+    return await _archive_reads(archives)
+
+
+async def _archive_reads(archives: list[dict]) -> list[dict]:
+    """
+    Add the downloads still buffered in Redis to the ``download_count`` of
+    ArchiveRead row dicts, in place.
+    """
+    pending = await get_pending_downloads([archive["id"] for archive in archives])
+    for archive in archives:
+        archive["download_count"] += pending.get(archive["id"], 0)
     return archives
 
 
+# (course_id, archive list version) -> CourseFacets
+_course_facets = TTLCache(maxsize=1024, ttl=3600)
+
+FACET_COLUMNS = ("professor", "academic_year", "archive_type", "has_answers")
+
+
+@router.get("/{course_id}/facets", response_model=CourseFacets)
+async def get_course_facets(
+    course_id: int,
+    current_user: User = Depends(get_current_user),
+    # The primary, not a replica: counts computed right after a version bump
+    # must not be cached from rows the replica has not replayed yet.
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Archive counts of a course by professor, academic year, archive type
+    and has_answers, computed in one GROUPING SETS pass and cached under
+    the course's archive list version.
+    """
+    version = await get_course_archives_version(course_id)
+    facets = _course_facets.get((course_id, version))
+    if facets is not None:
+        return facets
+
+    course_query = select(Course.id).where(
+        Course.id == course_id, Course.deleted_at.is_(None)
+    )
+    if (await db.execute(course_query)).scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Course with id {course_id} not found",
+        )
+
+    columns = [getattr(Archive, name) for name in FACET_COLUMNS]
+    query = (
+        select(*columns, func.count().label("count"))
+        .where(Archive.course_id == course_id, Archive.deleted_at.is_(None))
+        .group_by(func.grouping_sets(*(tuple_(column) for column in columns), tuple_()))
+    )
+    rows = (await db.execute(query)).all()
+
+    facets = CourseFacets(total=0)
+    for row in rows:
+        # The facet columns are NOT NULL, so the one set in a row names the
+        # grouping set it belongs to; none set is the () grand total.
+        grouped = [name for name in FACET_COLUMNS if getattr(row, name) is not None]
+        if not grouped:
+            facets.total = row.count
+            continue
+        value = getattr(row, grouped[0])
+        if isinstance(value, ArchiveType):
+            value = value.value
+        getattr(facets, grouped[0]).append(FacetCount(value=value, count=row.count))
+
+    facets.professor.sort(key=lambda facet: (-facet.count, facet.value))
+    facets.academic_year.sort(key=lambda facet: facet.value, reverse=True)
+    facets.archive_type.sort(key=lambda facet: (-facet.count, facet.value))
+    facets.has_answers.sort(key=lambda facet: facet.value, reverse=True)
+
+    _course_facets.set((course_id, version), facets)
+    return facets
+
+
+def _archive_hit_query(course_id: int, archive_id: int):
+    # Columns for the presigned URL and the trending feed entry.
+    return (
+        select(
+            Archive.id,
+            Archive.name,
+            Archive.object_name,
+            Archive.course_id,
+            Course.name.label("course_name"),
+            Course.category.label("course_category"),
+        )
+        .join(Course, Course.id == Archive.course_id)
+        .where(
+            Archive.course_id == course_id,
+            Archive.id == archive_id,
+            Archive.deleted_at.is_(None),
+        )
+    )
+
+
+async def _refresh_trending(db: AsyncSession, *where) -> None:
+    # Rewrites the trending entries of the live archives matching ``where``
+    # after a rename or move; call it once the change is committed.
+    result = await db.execute(
+        select(
+            Archive.id,
+            Archive.name,
+            Archive.course_id,
+            Course.name.label("course_name"),
+            Course.category.label("course_category"),
+        )
+        .join(Course, Course.id == Archive.course_id)
+        .where(*where, Archive.deleted_at.is_(None))
+    )
+    await refresh_trending_archives(result.all())
+
+
 @router.get("/{course_id}/archives/{archive_id}/preview")
 async def get_archive_preview_url(
     course_id: int,
@@ -115,22 +344,16 @@ async def get_archive_preview_url(
     """
     Get presigned URL for previewing an archive (30 minutes expiry)
     """
-    query = select(Archive).where(
-        Archive.course_id == course_id,
-        Archive.id == archive_id,
-        Archive.deleted_at.is_(None),
-    )
-    result = await db.execute(query)
-    archive = result.scalar_one_or_none()
+    result = await db.execute(_archive_hit_query(course_id, archive_id))
+    archive = result.one_or_none()
 
     if not archive:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Archive not found"
         )
 
-    return {
-        "url": presigned_get_url(archive.object_name, expires=timedelta(minutes=30))
-    }
+    await record_archive_hits([archive], weight=PREVIEW_WEIGHT)
+    return {"url": presigned_get_url(archive.object_name, expires=PREVIEW_URL_EXPIRES)}
 
 
 @router.get("/{course_id}/archives/{archive_id}/download")
@@ -144,24 +367,20 @@ async def get_archive_download_url(
     Get presigned URL for downloading an archive (1 hour expiry)
     This endpoint increments the download coun
     """
-    query = select(Archive).where(
-        Archive.course_id == course_id,
-        Archive.id == archive_id,
-        Archive.deleted_at.is_(None),
-    )
-    result = await db.execute(query)
-    archive = result.scalar_one_or_none()
+    result = await db.execute(_archive_hit_query(course_id, archive_id))
+    archive = result.one_or_none()
 
     if not archive:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Archive not found"
         )
 
-    archive.download_count += 1
-    await db.commit()
-    await db.refresh(archive)
+    # Counted in Redis and flushed in bulk, so a popular archive does not
+    # serialize its downloads on one row lock.
+    await record_downloads(db, [archive.id])
+    await record_archive_hits([archive], weight=DOWNLOAD_WEIGHT)
 
-    return {"url": presigned_get_url(archive.object_name, expires=timedelta(hours=1))}
+    return {"url": presigned_get_url(archive.object_name, expires=DOWNLOAD_URL_EXPIRES)}
 
 
 async def _ensure_archive_exists_for_discussion(
@@ -201,17 +420,42 @@ async def _broadcast_discussion(archive_id: int, payload: dict):
                 _discussion_connections_by_archive.pop(archive_id, None)
 
 
+async def _close_archive_discussions(archive_ids):
+    """
+    Disconnect every discussion socket of archives that were just deleted.
+    """
+    for archive_id in archive_ids:
+        for ws in _discussion_connections_by_archive.pop(archive_id, ()):
+            try:
+                await ws.close(code=1008)
+            except Exception:
+                # Already gone; nothing left to clean up.
+                pass
+
+
 async def _fetch_archive_discussion_messages(
     archive_id: int,
     db: AsyncSession,
     *,
     limit: int = 50,
     before_id: int | None = None,
-) -> List[ArchiveDiscussionMessageRead]:
+) -> list[dict]:
+    """
+    ArchiveDiscussionMessageRead dicts of the latest messages, oldest first,
+    built straight from the selected columns.
+    """
     safe_limit = max(1, min(int(limit or 50), 100))
 
     stmt = (
-        select(ArchiveDiscussionMessage, User.nickname, User.name)
+        select(
+            ArchiveDiscussionMessage.id,
+            ArchiveDiscussionMessage.archive_id,
+            ArchiveDiscussionMessage.user_id,
+            ArchiveDiscussionMessage.content,
+            ArchiveDiscussionMessage.created_at,
+            User.nickname,
+            User.name,
+        )
         .join(User, User.id == ArchiveDiscussionMessage.user_id)
         .where(
             ArchiveDiscussionMessage.archive_id == archive_id,
@@ -224,20 +468,19 @@ async def _fetch_archive_discussion_messages(
         stmt = stmt.where(ArchiveDiscussionMessage.id < before_id)
 
     rows = (await db.execute(stmt)).all()
-    rows = list(reversed(rows))
 
     return [
-        ArchiveDiscussionMessageRead(
-            id=msg.id,
-            archive_id=msg.archive_id,
-            user_id=msg.user_id,
-            user_name=_discussion_public_display_name(
-                user_id=msg.user_id, nickname=nickname, name=user_name
+        {
+            "id": row.id,
+            "archive_id": row.archive_id,
+            "user_id": row.user_id,
+            "user_name": _discussion_public_display_name(
+                user_id=row.user_id, nickname=row.nickname, name=row.name
             ),
-            content=msg.content,
-            created_at=msg.created_at,
-        )
-        for (msg, nickname, user_name) in rows
+            "content": row.content,
+            "created_at": row.created_at,
+        }
+        for row in reversed(rows)
     ]
 
 
@@ -251,7 +494,7 @@ async def list_archive_discussion_messages(
     limit: int = 50,
     before_id: int | None = None,
     current_user: UserRoles = Depends(get_current_user),
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     await _ensure_archive_exists_for_discussion(course_id, archive_id, db)
     return await _fetch_archive_discussion_messages(
@@ -341,15 +584,16 @@ async def archive_discussion_ws(
                 )
                 continue
 
-            message = ArchiveDiscussionMessage(
-                archive_id=archive_id,
-                user_id=user.id,
-                content=content,
-                created_at=datetime.now(timezone.utc),
+            message = await insert_returning(
+                db,
+                ArchiveDiscussionMessage(
+                    archive_id=archive_id,
+                    user_id=user.id,
+                    content=content,
+                    created_at=datetime.now(timezone.utc),
+                ),
             )
-            db.add(message)
             await db.commit()
-            await db.refresh(message)
 
             # Fetch latest nickname each time (user object may be stale while WS is open).
             user_row = (
@@ -431,11 +675,11 @@ async def delete_archive_discussion_message(
 async def update_archive(
     course_id: int,
     archive_id: int,
-    name: str = Form(None),
-    professor: str = Form(None),
-    archive_type: ArchiveType = Form(None),
-    has_answers: bool = Form(None),
-    academic_year: int = Form(None),
+    name: Annotated[str | None, Form()] = None,
+    professor: Annotated[str | None, Form()] = None,
+    archive_type: Annotated[ArchiveType | None, Form()] = None,
+    has_answers: Annotated[bool | None, Form()] = None,
+    academic_year: Annotated[int | None, Form()] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_session),
 ):
@@ -448,35 +692,42 @@ async def update_archive(
             detail="Only admins can update archives",
         )
 
-    query = select(Archive).where(
+    changes = {
+        field: value
+        for field, value in (
+            ("name", name),
+            ("professor", professor),
+            ("archive_type", archive_type),
+            ("has_answers", has_answers),
+            ("academic_year", academic_year),
+        )
+        if value is not None
+    }
+    archive = await update_returning(
+        db,
+        Archive,
         Archive.course_id == course_id,
         Archive.id == archive_id,
         Archive.deleted_at.is_(None),
+        **changes,
+        updated_at=datetime.now(timezone.utc),
     )
-    result = await db.execute(query)
-    archive = result.scalar_one_or_none()
 
     if not archive:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Archive not found"
         )
 
-    if name is not None:
-        archive.name = name
-    if professor is not None:
-        archive.professor = professor
-    if archive_type is not None:
-        archive.archive_type = archive_type
-    if has_answers is not None:
-        archive.has_answers = has_answers
-    if academic_year is not None:
-        archive.academic_year = academic_year
-
-    archive.updated_at = datetime.now(timezone.utc)
-
     await db.commit()
-    await db.refresh(archive)
-
+    await bump_course_archives_version(course_id)
+    if "name" in changes:
+        await _refresh_trending(db, Archive.id == archive_id)
+
+    # Count the downloads still buffered in Redis, as the listings do, on a
+    # detached copy so the session never writes the sum back.
+    db.expunge(archive)
+    pending = await get_pending_downloads([archive.id])
+    archive.download_count += pending.get(archive.id, 0)
     return archive
 
 
@@ -514,6 +765,7 @@ async def update_archive_course(
 
     # Determine target course
     new_course = None
+    created_course = False
 
     if course_update.course_id:
         # Check if trying to transfer to the same course
@@ -552,13 +804,14 @@ async def update_archive_course(
                     detail="Cannot transfer archive to the same course",
                 )
         else:
-            # Create new course if it doesn't exist
-            new_course = Course(
-                name=course_update.course_name, category=course_update.course_category
+            # Create new course if it doesn't exist. A concurrent request may
+            # create it first, in which case the move reuses that course.
+            new_course = await _insert_course(
+                db, course_update.course_name, course_update.course_category
             )
-            db.add(new_course)
-            await db.commit()
-            await db.refresh(new_course)
+            created_course = new_course is not None
+            if not created_course:
+                new_course = (await db.execute(new_course_query)).scalar_one()
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -571,8 +824,12 @@ async def update_archive_course(
     archive.course_id = new_course.id
     archive.updated_at = datetime.now(timezone.utc)
 
+    # The new course (if any) and the move commit together.
     await db.commit()
-    await db.refresh(archive)
+    await bump_course_archives_version(course_id, new_course.id)
+    if created_course:
+        await bump_course_catalog_version()
+    await _refresh_trending(db, Archive.id == archive.id)
 
     return {
         "message": f"Archive moved to course '{new_course.name}'",
@@ -614,10 +871,191 @@ async def delete_archive(
 
     archive.deleted_at = datetime.now(timezone.utc)
     await db.commit()
+    await bump_course_archives_version(course_id)
+    await forget_trending_archives(archive_id)
+    await _close_archive_discussions([archive_id])
 
     return {"message": "Archive deleted successfully"}
 
 
+ARCHIVE_BULK_MAX = 1000
+ARCHIVE_BULK_FIELDS = (
+    "name",
+    "professor",
+    "archive_type",
+    "has_answers",
+    "academic_year",
+)
+
+
+def _bulk_changes(operation: ArchiveBulkOperation) -> dict:
+    return {
+        field: getattr(operation, field)
+        for field in ARCHIVE_BULK_FIELDS
+        if getattr(operation, field) is not None
+    }
+
+
+def _bulk_operation_error(
+    operation: ArchiveBulkOperation,
+    occurrences: Counter,
+    live_archives: dict[int, int],
+    live_courses: set[int],
+) -> str | None:
+    if occurrences[operation.archive_id] > 1:
+        return "Archive appears in more than one operation"
+    if operation.archive_id not in live_archives:
+        return "Archive not found"
+    if operation.action == ArchiveBulkAction.MOVE:
+        if operation.course_id is None:
+            return "course_id is required to move an archive"
+        if operation.course_id == live_archives[operation.archive_id]:
+            return "Cannot transfer archive to the same course"
+        if operation.course_id not in live_courses:
+            return "Target course not found"
+    if operation.action == ArchiveBulkAction.UPDATE and not _bulk_changes(operation):
+        return "No fields to update"
+    return None
+
+
+@router.post("/admin/archives/bulk", response_model=ArchiveBulkResponse)
+async def bulk_update_archives(
+    payload: ArchiveBulkRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Move, edit or soft delete many archives at once. Only admins can do
+    this. Operations that fail validation are reported and skipped; all
+    others are applied in one transaction.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can update archives",
+        )
+    operations = payload.operations
+    if not operations:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="No operations given"
+        )
+    if len(operations) > ARCHIVE_BULK_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {ARCHIVE_BULK_MAX} operations per request",
+        )
+
+    # Validate with one query per table. The rows stay locked until commit,
+    # so nothing is deleted or moved between the checks and the writes.
+    archive_ids = {operation.archive_id for operation in operations}
+    live_archives = dict(
+        (
+            await db.execute(
+                select(Archive.id, Archive.course_id)
+                .where(Archive.id.in_(archive_ids), Archive.deleted_at.is_(None))
+                .with_for_update()
+            )
+        ).all()
+    )
+    target_ids = {
+        operation.course_id
+        for operation in operations
+        if operation.action == ArchiveBulkAction.MOVE
+        and operation.course_id is not None
+    }
+    live_courses = set()
+    if target_ids:
+        live_courses = set(
+            (
+                await db.execute(
+                    select(Course.id)
+                    .where(Course.id.in_(target_ids), Course.deleted_at.is_(None))
+                    .with_for_update(read=True)
+                )
+            )
+            .scalars()
+            .all()
+        )
+
+    occurrences = Counter(operation.archive_id for operation in operations)
+    current_time = datetime.now(timezone.utc)
+    rows = []
+    errors = {}
+    touched_courses = set()
+    deleted_ids = []
+    refreshed_ids = []
+    for index, operation in enumerate(operations):
+        error = _bulk_operation_error(
+            operation, occurrences, live_archives, live_courses
+        )
+        if error:
+            errors[index] = error
+            continue
+        row = {"id": operation.archive_id}
+        if operation.action == ArchiveBulkAction.DELETE:
+            row["deleted_at"] = current_time
+            deleted_ids.append(operation.archive_id)
+        elif operation.action == ArchiveBulkAction.MOVE:
+            row.update(course_id=operation.course_id, updated_at=current_time)
+            touched_courses.add(operation.course_id)
+            refreshed_ids.append(operation.archive_id)
+        else:
+            row.update(_bulk_changes(operation), updated_at=current_time)
+            if "name" in row:
+                refreshed_ids.append(operation.archive_id)
+        touched_courses.add(live_archives[operation.archive_id])
+        rows.append(row)
+
+    if rows:
+        # ORM bulk UPDATE by primary key runs one executemany per run of rows
+        # with the same columns, so group the rows by their columns first.
+        rows.sort(key=lambda row: sorted(row))
+        await db.execute(update(Archive), rows)
+        await db.commit()
+        await bump_course_archives_version(*touched_courses)
+        await forget_trending_archives(*deleted_ids)
+        if refreshed_ids:
+            await _refresh_trending(db, Archive.id.in_(refreshed_ids))
+        await _close_archive_discussions(deleted_ids)
+    else:
+        await db.rollback()
+
+    results = [
+        ArchiveBulkResult(
+            index=index,
+            archive_id=operation.archive_id,
+            action=operation.action,
+            success=index not in errors,
+            detail=errors.get(index),
+        )
+        for index, operation in enumerate(operations)
+    ]
+    return ArchiveBulkResponse(applied=len(rows), failed=len(errors), results=results)
+
+
+COURSE_EXISTS_DETAIL = "Course with this name and category already exists"
+
+
+async def _insert_course(
+    db: AsyncSession, name: str, category: CourseCategory
+) -> Course | None:
+    """
+    Insert a live course and return it, or None when one with the same name
+    and category already exists. Concurrent inserts of the same course meet
+    on the partial unique index, so the loser gets None, not an error.
+    """
+    statement = (
+        insert(Course)
+        .values(name=name, category=category)
+        .on_conflict_do_nothing(
+            index_elements=["name", "category"],
+            index_where=Course.deleted_at.is_(None),
+        )
+        .returning(Course)
+    )
+    return (await db.execute(statement)).scalar_one_or_none()
+
+
 @router.post("/admin/courses", response_model=CourseRead)
 async def create_course(
     course_data: CourseCreate,
@@ -633,25 +1071,15 @@ async def create_course(
             detail="Only admins can create courses",
         )
 
-    query = select(Course).where(
-        Course.name == course_data.name,
-        Course.category == course_data.category,
-        Course.deleted_at.is_(None),
-    )
-    result = await db.execute(query)
-    existing_course = result.scalar_one_or_none()
-
-    if existing_course:
+    course = await _insert_course(db, course_data.name, course_data.category)
+    if not course:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Course with this name and category already exists",
+            detail=COURSE_EXISTS_DETAIL,
         )
-
-    course = Course(name=course_data.name, category=course_data.category)
-
-    db.add(course)
     await db.commit()
-    await db.refresh(course)
+    await bump_course_catalog_version()
 
     return course
 
@@ -681,37 +1109,23 @@ async def update_course(
             status_code=status.HTTP_404_NOT_FOUND, detail="Course not found"
         )
 
-    if course_data.name is not None or course_data.category is not None:
-        new_name = course_data.name if course_data.name is not None else course.name
-        new_category = (
-            course_data.category
-            if course_data.category is not None
-            else course.category
-        )
-
-        if new_name != course.name or new_category != course.category:
-            check_query = select(Course).where(
-                Course.name == new_name,
-                Course.category == new_category,
-                Course.id != course_id,
-                Course.deleted_at.is_(None),
+    changes = course_data.model_dump(exclude_none=True)
+    if changes:
+        # The partial unique index on (name, category) rejects a rename onto
+        # another live course, including one created concurrently.
+        try:
+            course = await update_returning(
+                db, Course, Course.id == course_id, **changes
             )
-            check_result = await db.execute(check_query)
-            existing_course = check_result.scalar_one_or_none()
-
-            if existing_course:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Course with this name and category already exists",
-                )
-
-    if course_data.name is not None:
-        course.name = course_data.name
-    if course_data.category is not None:
-        course.category = course_data.category
-
-    await db.commit()
-    await db.refresh(course)
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=COURSE_EXISTS_DETAIL,
+            )
+        await db.commit()
+        await bump_course_catalog_version()
+        await _refresh_trending(db, Archive.course_id == course_id)
 
     return course
 
@@ -741,25 +1155,29 @@ async def delete_course(
             status_code=status.HTTP_404_NOT_FOUND, detail="Course not found"
         )
 
-    archives_query = select(Archive).where(
-        Archive.course_id == course_id, Archive.deleted_at.is_(None)
-    )
-    archives_result = await db.execute(archives_query)
-    archives = archives_result.scalars().all()
-
-    # Soft delete all associated archives and the course
+    # One set-based UPDATE instead of loading every archive into the session.
     current_time = datetime.now(timezone.utc)
-    for archive in archives:
-        archive.deleted_at = current_time
+    result = await db.execute(
+        update(Archive)
+        .where(Archive.course_id == course_id, Archive.deleted_at.is_(None))
+        .values(deleted_at=current_time)
+        .returning(Archive.id)
+        .execution_options(synchronize_session=False)
+    )
+    archive_ids = result.scalars().all()
 
     # Soft delete the course
     course.deleted_at = current_time
 
     await db.commit()
+    await bump_course_catalog_version()
+    await bump_course_archives_version(course_id)
+    await forget_trending_archives(*archive_ids)
+    await _close_archive_discussions(archive_ids)
 
     return {
         "message": (
-            f"Course '{course.name}' and {len(archives)} associated "
+            f"Course '{course.name}' and {len(archive_ids)} associated "
             f"archives deleted successfully"
         )
     }
@@ -780,11 +1198,9 @@ async def list_all_courses(
         )
 
     query = (
-        select(Course)
+        select(*read_columns(Course, CourseRead))
         .where(Course.deleted_at.is_(None))
         .order_by(Course.category, Course.name)
     )
     result = await db.execute(query)
-    courses = result.scalars().all()
-
-    return courses
+    return row_dicts(result)
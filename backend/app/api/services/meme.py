@@ -3,7 +3,7 @@ from sqlmodel import select
 from sqlalchemy import func
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db.session import get_session
+from app.db.session import get_read_session
 from app.models.models import Meme, MemeRead
 
 router = APIRouter()
@@ -11,7 +11,7 @@ router = APIRouter()
 
 @router.get("/meme", response_model=MemeRead)
 async def get_random_meme(
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """
     Get a random meme.
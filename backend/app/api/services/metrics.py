@@ -0,0 +1,141 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.instrumentation import route_stats
+from app.db.metrics import pool_metrics
+from app.db.session import get_read_session
+from app.db.slow_queries import slow_query_log
+from app.models.models import (
+    Archive,
+    ArchiveDownloadDaily,
+    ArchiveDownloadWeekly,
+    UserRoles,
+)
+from app.utils.auth import get_current_user
+
+router = APIRouter()
+
+DOWNLOAD_STATS_MAX_POINTS = 366
+
+
+def _require_admin(current_user: UserRoles) -> None:
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
+        )
+
+
+@router.get("/admin/pool")
+async def get_pool_metrics(current_user: UserRoles = Depends(get_current_user)):
+    """
+    Connection pool usage of the worker serving this request (admin only)
+    """
+    _require_admin(current_user)
+    return {"pools": [metrics.snapshot() for metrics in pool_metrics.values()]}
+
+
+@router.post("/admin/pool/reset")
+async def reset_pool_metrics(current_user: UserRoles = Depends(get_current_user)):
+    """
+    Reset the wait/hold histograms and counters of this worker (admin only)
+    """
+    _require_admin(current_user)
+    for metrics in pool_metrics.values():
+        metrics.reset()
+    return {"message": "Pool metrics reset"}
+
+
+@router.get("/admin/routes")
+async def get_route_metrics(current_user: UserRoles = Depends(get_current_user)):
+    """
+    Per-route query counts and DB time of this worker, busiest first (admin only)
+    """
+    _require_admin(current_user)
+    return {"routes": route_stats.snapshot()}
+
+
+@router.post("/admin/routes/reset")
+async def reset_route_metrics(current_user: UserRoles = Depends(get_current_user)):
+    """
+    Reset the per-route query aggregates of this worker (admin only)
+    """
+    _require_admin(current_user)
+    route_stats.reset()
+    return {"message": "Route metrics reset"}
+
+
+@router.get("/admin/slow-queries")
+async def get_slow_queries(current_user: UserRoles = Depends(get_current_user)):
+    """
+    Recent slow statements recorded by this worker, newest first (admin only)
+    """
+    _require_admin(current_user)
+    return {"queries": slow_query_log.snapshot()}
+
+
+@router.post("/admin/slow-queries/reset")
+async def reset_slow_queries(current_user: UserRoles = Depends(get_current_user)):
+    """
+    Clear the slow-query log of this worker (admin only)
+    """
+    _require_admin(current_user)
+    slow_query_log.clear()
+    return {"message": "Slow-query log cleared"}
+
+
+@router.get("/admin/downloads")
+async def get_download_stats(
+    granularity: Literal["day", "week"] = "day",
+    start: date | None = None,
+    end: date | None = None,
+    course_id: int | None = None,
+    archive_id: int | None = None,
+    current_user: UserRoles = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_session),
+):
+    """
+    Downloads per UTC day or ISO week between ``start`` and ``end``
+    inclusive, read from the rollup tables only (admin only). Defaults to
+    the last 30 days or 12 weeks.
+    """
+    _require_admin(current_user)
+    step = timedelta(days=1 if granularity == "day" else 7)
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - step * (30 if granularity == "day" else 12) + step
+    if granularity == "week":
+        # Weeks are keyed by their Monday.
+        start -= timedelta(days=start.weekday())
+        end -= timedelta(days=end.weekday())
+    if start > end or (end - start) // step >= DOWNLOAD_STATS_MAX_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Choose a range of 1 to {DOWNLOAD_STATS_MAX_POINTS} periods",
+        )
+
+    rollup = ArchiveDownloadDaily if granularity == "day" else ArchiveDownloadWeekly
+    period = rollup.day if granularity == "day" else rollup.week
+    query = (
+        select(period, func.sum(rollup.downloads))
+        .where(period >= start, period <= end)
+        .group_by(period)
+    )
+    if archive_id is not None:
+        query = query.where(rollup.archive_id == archive_id)
+    if course_id is not None:
+        query = query.join(Archive, Archive.id == rollup.archive_id).where(
+            Archive.course_id == course_id
+        )
+    totals = dict((await db.execute(query)).all())
+
+    points = []
+    current = start
+    while current <= end:
+        points.append(
+            {"period": current.isoformat(), "downloads": int(totals.get(current, 0))}
+        )
+        current += step
+    return {"granularity": granularity, "points": points}
@@ -5,7 +5,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db.session import get_session
+from app.core.responses import read_columns, row_dicts
+from app.db.session import get_read_session, get_session
+from app.db.writes import insert_returning, update_returning
 from app.models.models import (
     Notification,
     NotificationCreate,
@@ -30,28 +32,26 @@ def _apply_time_filters(statement):
 
 @router.get("/active", response_model=List[NotificationRead])
 async def get_active_notifications(
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
-    query = select(Notification).order_by(Notification.updated_at.desc())
+    query = select(*read_columns(Notification, NotificationRead)).order_by(
+        Notification.updated_at.desc()
+    )
     query = _apply_time_filters(query)
     result = await db.execute(query)
-    notifications = result.scalars().all()
-    return [
-        NotificationRead.model_validate(notification) for notification in notifications
-    ]
+    return row_dicts(result)
 
 
 @router.get("", response_model=List[NotificationRead])
 async def list_public_notifications(
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
-    query = select(Notification).order_by(Notification.updated_at.desc())
+    query = select(*read_columns(Notification, NotificationRead)).order_by(
+        Notification.updated_at.desc()
+    )
     query = _apply_time_filters(query)
     result = await db.execute(query)
-    notifications = result.scalars().all()
-    return [
-        NotificationRead.model_validate(notification) for notification in notifications
-    ]
+    return row_dicts(result)
 
 
 @router.get("/admin/notifications", response_model=List[NotificationRead])
@@ -65,15 +65,12 @@ async def list_admin_notifications(
         )
 
     query = (
-        select(Notification)
+        select(*read_columns(Notification, NotificationRead))
         .where(Notification.deleted_at.is_(None))
         .order_by(Notification.updated_at.desc())
     )
     result = await db.execute(query)
-    notifications = result.scalars().all()
-    return [
-        NotificationRead.model_validate(notification) for notification in notifications
-    ]
+    return row_dicts(result)
 
 
 @router.post(
@@ -91,14 +88,12 @@ async def create_notification(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
         )
 
-    notification = Notification(**notification_data.model_dump())
     now = datetime.now(timezone.utc)
-    notification.created_at = now
-    notification.updated_at = now
-
-    db.add(notification)
+    notification = await insert_returning(
+        db,
+        Notification(**notification_data.model_dump(), created_at=now, updated_at=now),
+    )
     await db.commit()
-    await db.refresh(notification)
     return NotificationRead.model_validate(notification)
 
 
@@ -114,26 +109,20 @@ async def update_notification(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
         )
 
-    result = await db.execute(
-        select(Notification).where(
-            Notification.id == notification_id, Notification.deleted_at.is_(None)
-        )
+    notification = await update_returning(
+        db,
+        Notification,
+        Notification.id == notification_id,
+        Notification.deleted_at.is_(None),
+        **notification_data.model_dump(exclude_unset=True),
+        updated_at=datetime.now(timezone.utc),
     )
-    notification = result.scalar_one_or_none()
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found"
         )
 
-    update_data = notification_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(notification, field, value)
-
-    notification.updated_at = datetime.now(timezone.utc)
-
-    db.add(notification)
     await db.commit()
-    await db.refresh(notification)
     return NotificationRead.model_validate(notification)
 
 
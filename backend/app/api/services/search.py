@@ -0,0 +1,145 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import (
+    Integer,
+    case,
+    cast,
+    func,
+    literal,
+    literal_column,
+    null,
+    union_all,
+)
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.session import get_read_session
+from app.models.models import (
+    Archive,
+    Course,
+    SearchHit,
+    SearchHitType,
+    SearchResults,
+    UserRoles,
+)
+from app.utils.auth import get_current_user
+
+router = APIRouter()
+
+SEARCH_MAX_LIMIT = 50
+
+
+def _search_key(value):
+    # Same expression as SEARCH_KEY_SQL, which the trigram indexes are built on.
+    return func.lower(func.normalize(value, literal_column("NFKC")))
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _match(key, term, pattern):
+    """
+    (where clause, score) for one searchable column. Substring hits rank
+    above fuzzy ones; both are answered by the trigram index.
+    """
+    contains = key.like(pattern, escape="\\")
+    score = func.similarity(key, term) + case((contains, 1.0), else_=0.0)
+    return contains | key.op("%")(term), score
+
+
+@router.get("", response_model=SearchResults)
+async def search(
+    # The term is stripped, so it needs a non-blank character: an empty one
+    # becomes the LIKE pattern "%%" and would match everything.
+    q: Annotated[str, Query(min_length=1, max_length=100, pattern=r"\S")],
+    limit: int = 20,
+    offset: int = 0,
+    current_user: UserRoles = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_session),
+):
+    """
+    Ranked search over course names, professors and archive names.
+    Professors are returned once per course they have archives in.
+    """
+    safe_limit = max(1, min(int(limit or 20), SEARCH_MAX_LIMIT))
+    safe_offset = max(0, int(offset or 0))
+
+    term = q.strip()
+    normalized = _search_key(literal(term))
+    pattern = _search_key(literal(f"%{_escape_like(term)}%"))
+
+    course_where, course_score = _match(_search_key(Course.name), normalized, pattern)
+    courses = select(
+        literal(SearchHitType.COURSE.value).label("type"),
+        Course.name.label("title"),
+        Course.id.label("course_id"),
+        Course.name.label("course_name"),
+        Course.category.label("course_category"),
+        cast(null(), Integer).label("archive_id"),
+        course_score.label("score"),
+    ).where(Course.deleted_at.is_(None), course_where)
+
+    live_archives = (Archive.deleted_at.is_(None), Course.deleted_at.is_(None))
+    professor_key = _search_key(Archive.professor)
+    professor_where, professor_score = _match(professor_key, normalized, pattern)
+    professors = (
+        select(
+            literal(SearchHitType.PROFESSOR.value).label("type"),
+            func.min(Archive.professor).label("title"),
+            Course.id.label("course_id"),
+            Course.name.label("course_name"),
+            Course.category.label("course_category"),
+            cast(null(), Integer).label("archive_id"),
+            func.max(professor_score).label("score"),
+        )
+        .join(Course, Course.id == Archive.course_id)
+        .where(*live_archives, professor_where)
+        # Spellings that normalize alike are one professor.
+        .group_by(professor_key, Course.id)
+    )
+
+    archive_where, archive_score = _match(
+        _search_key(Archive.name), normalized, pattern
+    )
+    archives = (
+        select(
+            literal(SearchHitType.ARCHIVE.value).label("type"),
+            Archive.name.label("title"),
+            Course.id.label("course_id"),
+            Course.name.label("course_name"),
+            Course.category.label("course_category"),
+            Archive.id.label("archive_id"),
+            archive_score.label("score"),
+        )
+        .join(Course, Course.id == Archive.course_id)
+        .where(*live_archives, archive_where)
+    )
+
+    hits = union_all(courses, professors, archives).subquery("hits")
+    query = (
+        select(hits)
+        .order_by(
+            hits.c.score.desc(),
+            hits.c.type,
+            hits.c.course_id,
+            hits.c.archive_id,
+            hits.c.title,
+        )
+        .offset(safe_offset)
+        # One extra row tells whether another page follows.
+        .limit(safe_limit + 1)
+    )
+    rows = (await db.execute(query)).mappings().all()
+
+    next_offset = None
+    if len(rows) > safe_limit:
+        rows = rows[:safe_limit]
+        next_offset = safe_offset + safe_limit
+    return SearchResults(
+        hits=[
+            SearchHit(**{**row, "score": round(float(row["score"]), 4)}) for row in rows
+        ],
+        next_offset=next_offset,
+    )
@@ -5,15 +5,29 @@ from fastapi import APIRouter, Depends
 from sqlmodel import func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db.session import get_session
+from app.db.session import get_read_session
 from app.models.models import Archive, Course, User
+from app.utils.activity import FLUSH_BATCH_SIZE as ACTIVITY_BATCH_SIZE
+from app.utils.activity import (
+    activity_values,
+    get_pending_activity,
+    latest_timestamp,
+)
+from app.utils.downloads import FLUSH_BATCH_SIZE as DOWNLOAD_BATCH_SIZE
+from app.utils.downloads import download_values, get_pending_downloads
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def _batches(pending: dict, size: int):
+    items = list(pending.items())
+    for start in range(0, len(items), size):
+        yield dict(items[start : start + size])
+
+
 @router.get("/statistics")
-async def get_system_statistics(db: AsyncSession = Depends(get_session)):
+async def get_system_statistics(db: AsyncSession = Depends(get_read_session)):
     """Get system-wide statistics"""
     try:
         result = await db.execute(
@@ -29,33 +43,63 @@ async def get_system_statistics(db: AsyncSession = Depends(get_session)):
         )
         total_archives = result.scalar()
 
+        # Fold in download counts still buffered in Redis, one batch at a
+        # time so a large backlog never builds an oversized VALUES list.
+        live = Archive.deleted_at.is_(None)
         result = await db.execute(
-            select(func.coalesce(func.sum(Archive.download_count), 0)).where(
-                Archive.deleted_at.is_(None)
-            )
+            select(func.coalesce(func.sum(Archive.download_count), 0)).where(live)
         )
         total_downloads = result.scalar()
-
-        two_hours_ago = datetime.now(timezone.utc) - timedelta(hours=2)
-        result = await db.execute(
-            select(func.count(User.id)).where(
-                User.deleted_at.is_(None),
-                (User.last_login >= two_hours_ago)
-                & ((User.last_logout.is_(None)) | (User.last_logout < User.last_login)),
+        for batch in _batches(await get_pending_downloads(), DOWNLOAD_BATCH_SIZE):
+            buffered = download_values(batch)
+            result = await db.execute(
+                select(func.coalesce(func.sum(buffered.c.downloads), 0))
+                .select_from(buffered)
+                .join(Archive, Archive.id == buffered.c.archive_id)
+                .where(live)
             )
-        )
-        online_users = result.scalar()
+            total_downloads += result.scalar()
 
+        two_hours_ago = datetime.now(timezone.utc) - timedelta(hours=2)
         today_start = datetime.now(timezone.utc).replace(
             hour=0, minute=0, second=0, microsecond=0
         )
-        result = await db.execute(
-            select(func.count(User.id)).where(
-                User.deleted_at.is_(None), User.last_login >= today_start
+
+        def online(last_login, last_logout):
+            return (last_login >= two_hours_ago) & (
+                last_logout.is_(None) | (last_logout < last_login)
             )
+
+        active_users = select(func.count(User.id)).where(User.deleted_at.is_(None))
+        result = await db.execute(
+            active_users.where(online(User.last_login, User.last_logout))
         )
+        online_users = result.scalar()
+        result = await db.execute(active_users.where(User.last_login >= today_start))
         active_today = result.scalar()
 
+        # Fold in login/logout timestamps still buffered in Redis: per batch,
+        # swap each buffered user's stored verdict for the one that includes
+        # the buffered timestamps.
+        for batch in _batches(await get_pending_activity(), ACTIVITY_BATCH_SIZE):
+            buffered = activity_values(batch)
+            last_login = latest_timestamp(User.last_login, buffered.c.last_login)
+            last_logout = latest_timestamp(User.last_logout, buffered.c.last_logout)
+            result = await db.execute(
+                select(
+                    func.count().filter(online(last_login, last_logout))
+                    - func.count().filter(online(User.last_login, User.last_logout)),
+                    func.count().filter(last_login >= today_start)
+                    - func.count().filter(User.last_login >= today_start),
+                )
+                .select_from(User)
+                .join(buffered, buffered.c.user_id == User.id)
+                .where(User.deleted_at.is_(None))
+            )
+            online_delta, active_delta = result.one()
+            online_users += online_delta
+            active_today += active_delta
+
         return {
             "success": True,
             "data": {
@@ -5,7 +5,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.responses import read_columns, row_dicts
 from app.db.session import get_session
+from app.db.writes import insert_returning, update_returning
 from app.models.models import (
     User,
     UserCreate,
@@ -14,7 +16,13 @@ from app.models.models import (
     UserRoles,
     UserUpdate,
 )
-from app.utils.auth import get_current_user, get_password_hash
+from app.utils.auth import (
+    get_current_user,
+    get_password_hash_async,
+    get_request_user,
+    invalidate_principal,
+    revoke_user_tokens,
+)
 
 router = APIRouter()
 
@@ -34,9 +42,10 @@ async def get_users(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
         )
 
-    result = await db.execute(select(User).where(User.deleted_at.is_(None)))
-    users = result.scalars().all()
-    return users
+    result = await db.execute(
+        select(*read_columns(User, UserRead)).where(User.deleted_at.is_(None))
+    )
+    return row_dicts(result)
 
 
 @router.post("/admin/users", response_model=UserRead)
@@ -66,19 +75,19 @@ async def create_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this name already exists",
         )
-    hashed_password = get_password_hash(user_data.password)
-    user = User(
-        name=user_data.name,
-        nickname=user_data.name,
-        email=user_data.email,
-        password_hash=hashed_password,
-        is_admin=user_data.is_admin,
-        is_local=True,
+    hashed_password = await get_password_hash_async(user_data.password)
+    user = await insert_returning(
+        db,
+        User(
+            name=user_data.name,
+            nickname=user_data.name,
+            email=user_data.email,
+            password_hash=hashed_password,
+            is_admin=user_data.is_admin,
+            is_local=True,
+        ),
     )
-
-    db.add(user)
     await db.commit()
-    await db.refresh(user)
 
     return user
 
@@ -88,17 +97,14 @@ async def get_me(
     current_user: UserRoles = Depends(get_current_user),
     db: AsyncSession = Depends(get_session),
 ):
-    user = await db.scalar(
-        select(User).where(User.id == current_user.user_id, User.deleted_at.is_(None))
-    )
+    user = await get_request_user(db, current_user.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
     if not user.nickname:
-        user.nickname = user.name
+        user = await update_returning(db, User, User.id == user.id, nickname=User.name)
         await db.commit()
-        await db.refresh(user)
     return user
 
 
@@ -108,26 +114,27 @@ async def update_my_nickname(
     current_user: UserRoles = Depends(get_current_user),
     db: AsyncSession = Depends(get_session),
 ):
-    user = await db.scalar(
-        select(User).where(User.id == current_user.user_id, User.deleted_at.is_(None))
-    )
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
     nickname = (payload.nickname or "").strip()
-    if not nickname:
-        nickname = user.name
     if len(nickname) > NICKNAME_MAX_LENGTH:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"暱稱超出 {NICKNAME_MAX_LENGTH} 字",
         )
 
-    user.nickname = nickname
+    # An empty nickname resets it to the user's name.
+    user = await update_returning(
+        db,
+        User,
+        User.id == current_user.user_id,
+        User.deleted_at.is_(None),
+        nickname=nickname or User.name,
+    )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+
     await db.commit()
-    await db.refresh(user)
     return user
 
 
@@ -155,6 +162,7 @@ async def update_user(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
+    changes = {}
     if user_data.name is not None:
         result = await db.execute(
             select(User).where(User.name == user_data.name, User.id != user_id)
@@ -164,7 +172,7 @@ async def update_user(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User with this name already exists",
             )
-        user.name = user_data.name
+        changes["name"] = user_data.name
 
     if user_data.email is not None:
         result = await db.execute(
@@ -175,16 +183,18 @@ async def update_user(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User with this email already exists",
             )
-        user.email = user_data.email
+        changes["email"] = user_data.email
 
     if user_data.password is not None:
-        user.password_hash = get_password_hash(user_data.password)
+        changes["password_hash"] = await get_password_hash_async(user_data.password)
 
     if user_data.is_admin is not None:
-        user.is_admin = user_data.is_admin
+        changes["is_admin"] = user_data.is_admin
 
-    await db.commit()
-    await db.refresh(user)
+    if changes:
+        user = await update_returning(db, User, User.id == user_id, **changes)
+        await db.commit()
+    await invalidate_principal(user_id)
 
     return user
 
@@ -218,5 +228,7 @@ async def delete_user(
 
     user.deleted_at = datetime.now(timezone.utc)
     await db.commit()
+    await invalidate_principal(user_id)
+    await revoke_user_tokens(user_id)
 
     return {"detail": "User deleted successfully"}
@@ -7,6 +7,30 @@ class Settings(BaseSettings):
     DB_USER: str
     DB_PASSWORD: str
     DB_NAME: str
+    # Connection pool per process; 4 uvicorn workers + the arq worker each
+    # hold up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_RECYCLE_SECONDS: int = -1
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Optional streaming replica (full SQLAlchemy URL) for read-only endpoints;
+    # reads go back to the primary while its replay lag exceeds the threshold
+    DB_REPLICA_URL: str | None = None
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 2.0
+    # Apply pending Alembic migrations at startup; one worker migrates under
+    # an advisory lock while the others wait. Disable when migrating out of band.
+    RUN_MIGRATIONS_ON_STARTUP: bool = True
+    # Warn when one request runs the same statement shape more than this
+    # many times (likely N+1); 0 disables the check
+    SQL_REPEAT_WARNING_THRESHOLD: int = 10
+    # Opt-in slow-query log (0 disables); a sample of slow SELECTs also gets
+    # EXPLAIN (ANALYZE, BUFFERS), which re-runs the query
+    SLOW_QUERY_THRESHOLD_MS: float = 0
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_LOG_SIZE: int = 200
 
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
@@ -19,6 +43,11 @@ class Settings(BaseSettings):
     OAUTH_REDIRECT_URI: str
     OAUTH_USERINFO_URL: str
     FRONTEND_URL: str
+    OAUTH_HTTP_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    OAUTH_HTTP_READ_TIMEOUT_SECONDS: float = 10.0
+    OAUTH_HTTP_RETRIES: int = 1
+    OAUTH_HTTP_MAX_CONNECTIONS: int = 20
+    OAUTH_HTTP_KEEPALIVE_SECONDS: float = 60.0
 
     MINIO_ENDPOINT: str
     MINIO_ROOT_USER: str
@@ -27,6 +56,18 @@ class Settings(BaseSettings):
     EXTERNAL_ENDPOINT: str
 
     REDIS_URL: str
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 2.0
+
+    # Per-worker cache of tokens already checked against the blacklist
+    TOKEN_CACHE_TTL_SECONDS: int = 30
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    # Per-worker cache of user_id -> (is_admin, active)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+
+    # bcrypt runs in a process pool; extra requests beyond the queue get 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 16
 
     DEFAULT_ADMIN_NAME: str
     DEFAULT_ADMIN_PASSWORD: str
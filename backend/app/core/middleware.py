@@ -0,0 +1,49 @@
+from contextvars import ContextVar
+
+from app.db.instrumentation import QueryStats, current_query_stats, route_stats
+
+# "METHOD /path" of the request being served, for attributing DB work.
+current_request: ContextVar[str | None] = ContextVar("current_request", default=None)
+
+
+class RequestContextMiddleware:
+    """
+    Pure ASGI middleware that records the current request in context
+    variables so lower layers can tag their work: pool checkout hooks use
+    the request label, and the SQL hooks count statements per request.
+    HTTP responses get a ``Server-Timing: db;...`` entry and each request
+    is folded into the per-route aggregates.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "WS")
+        is_http = scope["type"] == "http"
+        # A websocket session legitimately repeats its statements per message.
+        label = f"{method} {scope['path']}"
+        stats = QueryStats(label=label, check_repeats=is_http)
+        request_token = current_request.set(label)
+        stats_token = current_query_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing if is_http else send)
+        finally:
+            current_query_stats.reset(stats_token)
+            current_request.reset(request_token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None)
+            if route_path is not None:
+                route_stats.record(f"{method} {route_path}", stats)
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from sqlalchemy.engine import Result
+
+
+def read_columns(table, read_model: type[BaseModel]) -> list:
+    """
+    Columns of ``table`` named like the fields of ``read_model``, for
+    selects whose rows are serialized as that model.
+    """
+    return [getattr(table, name) for name in read_model.model_fields]
+
+
+def row_dicts(result: Result) -> list[dict]:
+    """
+    Rows of ``result`` as plain dicts keyed by column label, for endpoints
+    whose ``response_model`` validates and serializes them. Zipping the
+    keys with each row is several times cheaper than ``dict(row._mapping)``.
+    """
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
@@ -1,18 +1,29 @@
-import os
-import subprocess
+import asyncio
+import time
 import unicodedata
+from contextlib import asynccontextmanager
 from functools import lru_cache
 from pathlib import Path
 
 import yaml
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
 from sqlmodel import SQLModel, func, select
 
 from app.core.config import settings
 from app.db.session import AsyncSessionLocal, engine
 from app.models.models import Course, CourseCategory, Meme, User
-from app.utils.auth import get_password_hash
+from app.utils.auth import get_password_hash_async
 
 SEED_DATA_PATH = Path(__file__).with_name("seed_data.yaml")
+ALEMBIC_INI_PATH = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Arbitrary application-wide key for pg_advisory_lock ("past" in ASCII).
+MIGRATION_LOCK_KEY = 0x70617374
+# Seconds between attempts to take the migration lock.
+MIGRATION_LOCK_POLL_INTERVAL = 0.5
 
 
 @lru_cache(maxsize=1)
@@ -21,31 +32,79 @@ def load_seed_data():
         return yaml.safe_load(file) or {}
 
 
-async def init_db():
-    # Run Alembic migrations instead of create_all
+def _alembic_config(connection=None) -> Config:
+    config = Config(str(ALEMBIC_INI_PATH))
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_to_head(connection) -> bool:
+    """
+    Apply pending Alembic migrations on ``connection`` (sync, for
+    ``run_sync``). Returns False without touching the schema when the
+    database is already at head.
+    """
+    config = _alembic_config(connection)
+    head_revisions = set(ScriptDirectory.from_config(config).get_heads())
+    current = set(MigrationContext.configure(connection).get_current_heads())
+    # Reading the version table autobegan a transaction; end it so Alembic
+    # manages its own (and can leave it for CREATE INDEX CONCURRENTLY).
+    connection.commit()
+    if current == head_revisions:
+        return False
+    command.upgrade(config, "head")
+    connection.commit()
+    return True
+
+
+@asynccontextmanager
+async def migration_lock(conn):
+    """
+    Hold a session-level advisory lock on ``conn`` so only one process
+    migrates and seeds at a time; the others wait here until it is done.
+    """
+    # Waiting inside pg_advisory_lock would keep the waiter's snapshot open,
+    # and the CREATE INDEX CONCURRENTLY migrations run by the holder wait for
+    # every older snapshot: a deadlock. Polling between transactions holds
+    # none while sleeping.
+    while True:
+        acquired = await conn.scalar(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}
+        )
+        await conn.commit()
+        if acquired:
+            break
+        await asyncio.sleep(MIGRATION_LOCK_POLL_INTERVAL)
     try:
-        # Run alembic upgrade head to apply all migrations
-        result = subprocess.run(
-            ["uv", "run", "alembic", "upgrade", "head"],
-            cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            capture_output=True,
-            text=True,
+        yield
+    finally:
+        await conn.execute(
+            text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY}
         )
-        if result.returncode != 0:
-            print(f"Alembic migration failed: {result.stderr}")
-            # Fallback to create_all if migration fails
-            async with engine.begin() as conn:
-                await conn.run_sync(SQLModel.metadata.create_all)
-                await conn.commit()
-        else:
-            print("Database migrations applied successfully")
-    except Exception as e:
-        print(f"Error running migrations: {e}")
-        # Fallback to create_all
-        async with engine.begin() as conn:
-            await conn.run_sync(SQLModel.metadata.create_all)
-            await conn.commit()
+        await conn.commit()
+
+
+async def init_db():
+    started = time.perf_counter()
+    async with engine.connect() as conn:
+        async with migration_lock(conn):
+            if settings.RUN_MIGRATIONS_ON_STARTUP:
+                try:
+                    if await conn.run_sync(upgrade_to_head):
+                        print("Database migrations applied successfully")
+                except Exception as e:
+                    print(f"Alembic migration failed: {e}")
+                    # Fallback to create_all if migration fails
+                    await conn.rollback()
+                    await conn.run_sync(SQLModel.metadata.create_all)
+                    await conn.commit()
+            await seed_db()
+    print(f"Database ready in {time.perf_counter() - started:.2f}s")
+
 
+async def seed_db():
     async with AsyncSessionLocal() as session:
         result = await session.execute(
             select(User).where(User.name == settings.DEFAULT_ADMIN_NAME)
@@ -54,7 +113,7 @@ async def init_db():
 
         if admin_user and getattr(admin_user, "deleted_at", None) is not None:
             admin_user.deleted_at = None
-            admin_user.password_hash = get_password_hash(
+            admin_user.password_hash = await get_password_hash_async(
                 settings.DEFAULT_ADMIN_PASSWORD
             )
             admin_user.is_local = True
@@ -65,7 +124,9 @@ async def init_db():
             admin_user = User(
                 name=settings.DEFAULT_ADMIN_NAME,
                 email=settings.DEFAULT_ADMIN_EMAIL,
-                password_hash=get_password_hash(settings.DEFAULT_ADMIN_PASSWORD),
+                password_hash=await get_password_hash_async(
+                    settings.DEFAULT_ADMIN_PASSWORD
+                ),
                 is_local=True,
                 is_admin=True,
             )
@@ -0,0 +1,175 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.db.slow_queries import slow_query_log
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r"(\$\d+|%\(\w+\)s|\?)(::[A-Z][A-Z ]*(\[\])?)?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Statement shape: bind placeholders and their casts become ``?``, IN lists
+    collapse to ``(?)`` and whitespace is squeezed, so the same query with
+    different parameters maps to one key.
+    """
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """
+    Statements executed while serving one request.
+    """
+
+    def __init__(self, label: str | None = None, check_repeats: bool = True):
+        self.label = label
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql: str | None = None
+        self.shapes: Counter[str] = Counter()
+        self.check_repeats = check_repeats
+        self.repeated: set[str] = set()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        shape = normalize_sql(statement)
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_sql = shape
+
+        self.shapes[shape] += 1
+        threshold = settings.SQL_REPEAT_WARNING_THRESHOLD
+        if (
+            self.check_repeats
+            and threshold > 0
+            and self.shapes[shape] > threshold
+            and shape not in self.repeated
+        ):
+            self.repeated.add(shape)
+            logger.warning(
+                "Possible N+1: statement repeated more than %s times in one "
+                "request: %s",
+                threshold,
+                shape[:500],
+            )
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_ms:.1f};desc="{self.count} queries"'
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+class RouteStats:
+    """
+    Per-route totals of the requests served by this process.
+    """
+
+    def __init__(self):
+        self._routes: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, stats: QueryStats) -> None:
+        with self._lock:
+            entry = self._routes.setdefault(
+                route,
+                {
+                    "requests": 0,
+                    "queries": 0,
+                    "db_ms": 0.0,
+                    "max_queries": 0,
+                    "slowest_ms": 0.0,
+                    "slowest_sql": None,
+                    "repeat_warnings": 0,
+                },
+            )
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["db_ms"] += stats.total_ms
+            entry["max_queries"] = max(entry["max_queries"], stats.count)
+            entry["repeat_warnings"] += len(stats.repeated)
+            if stats.slowest_ms > entry["slowest_ms"]:
+                entry["slowest_ms"] = stats.slowest_ms
+                entry["slowest_sql"] = stats.slowest_sql
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            routes = [
+                {
+                    "route": route,
+                    **entry,
+                    "avg_queries": round(entry["queries"] / entry["requests"], 2),
+                    "avg_db_ms": round(entry["db_ms"] / entry["requests"], 3),
+                    "db_ms": round(entry["db_ms"], 3),
+                    "slowest_ms": round(entry["slowest_ms"], 3),
+                }
+                for route, entry in self._routes.items()
+            ]
+        return sorted(routes, key=lambda item: item["db_ms"], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+route_stats = RouteStats()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold > 0 and elapsed_ms >= threshold and not executemany:
+        slow_query_log.record(
+            conn,
+            statement,
+            parameters,
+            normalize_sql(statement),
+            elapsed_ms,
+            stats.label if stats is not None else None,
+        )
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+
+
+def install() -> None:
+    """
+    Time every statement on every engine (primary, replica and the
+    per-test engines alike). Idempotent.
+    """
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
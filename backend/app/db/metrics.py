@@ -0,0 +1,171 @@
+import asyncio
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+from app.core.middleware import current_request
+
+# Upper bounds in milliseconds; the last bucket catches everything above.
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram in milliseconds.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.reset()
+
+    def reset(self) -> None:
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class PoolMetrics:
+    """
+    Checkout wait/hold times, timeouts and current holders of one engine's
+    pool. Counters are per process, like the pool itself.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine = None
+        self.wait = Histogram()
+        self.hold = Histogram()
+        self.timeouts = 0
+        self.checkouts = 0
+        self.holders: dict[int, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.wait.reset()
+            self.hold.reset()
+            self.timeouts = 0
+            self.checkouts = 0
+
+    def record_wait(self, elapsed_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait.observe(elapsed_ms)
+            if timed_out:
+                self.timeouts += 1
+
+    def on_checkout(self, _dbapi_conn, connection_record, _proxy) -> None:
+        holder = current_request.get()
+        if holder is None:
+            try:
+                holder = f"task {asyncio.current_task().get_name()}"
+            except RuntimeError:
+                holder = f"thread {threading.current_thread().name}"
+        with self._lock:
+            self.checkouts += 1
+            self.holders[id(connection_record)] = (holder, time.monotonic())
+
+    def on_checkin(self, _dbapi_conn, connection_record) -> None:
+        with self._lock:
+            entry = self.holders.pop(id(connection_record), None)
+            if entry is not None:
+                self.hold.observe((time.monotonic() - entry[1]) * 1000)
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool if self.engine is not None else None
+        now = time.monotonic()
+        with self._lock:
+            holders = sorted(
+                (
+                    {"holder": holder, "held_ms": round((now - since) * 1000, 1)}
+                    for holder, since in self.holders.values()
+                ),
+                key=lambda item: item["held_ms"],
+                reverse=True,
+            )
+            data = {
+                "name": self.name,
+                "pid": os.getpid(),
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms": self.wait.snapshot(),
+                "hold_ms": self.hold.snapshot(),
+                "holders": holders,
+            }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            data.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                # Both engines are built from these settings.
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                timeout_seconds=pool.timeout(),
+            )
+        return data
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited for a connection.
+    """
+
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        if self.metrics is None:
+            return super()._do_get()
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.metrics.record_wait((time.perf_counter() - start) * 1000, timed_out)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+pool_metrics: dict[str, PoolMetrics] = {}
+
+
+def instrument_engine(engine, name: str) -> PoolMetrics:
+    """
+    Attach checkout/checkin hooks to ``engine`` and register its metrics
+    under ``name`` for the admin metrics endpoint.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    metrics = PoolMetrics(name)
+    metrics.engine = sync_engine
+    if isinstance(sync_engine.pool, InstrumentedAsyncAdaptedQueuePool):
+        sync_engine.pool.metrics = metrics
+    event.listen(sync_engine, "checkout", metrics.on_checkout)
+    event.listen(sync_engine, "checkin", metrics.on_checkin)
+    pool_metrics[name] = metrics
+    return metrics
@@ -1,18 +1,116 @@
+import logging
+import time
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db import instrumentation
+from app.db.metrics import InstrumentedAsyncAdaptedQueuePool, instrument_engine
+
+logger = logging.getLogger(__name__)
+
+instrumentation.install()
+
+
+def _create_engine(url: str, name: str):
+    engine = create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        connect_args={"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    )
+    instrument_engine(engine, name)
+    return engine
+
 
-engine = create_async_engine(
+engine = _create_engine(
     f"postgresql+asyncpg://{settings.DB_USER}:{settings.DB_PASSWORD}@"
     f"{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}",
-    echo=False,
-    future=True
+    "primary",
 )
 
 AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
+replica_engine = (
+    _create_engine(settings.DB_REPLICA_URL, "replica")
+    if settings.DB_REPLICA_URL
+    else None
+)
+ReadSessionLocal = (
+    sessionmaker(bind=replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None
+    else None
+)
+
+# Replay lag is 0 when the replica has applied everything it received, so an
+# idle primary does not make a caught-up replica look stale. That only holds
+# while the WAL receiver is streaming: a disconnected replica has also applied
+# all it received, so it reports NULL (unknown lag) instead. Roles without
+# pg_read_all_stats see the receiver's pid but not its status; for them a
+# running receiver is taken as streaming.
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver"
+    " WHERE COALESCE(status, 'streaming') = 'streaming') THEN NULL"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE("
+    "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+# (checked_at, replica usable) for this process
+_replica_status: tuple[float, bool] = (0.0, False)
+
+
+async def _replica_lag_seconds() -> float | None:
+    """
+    Replay lag of the replica, or None when it is not streaming WAL.
+    """
+    async with ReadSessionLocal() as session:
+        result = await session.execute(REPLICA_LAG_QUERY)
+        lag = result.scalar()
+        return None if lag is None else float(lag)
+
+
+async def replica_is_fresh() -> bool:
+    """
+    Whether reads may go to the replica. The lag is re-checked at most every
+    DB_REPLICA_LAG_CHECK_INTERVAL_SECONDS; an unreachable replica, or one
+    whose WAL receiver is not streaming, counts as stale.
+    """
+    global _replica_status
+    if ReadSessionLocal is None:
+        return False
+    checked_at, fresh = _replica_status
+    now = time.monotonic()
+    if now - checked_at < settings.DB_REPLICA_LAG_CHECK_INTERVAL_SECONDS:
+        return fresh
+
+    try:
+        lag = await _replica_lag_seconds()
+        if lag is None:
+            fresh = False
+            logger.warning("Replica is not streaming WAL, reading from primary")
+        else:
+            fresh = lag <= settings.DB_REPLICA_MAX_LAG_SECONDS
+            if not fresh:
+                logger.warning("Replica lag %.1fs, reading from primary", lag)
+    except Exception:
+        logger.warning("Replica lag check failed, reading from primary", exc_info=True)
+        fresh = False
+    _replica_status = (now, fresh)
+    return fresh
+
 
 async def get_session() -> AsyncSession:
     async with AsyncSessionLocal() as session:
@@ -20,3 +118,18 @@ async def get_session() -> AsyncSession:
             yield session
         finally:
             await session.close()
+
+
+async def get_read_session() -> AsyncSession:
+    """
+    Session for read-only endpoints: the replica when one is configured and
+    caught up, otherwise the primary.
+    """
+    session_factory = AsyncSessionLocal
+    if await replica_is_fresh():
+        session_factory = ReadSessionLocal
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,106 @@
+import logging
+import random
+import re
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXT_LENGTH = 4000
+# SELECTs with side effects that EXPLAIN ANALYZE must not run a second time.
+_SIDE_EFFECTS = re.compile(
+    r"\b(nextval|setval|pg_advisory\w*|pg_notify|pg_sleep)\s*\(", re.IGNORECASE
+)
+EXPLAIN_OPTIONS = "ANALYZE, BUFFERS"
+_EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+
+def _truncate(value: str) -> str:
+    if len(value) <= MAX_TEXT_LENGTH:
+        return value
+    return value[:MAX_TEXT_LENGTH] + "...[truncated]"
+
+
+class SlowQueryLog:
+    """
+    Ring buffer of statements slower than SLOW_QUERY_THRESHOLD_MS in this
+    process. A sample of slow SELECTs is re-run under
+    ``EXPLAIN (ANALYZE, BUFFERS)`` on the same connection to capture the plan;
+    writes are never re-executed.
+    """
+
+    def __init__(self, maxsize: int):
+        self._entries: deque[dict] = deque(maxlen=maxsize)
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        conn,
+        statement: str,
+        parameters,
+        shape: str,
+        elapsed_ms: float,
+        route: str | None,
+    ) -> None:
+        plan = None
+        if (
+            statement.lstrip()[:6].upper() == "SELECT"
+            and not _SIDE_EFFECTS.search(statement)
+            and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+        ):
+            plan = self._explain(conn, statement, parameters)
+
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s", elapsed_ms, route or "-", shape[:500]
+        )
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "route": route,
+            "duration_ms": round(elapsed_ms, 3),
+            "sql": shape,
+            "parameters": _truncate(repr(parameters)),
+            "plan": plan,
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+    @staticmethod
+    def _explain(conn, statement: str, parameters) -> str | None:
+        # A fresh DBAPI cursor bypasses the engine events, so the EXPLAIN is
+        # neither timed nor logged itself. It runs in the request's
+        # transaction, so a failure (a timeout, a cancel) is rolled back to a
+        # savepoint rather than aborting the statements that follow.
+        try:
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(f"SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+                try:
+                    cursor.execute(
+                        f"EXPLAIN ({EXPLAIN_OPTIONS}) {statement}", parameters or ()
+                    )
+                    rows = cursor.fetchall()
+                except Exception:
+                    cursor.execute(f"ROLLBACK TO SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+                    raise
+                finally:
+                    cursor.execute(f"RELEASE SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+                return _truncate("\n".join(row[0] for row in rows))
+            finally:
+                cursor.close()
+        except Exception:
+            logger.warning("Failed to capture plan for slow query", exc_info=True)
+            return None
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE)
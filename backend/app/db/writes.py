@@ -0,0 +1,42 @@
+from typing import Any, TypeVar
+
+from sqlalchemy import insert, update
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+ModelT = TypeVar("ModelT", bound=SQLModel)
+
+
+async def insert_returning(db: AsyncSession, instance: ModelT) -> ModelT:
+    """
+    Insert an unsaved model instance with ``INSERT ... RETURNING`` and return
+    the stored row as a persistent object, so no refresh is needed after the
+    commit. Unset columns fall back to their column defaults.
+    """
+    model = type(instance)
+    values = {
+        field: value
+        for field in model.model_fields
+        if (value := getattr(instance, field, None)) is not None
+    }
+    statement = insert(model).values(**values).returning(model)
+    return (await db.execute(statement)).scalar_one()
+
+
+async def update_returning(
+    db: AsyncSession, model: type[ModelT], *where: Any, **values: Any
+) -> ModelT | None:
+    """
+    Apply ``values`` to the row matching ``where`` with a single
+    ``UPDATE ... RETURNING`` and return it, or None when nothing matched.
+    Values may be SQL expressions (``Archive.download_count + 1``). An
+    instance of the row already in the session is refreshed in place.
+    """
+    statement = (
+        update(model)
+        .where(*where)
+        .values(**values)
+        .returning(model)
+        .execution_options(populate_existing=True)
+    )
+    return (await db.execute(statement)).scalar_one_or_none()
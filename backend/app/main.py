@@ -1,10 +1,20 @@
+import asyncio
+import contextlib
+
 from fastapi import FastAPI
 # from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from app.core.config import settings
+from app.core.middleware import RequestContextMiddleware
 from app.api.api import api_router
 from app.db.init_db import init_db
+from app.services.auth import close_oauth_http_client
+from app.utils.auth import (
+    listen_for_invalidations,
+    shutdown_hash_executor,
+    start_hash_executor,
+)
 
 app = FastAPI(title="Past Exam API", docs_url=None, redoc_url=None)
 
@@ -21,10 +31,24 @@ app.add_middleware(
     secret_key=settings.SECRET_KEY,
     max_age=3600
 )
+app.add_middleware(RequestContextMiddleware)
 
 app.include_router(api_router)
 
 
 @app.on_event("startup")
 async def on_startup():
+    await start_hash_executor()
     await init_db()
+    app.state.invalidation_listener = asyncio.create_task(listen_for_invalidations())
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    listener = getattr(app.state, "invalidation_listener", None)
+    if listener:
+        listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await listener
+    shutdown_hash_executor()
+    await close_oauth_http_client()
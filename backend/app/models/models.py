@@ -1,11 +1,31 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from enum import Enum as PyEnum
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 
 from pydantic import BaseModel
-from sqlalchemy import Column, DateTime, String, Text
+from sqlalchemy import DDL, Column, DateTime, Index, String, Text, event, text
 from sqlmodel import Field, Relationship, SQLModel
 
+# /search matches on NFKC-normalized, lower-cased text through pg_trgm GIN
+# indexes on this expression; queries must use the identical expression.
+SEARCH_KEY_SQL = "lower(normalize({column}, NFKC))"
+
+
+def _trigram_index(name: str, column: str) -> Index:
+    return Index(
+        name,
+        text(f"{SEARCH_KEY_SQL.format(column=column)} gin_trgm_ops"),
+        postgresql_using="gin",
+        postgresql_where=text("deleted_at IS NULL"),
+    )
+
+
+event.listen(
+    SQLModel.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
+
 
 class CourseCategory(str, PyEnum):
     FRESHMAN = "freshman"
@@ -31,6 +51,9 @@ class NotificationSeverity(str, PyEnum):
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_oauth_provider_oauth_sub", "oauth_provider", "oauth_sub"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     oauth_provider: Optional[str] = Field(default=None)
     oauth_sub: Optional[str] = Field(default=None)
@@ -56,6 +79,16 @@ class User(SQLModel, table=True):
 
 class Course(SQLModel, table=True):
     __tablename__ = "courses"
+    __table_args__ = (
+        Index(
+            "uq_courses_name_category_active",
+            "name",
+            "category",
+            unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        _trigram_index("ix_courses_name_trgm", "name"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True)
     category: CourseCategory
@@ -68,6 +101,25 @@ class Course(SQLModel, table=True):
 
 class Archive(SQLModel, table=True):
     __tablename__ = "archives"
+    __table_args__ = (
+        Index(
+            "ix_archives_course_id_created_at_id_active",
+            "course_id",
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_archives_course_id_professor_created_at_id_active",
+            "course_id",
+            "professor",
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        _trigram_index("ix_archives_name_trgm", "name"),
+        _trigram_index("ix_archives_professor_trgm", "professor"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
 
     name: str
@@ -104,8 +156,73 @@ class Archive(SQLModel, table=True):
     )
 
 
+class DownloadCountFlush(SQLModel, table=True):
+    """
+    Buffered download count snapshots already added to ``archives``.
+    """
+
+    __tablename__ = "download_count_flushes"
+    id: str = Field(primary_key=True)
+    flushed_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            default=lambda: datetime.now(timezone.utc),
+            nullable=False,
+        )
+    )
+
+
+class ArchiveDownloadEvent(SQLModel, table=True):
+    """
+    Downloads of one archive within one minute, flushed from Redis. Range
+    partitioned by month on ``bucket``; rows outside every monthly partition
+    land in the default one.
+    """
+
+    __tablename__ = "archive_download_events"
+    __table_args__ = {"postgresql_partition_by": "RANGE (bucket)"}
+    bucket: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), primary_key=True)
+    )
+    archive_id: int = Field(primary_key=True)
+    downloads: int
+
+
+event.listen(
+    ArchiveDownloadEvent.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS archive_download_events_default "
+        "PARTITION OF archive_download_events DEFAULT"
+    ),
+)
+
+
+class ArchiveDownloadDaily(SQLModel, table=True):
+    __tablename__ = "archive_downloads_daily"
+    day: date = Field(primary_key=True)
+    archive_id: int = Field(primary_key=True)
+    downloads: int
+
+
+class ArchiveDownloadWeekly(SQLModel, table=True):
+    __tablename__ = "archive_downloads_weekly"
+    # Monday of the ISO week
+    week: date = Field(primary_key=True)
+    archive_id: int = Field(primary_key=True)
+    downloads: int
+
+
 class ArchiveDiscussionMessage(SQLModel, table=True):
     __tablename__ = "archive_discussion_messages"
+    __table_args__ = (
+        Index(
+            "ix_archive_discussion_messages_archive_id_id_active",
+            "archive_id",
+            text("id DESC"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     archive_id: int = Field(foreign_key="archives.id", index=True)
     user_id: int = Field(foreign_key="users.id", index=True)
@@ -276,6 +393,43 @@ class ArchiveRead(BaseModel):
         from_attributes = True
 
 
+class FacetCount(BaseModel):
+    value: Union[bool, int, str]
+    count: int
+
+
+class CourseFacets(BaseModel):
+    total: int
+    professor: List[FacetCount] = []
+    academic_year: List[FacetCount] = []
+    archive_type: List[FacetCount] = []
+    has_answers: List[FacetCount] = []
+
+
+class ArchiveUrlPurpose(str, PyEnum):
+    PREVIEW = "preview"
+    DOWNLOAD = "download"
+
+
+class ArchiveUrlBatchRequest(BaseModel):
+    archive_ids: List[int]
+    purpose: ArchiveUrlPurpose = ArchiveUrlPurpose.DOWNLOAD
+
+
+class ArchiveUrlBatchResponse(BaseModel):
+    urls: Dict[int, str]
+    missing: List[int] = []
+
+
+class TrendingArchive(BaseModel):
+    id: int
+    name: str
+    course_id: int
+    course_name: str
+    course_category: CourseCategory
+    score: float
+
+
 class ArchiveDiscussionMessageRead(BaseModel):
     id: int
     archive_id: int
@@ -313,6 +467,64 @@ class ArchiveUpdateCourse(BaseModel):
     course_category: Optional[CourseCategory] = None
 
 
+class ArchiveBulkAction(str, PyEnum):
+    MOVE = "move"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class ArchiveBulkOperation(BaseModel):
+    action: ArchiveBulkAction
+    archive_id: int
+    # move
+    course_id: Optional[int] = None
+    # update
+    name: Optional[str] = None
+    professor: Optional[str] = None
+    archive_type: Optional[ArchiveType] = None
+    has_answers: Optional[bool] = None
+    academic_year: Optional[int] = None
+
+
+class ArchiveBulkRequest(BaseModel):
+    operations: List[ArchiveBulkOperation]
+
+
+class ArchiveBulkResult(BaseModel):
+    index: int
+    archive_id: int
+    action: ArchiveBulkAction
+    success: bool
+    detail: Optional[str] = None
+
+
+class ArchiveBulkResponse(BaseModel):
+    applied: int
+    failed: int
+    results: List[ArchiveBulkResult]
+
+
+class SearchHitType(str, PyEnum):
+    COURSE = "course"
+    PROFESSOR = "professor"
+    ARCHIVE = "archive"
+
+
+class SearchHit(BaseModel):
+    type: SearchHitType
+    title: str
+    course_id: int
+    course_name: str
+    course_category: CourseCategory
+    archive_id: Optional[int] = None
+    score: float
+
+
+class SearchResults(BaseModel):
+    hits: List[SearchHit]
+    next_offset: Optional[int] = None
+
+
 # AI Exam related models
 
 
@@ -0,0 +1,126 @@
+"""
+Login burst benchmark.
+
+Fires a burst of concurrent /auth/login requests against the app in-process
+while probing an unrelated endpoint (/meme) and reports login throughput and
+probe latency percentiles. Run from the backend directory against a database
+that has been migrated and seeded:
+
+    uv run python -m app.scripts.bench_login --logins 64 --concurrency 16
+    uv run python -m app.scripts.bench_login --inline   # hash on the event loop
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete
+
+from app.db.session import AsyncSessionLocal
+from app.main import app
+from app.models.models import User
+from app.utils import auth as auth_utils
+
+PASSWORD = "BenchPassword123!"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(logins: int, concurrency: int, inline: bool):
+    if inline:
+        # Previous behaviour: bcrypt runs directly on the event loop.
+        async def run_inline(func, *args):
+            return func(*args)
+
+        auth_utils._run_hash_job = run_inline
+
+    name = f"bench-{uuid.uuid4().hex[:8]}"
+    async with AsyncSessionLocal() as session:
+        user = User(
+            name=name,
+            email=f"{name}@example.com",
+            password_hash=auth_utils.get_password_hash(PASSWORD),
+            is_local=True,
+        )
+        session.add(user)
+        await session.commit()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up the pool processes and DB connections.
+        await client.post("/auth/login", data={"username": name, "password": PASSWORD})
+        await client.get("/meme")
+
+        login_latencies: list[float] = []
+        probe_latencies: list[float] = []
+        statuses: dict[int, int] = {}
+        semaphore = asyncio.Semaphore(concurrency)
+        done = asyncio.Event()
+
+        async def login_once():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/auth/login", data={"username": name, "password": PASSWORD}
+                )
+                login_latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = (
+                    statuses.get(response.status_code, 0) + 1
+                )
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/meme")
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login_once() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(User).where(User.name == name))
+        await session.commit()
+    auth_utils.shutdown_hash_executor()
+
+    mode = "inline" if inline else f"pool({auth_utils.settings.PASSWORD_HASH_WORKERS})"
+    print(f"mode={mode} logins={logins} concurrency={concurrency}")
+    print(f"  statuses: {statuses}")
+    print(f"  login throughput: {logins / elapsed:.1f}/s over {elapsed:.2f}s")
+    print(
+        "  login latency ms: "
+        f"p50={percentile(login_latencies, 50) * 1000:.0f} "
+        f"p99={percentile(login_latencies, 99) * 1000:.0f}"
+    )
+    print(
+        f"  /meme latency ms ({len(probe_latencies)} probes): "
+        f"p50={statistics.median(probe_latencies) * 1000:.1f} "
+        f"p99={percentile(probe_latencies, 99) * 1000:.1f} "
+        f"max={max(probe_latencies) * 1000:.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--inline", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.concurrency, args.inline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+List serialization benchmark.
+
+Compares the old way of serving an archive listing (ORM entities validated
+into ArchiveRead one by one, then jsonable_encoder and json.dumps) with
+column-only selects whose row dicts the ``response_model`` validates and
+dumps to JSON in one step, as FastAPI does for endpoints returning them.
+Reports the cost per 1k rows, split into fetching (query plus building the
+row objects) and serializing the response body. Run from the backend
+directory against a migrated database:
+
+    uv run python -m app.scripts.bench_serialization --rows 1000 --iterations 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import delete, insert
+from sqlmodel import select
+
+from app.core.responses import read_columns, row_dicts
+from app.db.session import AsyncSessionLocal, engine
+from app.db.writes import insert_returning
+from app.models.models import (
+    Archive,
+    ArchiveRead,
+    ArchiveType,
+    Course,
+    CourseCategory,
+)
+
+
+async def fetch_orm(course_id: int):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Archive)
+            .where(Archive.course_id == course_id, Archive.deleted_at.is_(None))
+            .order_by(Archive.created_at.desc(), Archive.id.desc())
+        )
+        return result.scalars().all()
+
+
+def serialize_orm(archives) -> bytes:
+    reads = [ArchiveRead.model_validate(archive) for archive in archives]
+    return JSONResponse(content=jsonable_encoder(reads)).body
+
+
+async def fetch_columns(course_id: int):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(*read_columns(Archive, ArchiveRead))
+            .where(Archive.course_id == course_id, Archive.deleted_at.is_(None))
+            .order_by(Archive.created_at.desc(), Archive.id.desc())
+        )
+        return row_dicts(result)
+
+
+ARCHIVE_LIST = TypeAdapter(list[ArchiveRead])
+
+
+def serialize_columns(rows) -> bytes:
+    return ARCHIVE_LIST.dump_json(ARCHIVE_LIST.validate_python(rows))
+
+
+async def measure(name: str, fetch, serialize, course_id: int, rows: int, n: int):
+    serialize(await fetch(course_id))  # warm up
+    fetches: list[float] = []
+    serializations: list[float] = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fetched = await fetch(course_id)
+        fetched_at = time.perf_counter()
+        body = serialize(fetched)
+        done = time.perf_counter()
+        fetches.append((fetched_at - start) * 1000)
+        serializations.append((done - fetched_at) * 1000)
+    per_1k = 1000 / rows
+    fetch_ms = statistics.median(fetches) * per_1k
+    serialize_ms = statistics.median(serializations) * per_1k
+    print(
+        f"{name:<20} per 1k rows: fetch={fetch_ms:.3f}ms "
+        f"serialize={serialize_ms:.3f}ms total={fetch_ms + serialize_ms:.3f}ms "
+        f"body={len(body) * per_1k / 1024:.1f}KiB"
+    )
+
+
+async def run(rows: int, iterations: int):
+    tag = uuid.uuid4().hex[:8]
+    async with AsyncSessionLocal() as db:
+        course = await insert_returning(
+            db, Course(name=f"bench-{tag}", category=CourseCategory.GENERAL)
+        )
+        await db.execute(
+            insert(Archive),
+            [
+                {
+                    "name": f"bench {index}",
+                    "academic_year": 2000 + index % 25,
+                    "archive_type": ArchiveType.FINAL,
+                    "professor": f"professor {index % 40}",
+                    "has_answers": index % 2 == 0,
+                    "object_name": f"bench/{tag}/{index}.pdf",
+                    "course_id": course.id,
+                    "download_count": index,
+                }
+                for index in range(rows)
+            ],
+        )
+        await db.commit()
+
+    try:
+        await measure(
+            "orm + jsonable", fetch_orm, serialize_orm, course.id, rows, iterations
+        )
+        await measure(
+            "columns + model",
+            fetch_columns,
+            serialize_columns,
+            course.id,
+            rows,
+            iterations,
+        )
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Archive).where(Archive.course_id == course.id))
+            await db.execute(delete(Course).where(Course.id == course.id))
+            await db.commit()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Write round-trip benchmark.
+
+Compares the old load/commit/refresh pattern with the single-statement
+RETURNING helpers for the two most common mutations (bumping an archive's
+download counter and editing a notification). Reports SQL statements and
+latency per mutation; each transaction also pays one BEGIN and one COMMIT
+that are not counted as statements. Run from the backend directory against
+a migrated database:
+
+    uv run python -m app.scripts.bench_writes --iterations 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import delete
+from sqlmodel import select
+
+from app.db.instrumentation import QueryStats, current_query_stats
+from app.db.session import AsyncSessionLocal, engine
+from app.db.writes import insert_returning, update_returning
+from app.models.models import (
+    Archive,
+    ArchiveType,
+    Course,
+    CourseCategory,
+    Notification,
+)
+
+
+async def download_refresh(archive_id: int):
+    async with AsyncSessionLocal() as db:
+        archive = (
+            await db.execute(
+                select(Archive).where(
+                    Archive.id == archive_id, Archive.deleted_at.is_(None)
+                )
+            )
+        ).scalar_one()
+        archive.download_count += 1
+        await db.commit()
+        await db.refresh(archive)
+
+
+async def download_returning(archive_id: int):
+    async with AsyncSessionLocal() as db:
+        await update_returning(
+            db,
+            Archive,
+            Archive.id == archive_id,
+            Archive.deleted_at.is_(None),
+            download_count=Archive.download_count + 1,
+        )
+        await db.commit()
+
+
+async def notification_refresh(notification_id: int):
+    async with AsyncSessionLocal() as db:
+        notification = (
+            await db.execute(
+                select(Notification).where(Notification.id == notification_id)
+            )
+        ).scalar_one()
+        notification.title = uuid.uuid4().hex
+        notification.updated_at = datetime.now(timezone.utc)
+        await db.commit()
+        await db.refresh(notification)
+
+
+async def notification_returning(notification_id: int):
+    async with AsyncSessionLocal() as db:
+        await update_returning(
+            db,
+            Notification,
+            Notification.id == notification_id,
+            title=uuid.uuid4().hex,
+            updated_at=datetime.now(timezone.utc),
+        )
+        await db.commit()
+
+
+async def measure(name: str, mutation, target_id: int, iterations: int):
+    await mutation(target_id)  # warm up
+    latencies: list[float] = []
+    statements = 0
+    for _ in range(iterations):
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            await mutation(target_id)
+        finally:
+            current_query_stats.reset(token)
+        latencies.append((time.perf_counter() - start) * 1000)
+        statements += stats.count
+    print(
+        f"{name:<24} statements/op={statements / iterations:.1f} "
+        f"mean={statistics.mean(latencies):.3f}ms "
+        f"median={statistics.median(latencies):.3f}ms"
+    )
+
+
+async def run(iterations: int):
+    tag = uuid.uuid4().hex[:8]
+    async with AsyncSessionLocal() as db:
+        course = await insert_returning(
+            db, Course(name=f"bench-{tag}", category=CourseCategory.GENERAL)
+        )
+        archive = await insert_returning(
+            db,
+            Archive(
+                name="bench",
+                academic_year=2024,
+                archive_type=ArchiveType.FINAL,
+                professor="bench",
+                object_name=f"bench/{tag}.pdf",
+                course_id=course.id,
+            ),
+        )
+        notification = await insert_returning(
+            db, Notification(title="bench", body="bench")
+        )
+        await db.commit()
+
+    try:
+        await measure("download (refresh)", download_refresh, archive.id, iterations)
+        await measure(
+            "download (returning)", download_returning, archive.id, iterations
+        )
+        await measure(
+            "notification (refresh)", notification_refresh, notification.id, iterations
+        )
+        await measure(
+            "notification (returning)",
+            notification_returning,
+            notification.id,
+            iterations,
+        )
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Archive).where(Archive.id == archive.id))
+            await db.execute(delete(Course).where(Course.id == course.id))
+            await db.execute(
+                delete(Notification).where(Notification.id == notification.id)
+            )
+            await db.commit()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
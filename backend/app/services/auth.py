@@ -1,10 +1,64 @@
 import hmac
+import logging
+import time
 
 import httpx
 from fastapi import HTTPException
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+_http_client = None
+
+
+def get_oauth_http_client() -> httpx.AsyncClient:
+    """
+    Shared keep-alive client for the OAuth provider, so logins reuse pooled
+    connections instead of paying DNS, TCP and TLS setup on every call.
+    """
+    global _http_client
+    if _http_client is None:
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=settings.OAUTH_HTTP_RETRIES,
+            limits=httpx.Limits(
+                max_connections=settings.OAUTH_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=settings.OAUTH_HTTP_KEEPALIVE_SECONDS,
+            ),
+        )
+        _http_client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(
+                settings.OAUTH_HTTP_READ_TIMEOUT_SECONDS,
+                connect=settings.OAUTH_HTTP_CONNECT_TIMEOUT_SECONDS,
+            ),
+        )
+    return _http_client
+
+
+async def close_oauth_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def _send_with_retry(send):
+    """
+    Retry a request whose pooled connection was reset by the server.
+    Connect failures are already retried by the transport. Only for
+    idempotent requests: a reset can come after the request was sent.
+    """
+    attempts = settings.OAUTH_HTTP_RETRIES + 1
+    for attempt in range(attempts):
+        try:
+            return await send()
+        except (httpx.RemoteProtocolError, httpx.ReadError):
+            if attempt == attempts - 1:
+                raise
+            logger.info("OAuth connection reset, retrying (attempt %s)", attempt + 2)
+
 
 async def oauth_callback(code: str, state: str = None, stored_state: str = None):
     """
@@ -12,22 +66,32 @@ async def oauth_callback(code: str, state: str = None, stored_state: str = None)
     """
     if not state or not stored_state or not hmac.compare_digest(state, stored_state):
         raise HTTPException(status_code=400, detail="Invalid state parameter")
+
+    client = get_oauth_http_client()
+    timings = {}
+
+    start = time.perf_counter()
     try:
-        async with httpx.AsyncClient() as client:
-            token_resp = await client.post(
-                settings.OAUTH_TOKEN_URL,
-                data={
-                    "grant_type": "authorization_code",
-                    "code": code,
-                    "client_id": settings.OAUTH_CLIENT_ID,
-                    "client_secret": settings.OAUTH_CLIENT_SECRET,
-                    "redirect_uri": settings.OAUTH_REDIRECT_URI,
-                },
-            )
+        # Not retried after a reset: the provider may already have redeemed
+        # the single-use code, and a retry would fail with invalid_grant.
+        # The transport still retries connect failures, which happen before
+        # anything is sent.
+        token_resp = await client.post(
+            settings.OAUTH_TOKEN_URL,
+            data={
+                "grant_type": "authorization_code",
+                "code": code,
+                "client_id": settings.OAUTH_CLIENT_ID,
+                "client_secret": settings.OAUTH_CLIENT_SECRET,
+                "redirect_uri": settings.OAUTH_REDIRECT_URI,
+            },
+        )
     except httpx.RequestError as e:
         raise HTTPException(
             status_code=502, detail=f"Failed to connect to OAuth server: {e}"
         )
+    finally:
+        timings["oauth_token"] = (time.perf_counter() - start) * 1000
 
     if token_resp.status_code != 200:
         raise HTTPException(
@@ -36,14 +100,18 @@ async def oauth_callback(code: str, state: str = None, stored_state: str = None)
     token_data = token_resp.json()
     access_token = token_data["access_token"]
 
+    start = time.perf_counter()
     try:
-        async with httpx.AsyncClient() as client:
-            profile_resp = await client.get(
+        profile_resp = await _send_with_retry(
+            lambda: client.get(
                 settings.OAUTH_USERINFO_URL,
                 headers={"Authorization": f"Bearer {access_token}"},
             )
+        )
     except httpx.RequestError as e:
         raise HTTPException(status_code=502, detail=f"Failed to fetch user info: {e}")
+    finally:
+        timings["oauth_userinfo"] = (time.perf_counter() - start) * 1000
 
     if profile_resp.status_code != 200:
         raise HTTPException(
@@ -56,4 +124,5 @@ async def oauth_callback(code: str, state: str = None, stored_state: str = None)
         "email": userinfo.get("email"),
         "name": userinfo.get("username"),
         "avatar_url": None,
+        "timings": timings,
     }
@@ -0,0 +1,127 @@
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Integer, cast, column, func, update, values
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.models import User
+from app.utils.cache import claim_write_buffer, get_redis
+
+logger = logging.getLogger(__name__)
+
+LAST_LOGIN_KEY = "activity:last_login"
+LAST_LOGOUT_KEY = "activity:last_logout"
+# Keeps each UPDATE well under asyncpg's 32767 bind parameter limit.
+FLUSH_BATCH_SIZE = 5000
+
+
+async def _buffer_timestamp(key: str, user_id: int, when: datetime) -> bool:
+    try:
+        await get_redis().hset(key, str(user_id), when.isoformat())
+        return True
+    except Exception:
+        logger.warning("Failed to buffer %s for user %s", key, user_id, exc_info=True)
+        return False
+
+
+async def record_login(db: AsyncSession, user_id: int) -> None:
+    """
+    Record a login in Redis; the periodic flush writes it to ``users``.
+    Falls back to a direct update when Redis is unavailable.
+    """
+    now = datetime.now(timezone.utc)
+    if not await _buffer_timestamp(LAST_LOGIN_KEY, user_id, now):
+        await db.execute(update(User).where(User.id == user_id).values(last_login=now))
+        await db.commit()
+
+
+async def record_logout(db: AsyncSession, user_id: int) -> None:
+    """
+    Record a logout in Redis; the periodic flush writes it to ``users``.
+    Falls back to a direct update when Redis is unavailable.
+    """
+    now = datetime.now(timezone.utc)
+    if not await _buffer_timestamp(LAST_LOGOUT_KEY, user_id, now):
+        await db.execute(update(User).where(User.id == user_id).values(last_logout=now))
+        await db.commit()
+
+
+def _merge(pending: dict, raw: dict, slot: int) -> None:
+    for user_id, timestamp in raw.items():
+        user_id = int(user_id)
+        value = datetime.fromisoformat(timestamp.decode())
+        current = pending.setdefault(user_id, [None, None])
+        if current[slot] is None or value > current[slot]:
+            current[slot] = value
+
+
+async def get_pending_activity() -> dict[int, tuple[datetime | None, datetime | None]]:
+    """
+    Buffered (last_login, last_logout) per user id that have not reached the
+    database yet, including a snapshot that is currently being flushed.
+    """
+    redis = get_redis()
+    pending: dict[int, list] = {}
+    try:
+        for slot, key in enumerate((LAST_LOGIN_KEY, LAST_LOGOUT_KEY)):
+            _merge(pending, await redis.hgetall(f"{key}:flushing"), slot)
+            _merge(pending, await redis.hgetall(key), slot)
+    except Exception:
+        logger.warning("Failed to read buffered user activity", exc_info=True)
+        return {}
+    return {user_id: tuple(stamps) for user_id, stamps in pending.items()}
+
+
+def activity_values(pending: dict) -> values:
+    """
+    Inline ``VALUES`` table of buffered activity, joinable on ``user_id``.
+    """
+    return values(
+        column("user_id", Integer),
+        column("last_login", DateTime(timezone=True)),
+        column("last_logout", DateTime(timezone=True)),
+        name="buffered_activity",
+    ).data([(user_id, *stamps) for user_id, stamps in pending.items()])
+
+
+def latest_timestamp(current, buffered):
+    """
+    Newer of a ``users`` column and its buffered counterpart. The cast is
+    needed because a VALUES column holding only NULLs is typed as text.
+    """
+    return func.greatest(current, cast(buffered, DateTime(timezone=True)))
+
+
+async def flush_activity(db: AsyncSession) -> int:
+    """
+    Write buffered login/logout timestamps to ``users`` with one
+    ``UPDATE ... FROM (VALUES ...)`` per batch. GREATEST keeps the newest
+    value, so replaying a snapshot after a crashed flush is harmless.
+    """
+    redis = get_redis()
+    pending: dict[int, list] = {}
+    claimed_keys = []
+    for slot, key in enumerate((LAST_LOGIN_KEY, LAST_LOGOUT_KEY)):
+        claimed, raw = await claim_write_buffer(redis, key)
+        claimed_keys.append(claimed)
+        _merge(pending, raw, slot)
+
+    if pending:
+        items = list(pending.items())
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            buffered = activity_values(dict(items[start : start + FLUSH_BATCH_SIZE]))
+            await db.execute(
+                update(User)
+                .where(User.id == buffered.c.user_id)
+                .values(
+                    last_login=latest_timestamp(User.last_login, buffered.c.last_login),
+                    last_logout=latest_timestamp(
+                        User.last_logout, buffered.c.last_logout
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+
+    await redis.delete(*claimed_keys)
+    return len(pending)
@@ -1,10 +1,15 @@
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 
-import redis
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
@@ -12,28 +17,257 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.db.session import get_session
 from app.models.models import User, UserRoles
+from app.utils.cache import TTLCache, get_redis
+from app.utils.passwords import get_password_hash, load_backends, verify_password
 
-pwd_context = CryptContext(schemes=["bcrypt_sha256", "bcrypt"], deprecated=["bcrypt"])
-redis_client = redis.from_url(settings.REDIS_URL)
+logger = logging.getLogger(__name__)
+
+# Revocations are broadcast on this channel so every worker can evict the
+# token from its local cache instead of waiting for the TTL to run out.
+AUTH_INVALIDATION_CHANNEL = "auth:invalidate"
+
+_unrevoked_tokens = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS
+)
+# user_id -> current token generation (see revoke_user_tokens)
+_token_generations = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS
+)
+# user_id -> (is_admin, active)
+_principals = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
 
 oauth2_scheme = HTTPBearer()
 
+_hash_executor = None
+_hash_jobs = 0
+
+
+def _get_hash_executor() -> ProcessPoolExecutor:
+    # Spawned children import only app.utils.passwords, the module of the
+    # submitted functions, so they start without loading the app.
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _hash_executor
+
+
+async def start_hash_executor():
+    """
+    Create the password hash pool and start all of its processes, so the
+    first logins after startup neither wait for a spawn nor hit the 503
+    capacity check while workers are still coming up.
+    """
+    executor = _get_hash_executor()
+    loop = asyncio.get_running_loop()
+    # Jobs submitted while no worker is idle each spawn a process.
+    await asyncio.gather(
+        *(
+            loop.run_in_executor(executor, load_backends)
+            for _ in range(settings.PASSWORD_HASH_WORKERS)
+        )
+    )
+
+
+def shutdown_hash_executor():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
+async def _run_hash_job(func, *args):
+    """
+    Run a bcrypt call in the process pool so it does not block the event
+    loop. Rejects with 503 once the pool and its queue are full instead of
+    letting requests pile up behind it.
+    """
+    global _hash_jobs
+    capacity = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT
+    if _hash_jobs >= capacity:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again later",
+            headers={"Retry-After": "1"},
+        )
+
+    _hash_jobs += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        _hash_jobs -= 1
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hash_job(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+
+def _generation_key(user_id: int) -> str:
+    return f"auth:user_gen:{user_id}"
+
+
+async def get_token_generation(user_id: int) -> int:
+    value = await get_redis().get(_generation_key(user_id))
+    return int(value or 0)
+
+
+async def create_access_token(user: User) -> str:
+    """
+    Issue an access token for the user, stamped with the user's current
+    token generation so revoke_user_tokens can invalidate it later.
+    """
+    payload = {
+        "uid": user.id,
+        "email": user.email,
+        "name": user.name,
+        "is_admin": user.is_admin,
+        "jti": uuid.uuid4().hex,
+        "gen": await get_token_generation(user.id),
+        "exp": int(
+            datetime.now(timezone.utc).timestamp()
+            + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        ),
+    }
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+async def blacklist_token(token: str):
+    """
+    Revoke a single token until it would have expired anyway.
+    """
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        exp = None
+    if exp is None:
+        ttl = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    else:
+        ttl = int(exp - datetime.now(timezone.utc).timestamp())
+    if ttl <= 0:
+        return
+
+    key = _token_key(token)
+    await get_redis().setex(f"blacklist:{key}", ttl, "1")
+    _unrevoked_tokens.pop(key)
+    await _publish_invalidation({"kind": "token", "key": key})
+
+
+async def revoke_user_tokens(user_id: int):
+    """
+    Revoke every token issued to the user so far by bumping their token
+    generation. O(1) regardless of how many sessions the user has.
+    """
+    await get_redis().incr(_generation_key(user_id))
+    _token_generations.pop(user_id)
+    await _publish_invalidation({"kind": "generation", "key": user_id})
+
+
+async def is_token_revoked(token: str, payload: dict) -> bool:
+    """
+    Check the blacklist and the user's token generation, answering from the
+    local caches for tokens that were recently confirmed as not revoked.
+    """
+    key = _token_key(token)
+    user_id = payload.get("uid")
+    token_generation = int(payload.get("gen") or 0)
+
+    generation = _token_generations.get(user_id)
+    if _unrevoked_tokens.get(key) and generation is not None:
+        return token_generation < generation
+
+    # Tokens revoked before blacklist keys were hashed are stored under the
+    # full token. Those keys expire with the tokens, at most
+    # ACCESS_TOKEN_EXPIRE_MINUTES after that rollout, and can then go.
+    blacklisted, legacy_blacklisted, stored_generation = await get_redis().mget(
+        f"blacklist:{key}", f"blacklist:{token}", _generation_key(user_id)
+    )
+    generation = int(stored_generation or 0)
+    _token_generations.set(user_id, generation)
+    if blacklisted is not None or legacy_blacklisted is not None:
+        return True
+    _unrevoked_tokens.set(key, True)
+    return token_generation < generation
+
+
+async def invalidate_principal(user_id: int):
+    """
+    Drop the cached roles of a user on every worker. Call after committing
+    changes to is_admin or deleted_at.
+    """
+    _principals.pop(user_id)
+    await _publish_invalidation({"kind": "user", "key": user_id})
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
 
+async def _publish_invalidation(message: dict):
+    try:
+        await get_redis().publish(AUTH_INVALIDATION_CHANNEL, json.dumps(message))
+    except Exception:
+        # Other workers fall back to the cache TTL if the broadcast is lost.
+        logger.warning("Failed to publish auth invalidation", exc_info=True)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
 
+def handle_invalidation(raw: bytes | str):
+    """
+    Apply an invalidation message received from another worker.
+    """
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", errors="ignore")
+    try:
+        message = json.loads(raw)
+    except ValueError:
+        return
+    if not isinstance(message, dict):
+        return
 
-def blacklist_token(token: str, expire_seconds: int = 7200):
-    redis_client.setex(f"blacklist:{token}", expire_seconds, "1")
+    kind = message.get("kind")
+    if kind == "token":
+        _unrevoked_tokens.pop(message.get("key"))
+    elif kind == "generation":
+        _token_generations.pop(message.get("key"))
+    elif kind == "user":
+        _principals.pop(message.get("key"))
 
 
-def is_token_blacklisted(token: str) -> bool:
-    result = redis_client.get(f"blacklist:{token}")
-    return result is not None
+async def listen_for_invalidations():
+    """
+    Long-running task that keeps the local auth caches in sync with
+    revocations made by other workers.
+    """
+    while True:
+        pubsub = get_redis().pubsub()
+        try:
+            await pubsub.subscribe(AUTH_INVALIDATION_CHANNEL)
+            # Anything revoked while we were not subscribed is unknown to us.
+            _unrevoked_tokens.clear()
+            _token_generations.clear()
+            _principals.clear()
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    handle_invalidation(message.get("data"))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("Auth invalidation listener disconnected", exc_info=True)
+            await asyncio.sleep(1)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
 
 
 async def authenticate_user(name: str, password: str, db: AsyncSession) -> User | None:
@@ -51,7 +285,7 @@ async def authenticate_user(name: str, password: str, db: AsyncSession) -> User
 
     if not user.password_hash:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash):
         return None
 
     return user
@@ -65,13 +299,6 @@ async def get_current_user(
     Extract user_id from Bearer <token> in header and verify user's admin
     status from database.
     """
-    if is_token_blacklisted(token.credentials):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been invalidated",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Cannot validate credentials",
@@ -96,13 +323,37 @@ async def get_current_user(
         if user_id is None:
             raise credentials_exception
 
-        result = await db.execute(
-            select(User).where(User.id == user_id, User.deleted_at.is_(None))
-        )
-        user = result.scalar_one_or_none()
-        if not user:
+        if await is_token_revoked(token.credentials, payload):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been invalidated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        principal = _principals.get(user_id)
+        if principal is None:
+            user = await db.get(User, user_id)
+            principal = (
+                (user.is_admin, user.deleted_at is None) if user else (False, False)
+            )
+            _principals.set(user_id, principal)
+
+        is_admin, active = principal
+        if not active:
             raise credentials_exception
 
-        return UserRoles(user_id=user_id, is_admin=user.is_admin)
+        return UserRoles(user_id=user_id, is_admin=is_admin)
     except JWTError:
         raise credentials_exception
+
+
+async def get_request_user(db: AsyncSession, user_id: int) -> User | None:
+    """
+    Load the authenticated user's row for the current request.
+    Goes through the session identity map, so a row already loaded by
+    get_current_user in the same request is reused without another query.
+    """
+    user = await db.get(User, user_id)
+    if not user or user.deleted_at is not None:
+        return None
+    return user
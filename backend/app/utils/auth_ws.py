@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.models.models import User
-from app.utils.auth import is_token_blacklisted
+from app.utils.auth import is_token_revoked
 
 
 def get_ws_token(websocket: WebSocket) -> str | None:
@@ -30,9 +30,6 @@ async def get_ws_token_payload(websocket: WebSocket) -> dict | None:
     if not token:
         return None
 
-    if is_token_blacklisted(token):
-        return None
-
     try:
         payload = jwt.decode(
             token,
@@ -48,6 +45,9 @@ async def get_ws_token_payload(websocket: WebSocket) -> dict | None:
         if user_id is None:
             return None
 
+        if await is_token_revoked(token, payload):
+            return None
+
         return payload
     except JWTError:
         return None
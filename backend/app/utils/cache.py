@@ -0,0 +1,84 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+_redis_client = None
+
+
+def get_redis() -> aioredis.Redis:
+    """
+    Shared asyncio Redis client for request handlers.
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = aioredis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        )
+    return _redis_client
+
+
+class TTLCache:
+    """
+    Small in-process LRU cache whose entries expire after ``ttl`` seconds.
+    Each uvicorn worker holds its own instance.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        return entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+async def claim_write_buffer(redis: aioredis.Redis, key: str) -> tuple[str, dict]:
+    """
+    Move a write-behind hash aside so a flush works on a stable snapshot while
+    new writes start a fresh hash. A snapshot left behind by a flush that
+    crashed before deleting it is returned again, so nothing is lost; the
+    caller deletes the returned key once the data is durable.
+    """
+    claimed = f"{key}:flushing"
+    if not await redis.exists(claimed):
+        if not await redis.exists(key):
+            return claimed, {}
+        # Only the flush job renames or deletes the buffer, so the key cannot
+        # disappear between the check and the rename.
+        await redis.rename(key, claimed)
+    return claimed, await redis.hgetall(claimed)
@@ -0,0 +1,98 @@
+import time
+
+from app.utils.cache import get_redis
+
+COURSE_CATALOG_VERSION_KEY = "catalog:courses:version"
+
+# (version, body) of the serialized catalog this process built last.
+_course_catalog: tuple[str, bytes] | None = None
+
+
+async def get_course_catalog_version() -> str:
+    """
+    Current catalog version shared by all workers through Redis.
+    """
+    return await _get_version(COURSE_CATALOG_VERSION_KEY)
+
+
+async def bump_course_catalog_version():
+    """
+    Invalidate every worker's cached catalog. Call after the commit that
+    added, renamed, recategorized or removed a course.
+    """
+    await _bump_versions(COURSE_CATALOG_VERSION_KEY)
+
+
+def course_archives_version_key(course_id: int) -> str:
+    return f"catalog:course:{course_id}:archives:version"
+
+
+async def get_course_archives_version(course_id: int) -> str:
+    """
+    Version of one course's archive list; data derived from the list (such
+    as its facets) is cached under it.
+    """
+    return await _get_version(course_archives_version_key(course_id))
+
+
+async def bump_course_archives_version(*course_ids: int):
+    """
+    Invalidate data derived from these courses' archive lists. Call after
+    the commit that added, edited, moved or removed their archives.
+    """
+    await _bump_versions(*(course_archives_version_key(cid) for cid in course_ids))
+
+
+async def _get_version(key: str) -> str:
+    redis = get_redis()
+    version = await redis.get(key)
+    if version is None:
+        pipe = redis.pipeline(transaction=False)
+        _seed(pipe, key)
+        pipe.get(key)
+        version = (await pipe.execute())[-1]
+    return version.decode() if isinstance(version, bytes) else str(version)
+
+
+async def _bump_versions(*keys: str):
+    pipe = get_redis().pipeline(transaction=False)
+    for key in keys:
+        _seed(pipe, key)
+        pipe.incr(key)
+    await pipe.execute()
+
+
+def _seed(pipe, key: str):
+    # Seed a missing counter from the clock so a Redis reset never hands out
+    # a version some worker already cached with other contents.
+    pipe.set(key, time.time_ns(), nx=True)
+
+
+def course_catalog_etag(version: str) -> str:
+    return f'"courses-{version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    ``If-None-Match`` comparison (weak, as RFC 9110 requires for it).
+    """
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def get_cached_course_catalog(version: str) -> bytes | None:
+    if _course_catalog is not None and _course_catalog[0] == version:
+        return _course_catalog[1]
+    return None
+
+
+def set_cached_course_catalog(version: str, body: bytes):
+    global _course_catalog
+    _course_catalog = (version, body)
+
+
+def clear_cached_course_catalog():
+    global _course_catalog
+    _course_catalog = None
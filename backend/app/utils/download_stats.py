@@ -0,0 +1,147 @@
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import Date, cast, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.models import (
+    ArchiveDownloadDaily,
+    ArchiveDownloadEvent,
+    ArchiveDownloadWeekly,
+)
+
+logger = logging.getLogger(__name__)
+
+EVENTS_TABLE = ArchiveDownloadEvent.__tablename__
+_PARTITION_NAME = re.compile(rf"{EVENTS_TABLE}_(\d{{4}})(\d{{2}})")
+# Months of raw events kept; older partitions are dropped, the rollups stay.
+EVENT_RETENTION_MONTHS = 3
+# Days recomputed by each rollup run. Events arrive within a flush interval,
+# so anything older than this is already final.
+ROLLUP_LOOKBACK = timedelta(days=2)
+
+
+def _month_start(day: date, months_ahead: int = 0) -> date:
+    month = day.month - 1 + months_ahead
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"{EVENTS_TABLE}_{month:%Y%m}"
+
+
+async def _create_partition(db: AsyncSession, month: date):
+    name = _partition_name(month)
+    if await db.scalar(text("SELECT to_regclass(:name)"), {"name": name}):
+        return
+    bounds = {
+        "lower": datetime.combine(month, datetime.min.time(), timezone.utc),
+        "upper": datetime.combine(
+            _month_start(month, 1), datetime.min.time(), timezone.utc
+        ),
+    }
+    await db.execute(text(f"CREATE TABLE {name} (LIKE {EVENTS_TABLE})"))
+    # Rows for the month that landed in the default partition would make
+    # ATTACH fail, so move them over first.
+    await db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {EVENTS_TABLE}_default "
+            "WHERE bucket >= :lower AND bucket < :upper RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    # Partition bounds are DDL and cannot be bind parameters.
+    lower, upper = (bound.isoformat() for bound in bounds.values())
+    await db.execute(
+        text(
+            f"ALTER TABLE {EVENTS_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        )
+    )
+
+
+async def ensure_event_partitions(db: AsyncSession, now: datetime | None = None):
+    """
+    Create the monthly partitions of ``archive_download_events`` for this
+    month and the next, and drop those past EVENT_RETENTION_MONTHS.
+    """
+    today = (now or datetime.now(timezone.utc)).date()
+    for months_ahead in (0, 1):
+        month = _month_start(today, months_ahead)
+        try:
+            await _create_partition(db, month)
+            await db.commit()
+        except Exception:
+            # Retried on the next run; meanwhile rows go to the default
+            # partition and are rolled up from there.
+            await db.rollback()
+            logger.warning("Could not create partition for %s", month, exc_info=True)
+
+    oldest_kept = _month_start(today, -EVENT_RETENTION_MONTHS)
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent AS regclass)"
+        ),
+        {"parent": EVENTS_TABLE},
+    )
+    for name in result.scalars().all():
+        match = _PARTITION_NAME.fullmatch(name)
+        if match and date(int(match[1]), int(match[2]), 1) < oldest_kept:
+            await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    await db.commit()
+
+
+async def rollup_downloads(db: AsyncSession, since: datetime | None = None):
+    """
+    Recompute the daily rollup from raw events for every UTC day from
+    ``since`` on, then the weekly rollup for the weeks those days fall in.
+    Totals are replaced rather than added, so reruns are harmless.
+    """
+    since = since or datetime.now(timezone.utc) - ROLLUP_LOOKBACK
+    first_day = since.astimezone(timezone.utc).date()
+    first_week = first_day - timedelta(days=first_day.weekday())
+
+    day = cast(func.timezone("UTC", ArchiveDownloadEvent.bucket), Date)
+    daily = insert(ArchiveDownloadDaily).from_select(
+        ["day", "archive_id", "downloads"],
+        select(
+            day,
+            ArchiveDownloadEvent.archive_id,
+            func.sum(ArchiveDownloadEvent.downloads),
+        )
+        .where(
+            ArchiveDownloadEvent.bucket
+            >= datetime.combine(first_day, datetime.min.time(), timezone.utc)
+        )
+        .group_by(day, ArchiveDownloadEvent.archive_id),
+    )
+    await db.execute(
+        daily.on_conflict_do_update(
+            index_elements=["day", "archive_id"],
+            set_={"downloads": daily.excluded.downloads},
+        )
+    )
+
+    week = cast(func.date_trunc("week", ArchiveDownloadDaily.day), Date)
+    weekly = insert(ArchiveDownloadWeekly).from_select(
+        ["week", "archive_id", "downloads"],
+        select(
+            week,
+            ArchiveDownloadDaily.archive_id,
+            func.sum(ArchiveDownloadDaily.downloads),
+        )
+        .where(ArchiveDownloadDaily.day >= first_week)
+        .group_by(week, ArchiveDownloadDaily.archive_id),
+    )
+    await db.execute(
+        weekly.on_conflict_do_update(
+            index_elements=["week", "archive_id"],
+            set_={"downloads": weekly.excluded.downloads},
+        )
+    )
+    await db.commit()
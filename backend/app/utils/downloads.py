@@ -0,0 +1,186 @@
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Integer, column, delete, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.models import Archive, ArchiveDownloadEvent, DownloadCountFlush
+from app.utils.cache import claim_write_buffer, get_redis
+
+logger = logging.getLogger(__name__)
+
+# archive id -> downloads not yet added to archives.download_count
+DOWNLOAD_COUNTS_KEY = "downloads:pending"
+# "<archive id>:<minute epoch>" -> downloads, for archive_download_events
+DOWNLOAD_EVENTS_KEY = "downloads:events"
+# Keeps each UPDATE well under asyncpg's 32767 bind parameter limit.
+FLUSH_BATCH_SIZE = 5000
+# Flush markers only need to outlive the snapshot they guard.
+FLUSH_MARKER_RETENTION = timedelta(days=1)
+
+
+async def record_downloads(db: AsyncSession, archive_ids: list[int]) -> None:
+    """
+    Count one download of each archive in Redis; the periodic flush adds the
+    counts to ``archives``. Falls back to a direct update when Redis is
+    unavailable.
+    """
+    if not archive_ids:
+        return
+    minute = int(time.time()) // 60 * 60
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for archive_id in archive_ids:
+            pipe.hincrby(DOWNLOAD_COUNTS_KEY, str(archive_id), 1)
+            pipe.hincrby(DOWNLOAD_EVENTS_KEY, f"{archive_id}:{minute}", 1)
+        await pipe.execute()
+        return
+    except Exception:
+        logger.warning(
+            "Failed to buffer downloads for archives %s", archive_ids, exc_info=True
+        )
+    await db.execute(
+        update(Archive)
+        .where(Archive.id.in_(archive_ids))
+        .values(download_count=Archive.download_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    bucket = datetime.fromtimestamp(minute, timezone.utc)
+    await _insert_events(db, [(bucket, archive_id, 1) for archive_id in archive_ids])
+    await db.commit()
+
+
+def _merge(pending: dict, raw: dict) -> None:
+    for archive_id, count in raw.items():
+        archive_id = int(archive_id)
+        pending[archive_id] = pending.get(archive_id, 0) + int(count)
+
+
+async def get_pending_downloads(archive_ids: list[int] | None = None) -> dict[int, int]:
+    """
+    Buffered download counts per archive id that have not reached the
+    database yet, including a snapshot that is currently being flushed.
+    Only ``archive_ids`` are looked up when given.
+    """
+    if archive_ids is not None and not archive_ids:
+        return {}
+    redis = get_redis()
+    pending: dict[int, int] = {}
+    try:
+        for key in (f"{DOWNLOAD_COUNTS_KEY}:flushing", DOWNLOAD_COUNTS_KEY):
+            if archive_ids is None:
+                raw = await redis.hgetall(key)
+            else:
+                counts = await redis.hmget(key, [str(a) for a in archive_ids])
+                raw = {a: c for a, c in zip(archive_ids, counts) if c is not None}
+            _merge(pending, raw)
+    except Exception:
+        logger.warning("Failed to read buffered download counts", exc_info=True)
+        return {}
+    return pending
+
+
+def download_values(pending: dict) -> values:
+    """
+    Inline ``VALUES`` table of buffered download counts, joinable on
+    ``archive_id``.
+    """
+    return values(
+        column("archive_id", Integer),
+        column("downloads", Integer),
+        name="buffered_downloads",
+    ).data(list(pending.items()))
+
+
+async def _snapshot_id(redis, claimed: str) -> str:
+    # Names the claimed snapshot so a replay can tell whether it was applied.
+    # A crash before this is stored leaves nothing applied, so a fresh id for
+    # the same snapshot is fine.
+    key = f"{claimed}:id"
+    await redis.set(key, uuid.uuid4().hex, nx=True)
+    snapshot_id = await redis.get(key)
+    return snapshot_id.decode() if isinstance(snapshot_id, bytes) else snapshot_id
+
+
+async def _insert_events(db: AsyncSession, rows: list[tuple]) -> None:
+    # Rows are unique per (bucket, archive_id), as ON CONFLICT requires.
+    for start in range(0, len(rows), FLUSH_BATCH_SIZE):
+        batch = rows[start : start + FLUSH_BATCH_SIZE]
+        stmt = insert(ArchiveDownloadEvent).values(
+            [
+                {"bucket": bucket, "archive_id": archive_id, "downloads": downloads}
+                for bucket, archive_id, downloads in batch
+            ]
+        )
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["bucket", "archive_id"],
+                set_={
+                    "downloads": ArchiveDownloadEvent.downloads
+                    + stmt.excluded.downloads
+                },
+            )
+        )
+
+
+def _event_rows(raw: dict) -> list[tuple]:
+    rows = []
+    for field, count in raw.items():
+        archive_id, minute = (
+            field.decode() if isinstance(field, bytes) else field
+        ).split(":")
+        bucket = datetime.fromtimestamp(int(minute), timezone.utc)
+        rows.append((bucket, int(archive_id), int(count)))
+    return rows
+
+
+async def flush_downloads(db: AsyncSession) -> int:
+    """
+    Add buffered download counts to ``archives.download_count`` with one
+    ``UPDATE ... FROM (VALUES ...)`` per batch and append the buffered
+    per-minute events to ``archive_download_events``. The snapshot id is
+    recorded in the same transaction, so a snapshot replayed after a flush
+    crashed between committing and clearing Redis is not counted twice.
+    """
+    redis = get_redis()
+    claimed, raw = await claim_write_buffer(redis, DOWNLOAD_COUNTS_KEY)
+    claimed_events, raw_events = await claim_write_buffer(redis, DOWNLOAD_EVENTS_KEY)
+    pending: dict[int, int] = {}
+    _merge(pending, raw)
+
+    if pending or raw_events:
+        snapshot_id = await _snapshot_id(redis, claimed)
+        applied = await db.scalar(
+            insert(DownloadCountFlush)
+            .values(id=snapshot_id)
+            .on_conflict_do_nothing()
+            .returning(DownloadCountFlush.id)
+        )
+        if applied is None:
+            logger.info("Download count snapshot %s was already applied", snapshot_id)
+        else:
+            items = list(pending.items())
+            for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                buffered = download_values(
+                    dict(items[start : start + FLUSH_BATCH_SIZE])
+                )
+                await db.execute(
+                    update(Archive)
+                    .where(Archive.id == buffered.c.archive_id)
+                    .values(
+                        download_count=Archive.download_count + buffered.c.downloads
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            await _insert_events(db, _event_rows(raw_events))
+            cutoff = datetime.now(timezone.utc) - FLUSH_MARKER_RETENTION
+            await db.execute(
+                delete(DownloadCountFlush).where(DownloadCountFlush.flushed_at < cutoff)
+            )
+        await db.commit()
+
+    await redis.delete(claimed, claimed_events, f"{claimed}:id")
+    return sum(pending.values())
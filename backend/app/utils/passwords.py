@@ -0,0 +1,23 @@
+# bcrypt hashing for the password hash process pool. Its spawned children
+# import this module, so it must stay free of app imports.
+
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt_sha256", "bcrypt"], deprecated=["bcrypt"])
+
+
+def get_password_hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def load_backends() -> None:
+    """
+    Load the bcrypt backends up front, so a pool worker's first real job
+    does not pay for it.
+    """
+    for scheme in pwd_context.schemes():
+        pwd_context.handler(scheme).get_backend()
@@ -1,9 +1,25 @@
 from minio import Minio
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from app.core.config import settings
+from app.utils.cache import TTLCache
 
 _minio_client = None
 
+PREVIEW_URL_EXPIRES = timedelta(minutes=30)
+DOWNLOAD_URL_EXPIRES = timedelta(hours=1)
+
+# URLs are signed as of the start of the current window, so every request
+# for an object within one window gets byte-identical URLs and the browser
+# can answer repeat previews from its cache.
+SIGNING_WINDOW = timedelta(minutes=15)
+
+# Objects are written once under a fresh UUID name and never modified, so
+# their bytes may be cached for as long as anyone holds a working URL.
+OBJECT_CACHE_CONTROL = "private, max-age={max_age}, immutable"
+
+# (object_name, expires, window start) -> URL
+_presigned_urls = TTLCache(maxsize=4096, ttl=SIGNING_WINDOW.total_seconds())
+
 
 def get_minio_client() -> Minio:
     global _minio_client
@@ -24,18 +40,60 @@ def presigned_get_url(
 ) -> str:
     """
     Get a presigned GET URL for frontend to download/preview PDF files.
+    The URL stays the same for the rest of the signing window and is valid
+    for at least ``expires``.
+    """
+    return presigned_get_urls([object_name], expires=expires)[object_name]
+
+
+def presigned_get_urls(
+    object_names: list[str], expires: timedelta = timedelta(hours=1)
+) -> dict[str, str]:
+    """
+    Presigned GET URLs for several objects, signed locally in one pass with
+    a single client. URLs signed earlier in the same window are reused.
     """
-    client = get_minio_client()
-    presigned_url = client.presigned_get_object(
+    window = _signing_window()
+    urls = {}
+    for object_name in object_names:
+        key = (object_name, expires, window)
+        url = _presigned_urls.get(key)
+        if url is None:
+            url = _presign(object_name, expires, window)
+            _presigned_urls.set(key, url)
+        urls[object_name] = url
+    return urls
+
+
+def clear_presigned_urls():
+    _presigned_urls.clear()
+
+
+def _signing_window() -> datetime:
+    now = datetime.now(timezone.utc)
+    window = SIGNING_WINDOW.total_seconds()
+    start = now.timestamp() // window * window
+    return datetime.fromtimestamp(start, timezone.utc)
+
+
+def _presign(object_name: str, expires: timedelta, window: datetime) -> str:
+    # Signed at the window start, so extend the lifetime by one window to
+    # keep the URL valid for ``expires`` from whenever it is handed out.
+    lifetime = expires + SIGNING_WINDOW
+    presigned_url = get_minio_client().presigned_get_object(
         bucket_name=settings.MINIO_BUCKET_NAME,
         object_name=object_name,
-        expires=expires
+        expires=lifetime,
+        response_headers={
+            "response-cache-control": OBJECT_CACHE_CONTROL.format(
+                max_age=int(lifetime.total_seconds())
+            )
+        },
+        request_date=window,
     )
 
-    presigned_url = presigned_url.replace(
+    return presigned_url.replace(
         f"http://{settings.MINIO_ENDPOINT}",
         f"{settings.EXTERNAL_ENDPOINT}",
         1
     )
-
-    return presigned_url
@@ -0,0 +1,202 @@
+import json
+import logging
+import time
+from datetime import timedelta
+
+from app.models.models import CourseCategory, TrendingArchive
+from app.utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Scores decay exponentially: a hit counts half as much after each half-life.
+TRENDING_HALF_LIFE = timedelta(hours=24)
+DOWNLOAD_WEIGHT = 1.0
+PREVIEW_WEIGHT = 0.5
+# Archives kept per feed by the renormalization job.
+TRENDING_MAX_ARCHIVES = 500
+# Scores below this (a download about ten half-lives old) are dropped.
+TRENDING_MIN_SCORE = 2**-10
+
+TRENDING_EPOCH_KEY = "trending:epoch"
+TRENDING_GLOBAL_KEY = "trending:global"
+# archive id -> JSON of the TrendingArchive fields other than the score
+TRENDING_DETAILS_KEY = "trending:archives"
+
+
+def trending_key(category: CourseCategory | None = None) -> str:
+    if category is None:
+        return TRENDING_GLOBAL_KEY
+    return f"trending:category:{CourseCategory(category).value}"
+
+
+def _now() -> float:
+    return time.time()
+
+
+def _growth(since_epoch: float) -> float:
+    # Rather than decaying every stored score as time passes, new hits are
+    # weighted up by the same factor; scores stay comparable and each read or
+    # write touches only the entries involved.
+    return 2 ** (since_epoch / TRENDING_HALF_LIFE.total_seconds())
+
+
+async def _get_epoch(redis) -> float:
+    epoch = await redis.get(TRENDING_EPOCH_KEY)
+    if epoch is None:
+        await redis.set(TRENDING_EPOCH_KEY, _now(), nx=True)
+        epoch = await redis.get(TRENDING_EPOCH_KEY)
+    return float(epoch)
+
+
+def _details(archive) -> str:
+    return json.dumps(
+        {
+            "name": archive.name,
+            "course_id": archive.course_id,
+            "course_name": archive.course_name,
+            "course_category": CourseCategory(archive.course_category).value,
+        }
+    )
+
+
+async def record_archive_hits(archives, weight: float = DOWNLOAD_WEIGHT) -> None:
+    """
+    Count a download or preview of each archive (rows with ``id``, ``name``,
+    ``course_id``, ``course_name`` and ``course_category``) towards the
+    global and per-category trending feeds. Failures are only logged.
+    """
+    if not archives:
+        return
+    try:
+        redis = get_redis()
+        increment = weight * _growth(_now() - await _get_epoch(redis))
+        pipe = redis.pipeline(transaction=False)
+        for archive in archives:
+            pipe.zincrby(TRENDING_GLOBAL_KEY, increment, archive.id)
+            pipe.zincrby(trending_key(archive.course_category), increment, archive.id)
+            pipe.hset(TRENDING_DETAILS_KEY, str(archive.id), _details(archive))
+        await pipe.execute()
+    except Exception:
+        logger.warning("Failed to record trending hits", exc_info=True)
+
+
+async def forget_trending_archives(*archive_ids: int) -> None:
+    """
+    Remove archives from every trending feed, e.g. once they are deleted.
+    """
+    if not archive_ids:
+        return
+    members = [str(archive_id) for archive_id in archive_ids]
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for key in (trending_key(category) for category in (None, *CourseCategory)):
+            pipe.zrem(key, *members)
+        pipe.hdel(TRENDING_DETAILS_KEY, *members)
+        await pipe.execute()
+    except Exception:
+        logger.warning("Failed to remove %s from trending", members, exc_info=True)
+
+
+async def refresh_trending_archives(archives) -> None:
+    """
+    Rewrite the feed entries of renamed or moved archives (rows shaped as
+    for ``record_archive_hits``) and carry their score over to the feed of a
+    new category. Archives without an entry are skipped. Failures are only
+    logged.
+    """
+    if not archives:
+        return
+    try:
+        redis = get_redis()
+        stored = await redis.hmget(
+            TRENDING_DETAILS_KEY, [str(archive.id) for archive in archives]
+        )
+        tracked = [
+            (archive, json.loads(detail)["course_category"])
+            for archive, detail in zip(archives, stored)
+            if detail is not None
+        ]
+        if not tracked:
+            return
+        pipe = redis.pipeline(transaction=False)
+        for archive, old_category in tracked:
+            pipe.zscore(trending_key(old_category), archive.id)
+        scores = await pipe.execute()
+
+        pipe = redis.pipeline(transaction=False)
+        for (archive, old_category), score in zip(tracked, scores):
+            pipe.hset(TRENDING_DETAILS_KEY, str(archive.id), _details(archive))
+            old_key = trending_key(old_category)
+            new_key = trending_key(archive.course_category)
+            if new_key != old_key and score is not None:
+                pipe.zrem(old_key, archive.id)
+                pipe.zincrby(new_key, score, archive.id)
+        await pipe.execute()
+    except Exception:
+        logger.warning("Failed to refresh trending entries", exc_info=True)
+
+
+async def get_trending_archives(
+    category: CourseCategory | None = None, limit: int = 20
+) -> list[TrendingArchive]:
+    """
+    Top ``limit`` archives of a feed with their scores decayed to now, in
+    downloads. Reads Redis only: one ZREVRANGE and one HMGET.
+    """
+    redis = get_redis()
+    epoch = await _get_epoch(redis)
+    ranked = await redis.zrevrange(
+        trending_key(category), 0, limit - 1, withscores=True
+    )
+    if not ranked:
+        return []
+    details = await redis.hmget(TRENDING_DETAILS_KEY, [member for member, _ in ranked])
+    decay = 1 / _growth(_now() - epoch)
+    return [
+        TrendingArchive(
+            id=int(member), score=round(score * decay, 4), **json.loads(detail)
+        )
+        for (member, score), detail in zip(ranked, details)
+        if detail is not None
+    ]
+
+
+async def renormalize_trending() -> None:
+    """
+    Fold the growth accumulated since the epoch into the stored scores and
+    restart the epoch at now, so weights stay far from float overflow. Also
+    trims each feed to its TRENDING_MAX_ARCHIVES best scores above
+    TRENDING_MIN_SCORE and drops details no feed references any more.
+    """
+    redis = get_redis()
+    now = _now()
+    factor = 1 / _growth(now - await _get_epoch(redis))
+    keys = [trending_key(category) for category in (None, *CourseCategory)]
+
+    pipe = redis.pipeline(transaction=False)
+    for key in keys:
+        # Scales the whole set in one atomic command.
+        pipe.zunionstore(key, {key: factor})
+        pipe.zremrangebyscore(key, "-inf", f"({TRENDING_MIN_SCORE}")
+        pipe.zremrangebyrank(key, 0, -TRENDING_MAX_ARCHIVES - 1)
+    # A hit recorded between the rescale and this write is weighted against
+    # the old epoch, overstating it by at most ``1 / factor``; harmless when
+    # the job runs often compared to the half-life.
+    pipe.set(TRENDING_EPOCH_KEY, now)
+    await pipe.execute()
+
+    details = await redis.hgetall(TRENDING_DETAILS_KEY)
+    if not details:
+        return
+    pipe = redis.pipeline(transaction=False)
+    for member, detail in details.items():
+        pipe.zscore(TRENDING_GLOBAL_KEY, member)
+        pipe.zscore(trending_key(json.loads(detail)["course_category"]), member)
+    scores = await pipe.execute()
+    stale = [
+        member
+        for index, member in enumerate(details)
+        if scores[2 * index] is None and scores[2 * index + 1] is None
+    ]
+    if stale:
+        await redis.hdel(TRENDING_DETAILS_KEY, *stale)
@@ -5,7 +5,7 @@ from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional
 
-from arq import create_pool
+from arq import create_pool, cron
 from arq.connections import RedisSettings
 from google import genai
 from google.genai.types import UploadFileConfig
@@ -15,7 +15,11 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
 from app.db.init_db import engine
 from app.models.models import Archive, Course
+from app.utils.activity import flush_activity
+from app.utils.download_stats import ensure_event_partitions, rollup_downloads
+from app.utils.downloads import flush_downloads
 from app.utils.storage import get_minio_client
+from app.utils.trending import renormalize_trending
 
 # logging.basicConfig(level=logging.INFO)
 # logger = logging.getLogger(__name__)
@@ -250,11 +254,63 @@ async def generate_ai_exam_task(ctx, task_data: dict):
         raise
 
 
+async def flush_user_activity_task(ctx):
+    """
+    ARQ cron task that writes buffered last_login/last_logout timestamps
+    from Redis to the users table.
+    """
+    async with AsyncSession(engine) as db:
+        flushed = await flush_activity(db)
+    if flushed:
+        logger.info("Flushed activity timestamps for %s users", flushed)
+    return flushed
+
+
+async def flush_download_counts_task(ctx):
+    """
+    ARQ cron task that adds download counts buffered in Redis to the
+    archives table.
+    """
+    async with AsyncSession(engine) as db:
+        flushed = await flush_downloads(db)
+    if flushed:
+        logger.info("Flushed %s buffered downloads", flushed)
+    return flushed
+
+
+async def rollup_download_stats_task(ctx):
+    """
+    ARQ cron task that keeps the download event partitions and the daily and
+    weekly download rollups current.
+    """
+    async with AsyncSession(engine) as db:
+        await ensure_event_partitions(db)
+        await rollup_downloads(db)
+
+
+async def renormalize_trending_task(ctx):
+    """
+    ARQ cron task that folds the elapsed decay into the trending scores.
+    """
+    await renormalize_trending()
+
+
 class WorkerSettings:
     """ARQ worker settings"""
 
     redis_settings = RedisSettings.from_dsn(settings.REDIS_URL)
     functions = [generate_ai_exam_task]
+    cron_jobs = [
+        cron(flush_user_activity_task, second={0, 30}, run_at_startup=True),
+        cron(flush_download_counts_task, second={15, 45}, run_at_startup=True),
+        cron(
+            rollup_download_stats_task,
+            minute=set(range(0, 60, 5)),
+            second=50,
+            run_at_startup=True,
+        ),
+        cron(renormalize_trending_task, minute=0, second=5),
+    ]
 
     max_jobs = 5  # Max concurrent jobs
     job_timeout = 600  # Job timeout in seconds
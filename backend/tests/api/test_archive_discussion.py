@@ -1,4 +1,5 @@
 import json
+import uuid
 from datetime import datetime, timezone
 
 import pytest
@@ -32,7 +33,9 @@ async def test_discussion_ws_sends_history_and_ignores_blank(
     user = await make_user(name="ws-user", nickname="Nick")
 
     async with session_maker() as session:
-        course = Course(name="Course", category=CourseCategory.FRESHMAN)
+        course = Course(
+            name=f"Course-{uuid.uuid4().hex[:6]}", category=CourseCategory.FRESHMAN
+        )
         session.add(course)
         await session.commit()
         await session.refresh(course)
@@ -87,7 +90,9 @@ async def test_discussion_ws_accepts_padded_message_within_limit(
     user = await make_user(name="ws-user-2", nickname="Nick2")
 
     async with session_maker() as session:
-        course = Course(name="Course2", category=CourseCategory.FRESHMAN)
+        course = Course(
+            name=f"Course2-{uuid.uuid4().hex[:6]}", category=CourseCategory.FRESHMAN
+        )
         session.add(course)
         await session.commit()
         await session.refresh(course)
@@ -147,7 +152,9 @@ async def test_discussion_ws_rejects_message_too_long(
     user = await make_user(name="ws-user-3", nickname="Nick3")
 
     async with session_maker() as session:
-        course = Course(name="Course3", category=CourseCategory.FRESHMAN)
+        course = Course(
+            name=f"Course3-{uuid.uuid4().hex[:6]}", category=CourseCategory.FRESHMAN
+        )
         session.add(course)
         await session.commit()
         await session.refresh(course)
@@ -204,7 +211,9 @@ async def test_discussion_delete_requires_owner_or_admin(
     other = await make_user(name="other", nickname="Other")
 
     async with session_maker() as session:
-        course = Course(name="Course4", category=CourseCategory.FRESHMAN)
+        course = Course(
+            name=f"Course4-{uuid.uuid4().hex[:6]}", category=CourseCategory.FRESHMAN
+        )
         session.add(course)
         await session.commit()
         await session.refresh(course)
@@ -9,8 +9,17 @@ from starlette.datastructures import UploadFile
 
 from app.api.services.archives import upload_archive
 from app.main import app
-from app.models.models import Archive, Course, CourseCategory, User, UserRoles
+from app.core.config import settings
+from app.models.models import (
+    Archive,
+    ArchiveType,
+    Course,
+    CourseCategory,
+    User,
+    UserRoles,
+)
 from app.utils.auth import get_current_user
+from app.utils.downloads import flush_downloads
 
 
 @pytest.mark.asyncio
@@ -497,3 +506,157 @@ async def test_upload_archive_function_handles_storage_error(
                 db=session,
             )
         assert exc.value.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_get_archive_urls_batch(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+    monkeypatch,
+):
+    user = await make_user()
+    unique = uuid.uuid4().hex[:8]
+    async with session_maker() as session:
+        course = Course(name=f"Batch {unique}", category=CourseCategory.GENERAL)
+        session.add(course)
+        await session.flush()
+        archives = [
+            Archive(
+                name=f"Batch {unique} {index}",
+                academic_year=2024,
+                archive_type=ArchiveType.FINAL,
+                professor="Prof. Batch",
+                object_name=f"archives/{course.id}/{unique}-{index}.pdf",
+                course_id=course.id,
+                uploader_id=user.id,
+            )
+            for index in range(3)
+        ]
+        session.add_all(archives)
+        await session.commit()
+    live_ids = [archives[0].id, archives[1].id]
+    async with session_maker() as session:
+        deleted = await session.get(Archive, archives[2].id)
+        deleted.deleted_at = func.now()
+        await session.commit()
+
+    signed = []
+
+    class FakeMinio:
+        def presigned_get_object(self, bucket_name, object_name, expires, **kwargs):
+            signed.append(object_name)
+            return (
+                f"http://{settings.MINIO_ENDPOINT}/{object_name}"
+                f"?expires={int(expires.total_seconds())}"
+            )
+
+    monkeypatch.setattr("app.utils.storage.get_minio_client", lambda: FakeMinio())
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=user.id, is_admin=False
+    )
+    try:
+        requested = [*live_ids, live_ids[0], archives[2].id, 999999]
+        response = await client.post("/archives/urls", json={"archive_ids": requested})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["missing"] == [archives[2].id, 999999]
+        assert set(body["urls"]) == {str(archive_id) for archive_id in live_ids}
+        first_url = body["urls"][str(live_ids[0])]
+        assert first_url.startswith(settings.EXTERNAL_ENDPOINT)
+        assert first_url.endswith("?expires=4500")
+        assert len(signed) == 2
+
+        preview = await client.post(
+            "/archives/urls",
+            json={"archive_ids": live_ids, "purpose": "preview"},
+        )
+        assert preview.status_code == 200
+        assert all(
+            url.endswith("?expires=2700") for url in preview.json()["urls"].values()
+        )
+
+        async with session_maker() as session:
+            await flush_downloads(session)
+            counts = dict(
+                (
+                    await session.execute(
+                        select(Archive.id, Archive.download_count).where(
+                            Archive.course_id == course.id
+                        )
+                    )
+                ).all()
+            )
+        # Counted once per batch despite the duplicate ID; previews do not count.
+        assert counts == {live_ids[0]: 1, live_ids[1]: 1, archives[2].id: 0}
+
+        too_many = await client.post(
+            "/archives/urls", json={"archive_ids": list(range(1, 52))}
+        )
+        assert too_many.status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(delete(Archive).where(Archive.course_id == course.id))
+            await session.execute(delete(Course).where(Course.id == course.id))
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_trending_feed_follows_previews_and_deletes(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+    monkeypatch,
+):
+    user = await make_user()
+    unique = uuid.uuid4().hex[:8]
+    async with session_maker() as session:
+        course = Course(name=f"Trending {unique}", category=CourseCategory.SENIOR)
+        session.add(course)
+        await session.flush()
+        archive = Archive(
+            name=f"Trending {unique}",
+            academic_year=2024,
+            archive_type=ArchiveType.FINAL,
+            professor="Prof. Trend",
+            object_name=f"archives/{course.id}/{unique}.pdf",
+            course_id=course.id,
+            uploader_id=user.id,
+        )
+        session.add(archive)
+        await session.commit()
+
+    monkeypatch.setattr(
+        "app.api.services.courses.presigned_get_url",
+        lambda object_name, *, expires: "https://example.com/preview",
+    )
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=user.id, is_admin=False
+    )
+    try:
+        for _ in range(3):
+            response = await client.get(
+                f"/courses/{course.id}/archives/{archive.id}/preview"
+            )
+            assert response.status_code == 200
+
+        response = await client.get(
+            "/archives/trending", params={"category": "senior", "limit": 50}
+        )
+        assert response.status_code == 200
+        entry = next(item for item in response.json() if item["id"] == archive.id)
+        assert entry["course_name"] == course.name
+        assert entry["course_category"] == "senior"
+        assert 1.4 < entry["score"] <= 1.5
+
+        response = await client.delete(f"/courses/{course.id}/archives/{archive.id}")
+        assert response.status_code == 200
+        response = await client.get("/archives/trending", params={"limit": 50})
+        assert archive.id not in {item["id"] for item in response.json()}
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(delete(Archive).where(Archive.course_id == course.id))
+            await session.execute(delete(Course).where(Course.id == course.id))
+            await session.commit()
@@ -12,6 +12,7 @@ from app.main import app
 from app.models.models import User, UserRoles
 from app.utils.auth import get_current_user
 from app.api.services import auth as auth_service
+from app.utils.activity import flush_activity, get_pending_activity
 
 
 @pytest.mark.asyncio
@@ -207,7 +208,7 @@ async def test_logout_updates_last_logout_and_blacklists(
     user = await make_user()
     captured_tokens: list[str] = []
 
-    def fake_blacklist(token: str):
+    async def fake_blacklist(token: str):
         captured_tokens.append(token)
 
     async def fake_get_current_user():
@@ -227,8 +228,10 @@ async def test_logout_updates_last_logout_and_blacklists(
         assert response.status_code == 200
         assert response.json()["message"] == "Successfully logged out"
         assert captured_tokens == ["token-123"]
+        assert (await get_pending_activity())[user.id][1] is not None
 
         async with session_maker() as session:
+            await flush_activity(session)
             refreshed = await session.get(User, user.id)
             assert refreshed.last_logout is not None
     finally:
@@ -248,7 +251,7 @@ async def test_login_direct_returns_token(
         captured["payload"] = payload
         return "fake-token"
 
-    monkeypatch.setattr("app.api.services.auth.jwt.encode", fake_encode)
+    monkeypatch.setattr("app.utils.auth.jwt.encode", fake_encode)
 
     async with session_maker() as session:
         response = await auth_service.login(
@@ -265,9 +268,13 @@ async def test_login_direct_returns_token(
 
     async with session_maker() as verify_session:
         refreshed = await verify_session.get(User, user.id)
-        assert refreshed.last_login is not None
+        assert refreshed.last_login is None
         assert captured["payload"]["uid"] == user.id
 
+        await flush_activity(verify_session)
+        await verify_session.refresh(refreshed)
+        assert refreshed.last_login is not None
+
 
 @pytest.mark.asyncio
 async def test_login_direct_rejects_unknown_user(session_maker):
@@ -299,7 +306,7 @@ async def test_auth_callback_direct_creates_user(monkeypatch, session_maker):
         ),
     )
     monkeypatch.setattr(
-        "app.api.services.auth.jwt.encode",
+        "app.utils.auth.jwt.encode",
         lambda payload, key, algorithm: "direct-token",
     )
 
@@ -340,7 +347,7 @@ async def test_logout_direct_without_header(monkeypatch, session_maker):
     calls = []
     monkeypatch.setattr(
         "app.api.services.auth.blacklist_token",
-        lambda token: calls.append(token),
+        AsyncMock(side_effect=lambda token: calls.append(token)),
     )
 
     async with session_maker() as session:
@@ -352,9 +359,47 @@ async def test_logout_direct_without_header(monkeypatch, session_maker):
         assert result == {"message": "Successfully logged out"}
 
     async with session_maker() as session:
+        await flush_activity(session)
         refreshed = await session.get(User, user.id)
         assert refreshed.last_logout is not None
         await session.delete(refreshed)
         await session.commit()
 
     assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_logout_all_revokes_existing_tokens(client, make_user):
+    user = await make_user()
+
+    tokens = []
+    for _ in range(2):
+        response = await client.post(
+            "/auth/login",
+            data={"username": user.name, "password": user.password},
+        )
+        tokens.append(response.json()["access_token"])
+    assert tokens[0] != tokens[1]
+
+    response = await client.post(
+        "/auth/logout/all",
+        headers={"Authorization": f"Bearer {tokens[0]}"},
+    )
+    assert response.status_code == 200
+
+    for token in tokens:
+        response = await client.get(
+            "/users/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token has been invalidated"
+
+    response = await client.post(
+        "/auth/login",
+        data={"username": user.name, "password": user.password},
+    )
+    fresh = response.json()["access_token"]
+    response = await client.get(
+        "/users/me", headers={"Authorization": f"Bearer {fresh}"}
+    )
+    assert response.status_code == 200
@@ -1,11 +1,15 @@
+import asyncio
+import base64
+import json
 import uuid
 from datetime import datetime, timezone
 
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 from httpx import AsyncClient
-from sqlalchemy import delete
+from sqlalchemy import delete, select, update
 
+from app.api.services import courses as courses_service
 from app.api.services.courses import (
     create_course,
     delete_archive,
@@ -19,9 +23,11 @@ from app.api.services.courses import (
     update_archive_course,
     update_course,
 )
+from app.db.session import get_read_session
 from app.main import app
 from app.models.models import (
     Archive,
+    ArchiveRead,
     ArchiveType,
     ArchiveUpdateCourse,
     Course,
@@ -31,6 +37,8 @@ from app.models.models import (
     UserRoles,
 )
 from app.utils.auth import get_current_user
+from app.utils.downloads import flush_downloads, record_downloads
+from app.utils.trending import get_trending_archives, record_archive_hits
 
 
 async def _create_course(
@@ -112,6 +120,51 @@ async def test_get_categorized_courses_returns_courses(
             await session.commit()
 
 
+@pytest.mark.asyncio
+async def test_get_categorized_courses_etag_revalidation(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+):
+    user = await make_user()
+    admin = await make_user(is_admin=True)
+    course = None
+
+    app.dependency_overrides[get_current_user] = _override_user(user)
+    try:
+        first = await client.get("/courses")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        not_modified = await client.get(
+            "/courses", headers={"If-None-Match": f'"other", W/{etag}'}
+        )
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+        assert not_modified.content == b""
+
+        async with session_maker() as session:
+            course = await create_course(
+                course_data=CourseCreate(
+                    name=f"Course {uuid.uuid4().hex[:6]}",
+                    category=CourseCategory.JUNIOR,
+                ),
+                current_user=UserRoles(user_id=admin.id, is_admin=True),
+                db=session,
+            )
+
+        changed = await client.get("/courses", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert any(item["id"] == course.id for item in changed.json()["junior"])
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        if course is not None:
+            async with session_maker() as session:
+                await session.execute(delete(Course).where(Course.id == course.id))
+                await session.commit()
+
+
 @pytest.mark.asyncio
 async def test_get_course_archives_returns_active_archives(
     client: AsyncClient,
@@ -152,6 +205,168 @@ async def test_get_course_archives_returns_active_archives(
             await session.commit()
 
 
+@pytest.mark.asyncio
+async def test_get_course_archives_paginates_with_filters(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+):
+    user = await make_user()
+    course = await _create_course(session_maker)
+    archives = [
+        await _create_archive(session_maker, course_id=course.id, uploader_id=user.id)
+        for _ in range(5)
+    ]
+    # Same timestamp for two rows: the id breaks the tie.
+    async with session_maker() as session:
+        await session.execute(
+            update(Archive)
+            .where(Archive.id == archives[1].id)
+            .values(created_at=archives[2].created_at, professor="Prof. Other")
+        )
+        await session.execute(
+            update(Archive)
+            .where(Archive.id == archives[4].id)
+            .values(academic_year=2020, has_answers=True)
+        )
+        await session.commit()
+    newest_first = [archive.id for archive in reversed(archives)]
+
+    app.dependency_overrides[get_current_user] = _override_user(user)
+    try:
+        seen = []
+        params = {"limit": 2}
+        while True:
+            response = await client.get(
+                f"/courses/{course.id}/archives", params=params
+            )
+            assert response.status_code == 200
+            page = [item["id"] for item in response.json()]
+            assert len(page) <= 2
+            seen.extend(page)
+            next_cursor = response.headers.get("x-next-cursor")
+            if next_cursor is None:
+                break
+            params = {"limit": 2, "cursor": next_cursor}
+        assert seen == newest_first
+
+        response = await client.get(
+            f"/courses/{course.id}/archives",
+            params={"professor": "Prof. Test", "academic_year_min": 2021},
+        )
+        assert [item["id"] for item in response.json()] == [
+            archives[3].id,
+            archives[2].id,
+            archives[0].id,
+        ]
+        assert "x-next-cursor" not in response.headers
+
+        response = await client.get(
+            f"/courses/{course.id}/archives",
+            params={"has_answers": True, "archive_type": "final", "limit": 10},
+        )
+        assert [item["id"] for item in response.json()] == [archives[4].id]
+
+        response = await client.get(
+            f"/courses/{course.id}/archives", params={"cursor": "not-a-cursor"}
+        )
+        assert response.status_code == 400
+
+        for raw in (
+            "2024-01-01T00:00:00+00:00|99999999999999999999",
+            "2024-01-01T00:00:00+00:00|-1",
+            "2024-01-01T00:00:00|1",
+            "0001-01-01T00:00:00+14:00|1",
+        ):
+            crafted = base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+            response = await client.get(
+                f"/courses/{course.id}/archives", params={"cursor": crafted}
+            )
+            assert response.status_code == 400
+            assert response.json()["detail"] == "Invalid cursor"
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(delete(Archive).where(Archive.course_id == course.id))
+            await session.execute(delete(Course).where(Course.id == course.id))
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_get_course_facets_counts_and_invalidation(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+):
+    user = await make_user(is_admin=True)
+    course = await _create_course(session_maker)
+    archives = [
+        await _create_archive(session_maker, course_id=course.id, uploader_id=user.id)
+        for _ in range(3)
+    ]
+    await _create_archive(
+        session_maker, course_id=course.id, uploader_id=user.id, deleted=True
+    )
+    async with session_maker() as session:
+        await session.execute(
+            update(Archive)
+            .where(Archive.id == archives[0].id)
+            .values(
+                professor="Prof. Other",
+                academic_year=2023,
+                archive_type=ArchiveType.MIDTERM,
+                has_answers=True,
+            )
+        )
+        await session.commit()
+
+    app.dependency_overrides[get_current_user] = _override_user(user)
+    try:
+        response = await client.get(f"/courses/{course.id}/facets")
+        assert response.status_code == 200
+        assert response.json() == {
+            "total": 3,
+            "professor": [
+                {"value": "Prof. Test", "count": 2},
+                {"value": "Prof. Other", "count": 1},
+            ],
+            "academic_year": [
+                {"value": 2024, "count": 2},
+                {"value": 2023, "count": 1},
+            ],
+            "archive_type": [
+                {"value": "final", "count": 2},
+                {"value": "midterm", "count": 1},
+            ],
+            "has_answers": [
+                {"value": True, "count": 1},
+                {"value": False, "count": 2},
+            ],
+        }
+
+        # Served from cache until an archive write bumps the list version.
+        await _create_archive(session_maker, course_id=course.id, uploader_id=user.id)
+        cached = await client.get(f"/courses/{course.id}/facets")
+        assert cached.json()["total"] == 3
+
+        deleted = await client.delete(
+            f"/courses/{course.id}/archives/{archives[0].id}"
+        )
+        assert deleted.status_code == 200
+        fresh = (await client.get(f"/courses/{course.id}/facets")).json()
+        assert fresh["total"] == 3
+        assert fresh["professor"] == [{"value": "Prof. Test", "count": 3}]
+
+        missing = await client.get("/courses/999999/facets")
+        assert missing.status_code == 404
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(delete(Archive).where(Archive.course_id == course.id))
+            await session.execute(delete(Course).where(Course.id == course.id))
+            await session.commit()
+
+
 @pytest.mark.asyncio
 async def test_get_archive_preview_url_returns_presigned_link(
     client: AsyncClient,
@@ -225,6 +440,13 @@ async def test_get_archive_download_url_increments_count(
         assert response.status_code == 200
         assert response.json() == {"url": download_url}
 
+        # Buffered in Redis until the flush, but already counted in listings.
+        listed = await client.get(f"/courses/{course.id}/archives")
+        assert listed.json()[0]["download_count"] == 1
+        async with session_maker() as session:
+            assert (await session.get(Archive, archive.id)).download_count == 0
+            await flush_downloads(session)
+
         async with session_maker() as session:
             refreshed = await session.get(Archive, archive.id)
             assert refreshed.download_count == 1
@@ -592,7 +814,7 @@ async def test_get_categorized_courses_direct(session_maker, make_user):
                 current_user=UserRoles(user_id=user.id, is_admin=False),
                 db=session,
             )
-        payload = result.model_dump()
+        payload = json.loads(result.body)
         assert any(
             item["id"] == course_general.id
             for item in payload["general"]
@@ -621,6 +843,7 @@ async def test_get_course_archives_direct_errors_when_course_missing(
         with pytest.raises(HTTPException) as exc:
             await get_course_archives(
                 course_id=999999,
+                response=Response(),
                 current_user=UserRoles(user_id=user.id, is_admin=False),
                 db=session,
             )
@@ -668,6 +891,7 @@ async def test_archive_preview_and_download_direct(
             )
             assert preview == {"url": preview_url}
             assert download == {"url": download_url}
+            await flush_downloads(session)
 
         async with session_maker() as session:
             refreshed = await session.get(Archive, archive.id)
@@ -1038,6 +1262,26 @@ async def test_admin_delete_course_soft_deletes_archives(
         course_id=course.id,
         uploader_id=admin.id,
     )
+    other = await _create_archive(
+        session_maker,
+        course_id=course.id,
+        uploader_id=admin.id,
+    )
+    already_deleted = await _create_archive(
+        session_maker,
+        course_id=course.id,
+        uploader_id=admin.id,
+        deleted=True,
+    )
+
+    class FakeSocket:
+        closed_with = None
+
+        async def close(self, code):
+            self.closed_with = code
+
+    socket = FakeSocket()
+    courses_service._discussion_connections_by_archive[archive.id] = {socket}
 
     app.dependency_overrides[get_current_user] = _override_user(admin)
     try:
@@ -1046,18 +1290,26 @@ async def test_admin_delete_course_soft_deletes_archives(
         )
         assert response.status_code == 200
         body = response.json()
-        assert "1 associated archives" in body["message"]
+        assert "2 associated archives" in body["message"]
 
         async with session_maker() as session:
             refreshed_course = await session.get(Course, course.id)
             refreshed_archive = await session.get(Archive, archive.id)
+            refreshed_other = await session.get(Archive, other.id)
+            refreshed_deleted = await session.get(Archive, already_deleted.id)
             assert refreshed_course.deleted_at is not None
-            assert refreshed_archive.deleted_at is not None
+            assert refreshed_archive.deleted_at == refreshed_course.deleted_at
+            assert refreshed_other.deleted_at == refreshed_course.deleted_at
+            assert refreshed_deleted.deleted_at == already_deleted.deleted_at
+
+        assert socket.closed_with == 1008
+        assert archive.id not in courses_service._discussion_connections_by_archive
     finally:
         app.dependency_overrides.pop(get_current_user, None)
+        courses_service._discussion_connections_by_archive.pop(archive.id, None)
         async with session_maker() as session:
             await session.execute(
-                delete(Archive).where(Archive.id == archive.id)
+                delete(Archive).where(Archive.course_id == course.id)
             )
             await session.execute(
                 delete(Course).where(Course.id == course.id)
@@ -1079,8 +1331,369 @@ async def test_list_all_courses_direct_returns_courses(
                 current_user=UserRoles(user_id=admin.id, is_admin=True),
                 db=session,
             )
-            assert any(item.id == course.id for item in courses)
+            assert any(item["id"] == course.id for item in courses)
+    finally:
+        async with session_maker() as session:
+            await session.execute(delete(Course).where(Course.id == course.id))
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_archives_applies_valid_operations(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+):
+    admin = await make_user(is_admin=True)
+    course = await _create_course(session_maker)
+    target = await _create_course(session_maker)
+    archives = [
+        await _create_archive(session_maker, course_id=course.id, uploader_id=admin.id)
+        for _ in range(4)
+    ]
+    deleted = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=admin.id, deleted=True
+    )
+    operations = [
+        {"action": "move", "archive_id": archives[0].id, "course_id": target.id},
+        {"action": "update", "archive_id": archives[1].id, "professor": "Prof. Bulk"},
+        {"action": "delete", "archive_id": archives[2].id},
+        {"action": "delete", "archive_id": deleted.id},
+        {"action": "move", "archive_id": archives[3].id, "course_id": course.id},
+        {"action": "update", "archive_id": archives[3].id},
+        {"action": "move", "archive_id": archives[1].id + 10**6, "course_id": 1},
+    ]
+
+    app.dependency_overrides[get_current_user] = _override_user(admin)
+    try:
+        before = await client.get(f"/courses/{target.id}/facets")
+        assert before.json()["total"] == 0
+
+        response = await client.post(
+            "/courses/admin/archives/bulk", json={"operations": operations}
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["applied"], body["failed"]) == (3, 4)
+        assert [result["detail"] for result in body["results"]] == [
+            None,
+            None,
+            None,
+            "Archive not found",
+            "Archive appears in more than one operation",
+            "Archive appears in more than one operation",
+            "Archive not found",
+        ]
+        assert [result["index"] for result in body["results"]] == list(range(7))
+
+        async with session_maker() as session:
+            moved, patched, removed, untouched = [
+                await session.get(Archive, archive.id) for archive in archives
+            ]
+        assert moved.course_id == target.id
+        assert patched.professor == "Prof. Bulk"
+        assert removed.deleted_at is not None
+        assert untouched.course_id == course.id and untouched.deleted_at is None
+        # Facets of both courses were invalidated.
+        assert (await client.get(f"/courses/{target.id}/facets")).json()["total"] == 1
+
+        forbidden = _override_user(await make_user())
+        app.dependency_overrides[get_current_user] = forbidden
+        response = await client.post(
+            "/courses/admin/archives/bulk", json={"operations": operations}
+        )
+        assert response.status_code == 403
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(
+                delete(Archive).where(Archive.course_id.in_([course.id, target.id]))
+            )
+            await session.execute(
+                delete(Course).where(Course.id.in_([course.id, target.id]))
+            )
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_archives_rejects_empty_and_oversized_batches(
+    client: AsyncClient,
+    make_user,
+):
+    admin = await make_user(is_admin=True)
+    app.dependency_overrides[get_current_user] = _override_user(admin)
+    try:
+        response = await client.post(
+            "/courses/admin/archives/bulk", json={"operations": []}
+        )
+        assert response.status_code == 400
+
+        operations = [
+            {"action": "delete", "archive_id": index}
+            for index in range(courses_service.ARCHIVE_BULK_MAX + 1)
+        ]
+        response = await client.post(
+            "/courses/admin/archives/bulk", json={"operations": operations}
+        )
+        assert response.status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_get_course_archives_rows_match_archive_read(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+):
+    user = await make_user()
+    course = await _create_course(session_maker)
+    archive = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=user.id
+    )
+
+    app.dependency_overrides[get_current_user] = _override_user(user)
+    try:
+        for params in ({}, {"limit": 10}):
+            response = await client.get(
+                f"/courses/{course.id}/archives", params=params
+            )
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/json"
+            (item,) = response.json()
+            assert set(item) == set(ArchiveRead.model_fields)
+            read = ArchiveRead.model_validate(item)
+            assert read.id == archive.id
+            assert read.archive_type == ArchiveType.FINAL
+            assert read.created_at.tzinfo is not None
+            # Pydantic's UTC format, as the listing has always used.
+            assert item["created_at"].endswith("Z")
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(delete(Archive).where(Archive.id == archive.id))
+            await session.execute(delete(Course).where(Course.id == course.id))
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_get_course_facets_reads_the_primary(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+):
+    user = await make_user()
+    course = await _create_course(session_maker)
+
+    async def _replica_unavailable():
+        raise AssertionError("facets are cached and must not read a replica")
+        yield
+
+    app.dependency_overrides[get_current_user] = _override_user(user)
+    app.dependency_overrides[get_read_session] = _replica_unavailable
+    try:
+        response = await client.get(f"/courses/{course.id}/facets")
+        assert response.status_code == 200
+        assert response.json()["total"] == 0
     finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        app.dependency_overrides.pop(get_read_session, None)
         async with session_maker() as session:
             await session.execute(delete(Course).where(Course.id == course.id))
             await session.commit()
+
+
+async def _commit_later(session, delay: float = 0.2):
+    await asyncio.sleep(delay)
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_update_archive_course_reuses_course_created_concurrently(
+    session_maker,
+    make_user,
+):
+    admin = await make_user(is_admin=True)
+    original = await _create_course(session_maker)
+    archive = await _create_archive(
+        session_maker, course_id=original.id, uploader_id=admin.id
+    )
+    name = f"Raced {uuid.uuid4().hex[:6]}"
+
+    try:
+        # The other request has inserted the course but not committed yet,
+        # so the move does not see it and its own insert has to wait.
+        async with session_maker() as other, session_maker() as session:
+            other.add(Course(name=name, category=CourseCategory.GENERAL))
+            await other.flush()
+            result, _ = await asyncio.gather(
+                update_archive_course(
+                    course_id=original.id,
+                    archive_id=archive.id,
+                    course_update=ArchiveUpdateCourse(
+                        course_name=name, course_category=CourseCategory.GENERAL
+                    ),
+                    current_user=UserRoles(user_id=admin.id, is_admin=True),
+                    db=session,
+                ),
+                _commit_later(other),
+            )
+
+        async with session_maker() as session:
+            raced = (
+                await session.execute(select(Course).where(Course.name == name))
+            ).scalar_one()
+            assert result["new_course_id"] == raced.id
+            assert (await session.get(Archive, archive.id)).course_id == raced.id
+    finally:
+        async with session_maker() as session:
+            await session.execute(delete(Archive).where(Archive.id == archive.id))
+            await session.execute(
+                delete(Course).where(
+                    (Course.id == original.id) | (Course.name == name)
+                )
+            )
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_create_and_rename_course_reject_concurrent_duplicates(
+    session_maker,
+    make_user,
+):
+    admin = await make_user(is_admin=True)
+    current_user = UserRoles(user_id=admin.id, is_admin=True)
+    course = await _create_course(session_maker)
+    created = f"Raced {uuid.uuid4().hex[:6]}"
+    renamed = f"Raced {uuid.uuid4().hex[:6]}"
+
+    try:
+        for name, request in (
+            (
+                created,
+                lambda session: create_course(
+                    course_data=CourseCreate(
+                        name=created, category=CourseCategory.GENERAL
+                    ),
+                    current_user=current_user,
+                    db=session,
+                ),
+            ),
+            (
+                renamed,
+                lambda session: update_course(
+                    course_id=course.id,
+                    course_data=CourseUpdate(name=renamed),
+                    current_user=current_user,
+                    db=session,
+                ),
+            ),
+        ):
+            async with session_maker() as other, session_maker() as session:
+                other.add(Course(name=name, category=CourseCategory.GENERAL))
+                await other.flush()
+                error, _ = await asyncio.gather(
+                    request(session), _commit_later(other), return_exceptions=True
+                )
+            assert isinstance(error, HTTPException)
+            assert error.status_code == 400
+    finally:
+        async with session_maker() as session:
+            await session.execute(
+                delete(Course).where(
+                    (Course.id == course.id) | Course.name.in_([created, renamed])
+                )
+            )
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_admin_update_archive_counts_buffered_downloads(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+):
+    admin = await make_user(is_admin=True)
+    course = await _create_course(session_maker)
+    archive = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=admin.id
+    )
+    async with session_maker() as session:
+        await record_downloads(session, [archive.id])
+        await record_downloads(session, [archive.id])
+
+    app.dependency_overrides[get_current_user] = _override_user(admin)
+    try:
+        response = await client.patch(
+            f"/courses/{course.id}/archives/{archive.id}", data={"name": "Renamed"}
+        )
+        assert response.status_code == 200
+        assert response.json()["download_count"] == 2
+        listed = await client.get(f"/courses/{course.id}/archives")
+        assert listed.json()[0]["download_count"] == 2
+
+        async with session_maker() as session:
+            assert (await session.get(Archive, archive.id)).download_count == 0
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(delete(Archive).where(Archive.id == archive.id))
+            await session.execute(delete(Course).where(Course.id == course.id))
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_archive_edits_refresh_trending_entries(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+):
+    admin = await make_user(is_admin=True)
+    course = await _create_course(session_maker)
+    target = await _create_course(session_maker, category=CourseCategory.SENIOR)
+    archive = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=admin.id
+    )
+    async with session_maker() as session:
+        hit = (
+            await session.execute(
+                courses_service._archive_hit_query(course.id, archive.id)
+            )
+        ).one()
+    await record_archive_hits([hit])
+
+    app.dependency_overrides[get_current_user] = _override_user(admin)
+    try:
+        response = await client.patch(
+            f"/courses/{course.id}/archives/{archive.id}", data={"name": "Renamed"}
+        )
+        assert response.status_code == 200
+        response = await client.patch(
+            f"/courses/{course.id}/archives/{archive.id}/course",
+            json={"course_id": target.id},
+        )
+        assert response.status_code == 200
+        response = await client.post(
+            "/courses/admin/archives/bulk",
+            json={
+                "operations": [
+                    {"archive_id": archive.id, "action": "update", "name": "Bulk"}
+                ]
+            },
+        )
+        assert response.json()["applied"] == 1
+
+        senior = await get_trending_archives(CourseCategory.SENIOR)
+        assert [
+            (entry.name, entry.course_id) for entry in senior if entry.id == archive.id
+        ] == [("Bulk", target.id)]
+        general = await get_trending_archives(CourseCategory.GENERAL)
+        assert archive.id not in [entry.id for entry in general]
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(delete(Archive).where(Archive.id == archive.id))
+            await session.execute(
+                delete(Course).where(Course.id.in_([course.id, target.id]))
+            )
+            await session.commit()
@@ -0,0 +1,163 @@
+import random
+from datetime import date
+
+import pytest
+from sqlalchemy import delete
+
+from app.main import app
+from app.models.models import ArchiveDownloadDaily, ArchiveDownloadWeekly, UserRoles
+from app.utils.auth import get_current_user
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_requires_admin(client):
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=1, is_admin=False
+    )
+    try:
+        response = await client.get("/metrics/admin/pool")
+        assert response.status_code == 403
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_reports_primary_pool(client):
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=1, is_admin=True
+    )
+    try:
+        response = await client.get("/metrics/admin/pool")
+        assert response.status_code == 200
+        pools = {pool["name"]: pool for pool in response.json()["pools"]}
+        primary = pools["primary"]
+        assert primary["pool_class"] == "InstrumentedAsyncAdaptedQueuePool"
+        assert primary["size"] == 5
+        assert set(primary["wait_ms"]) == {"count", "sum_ms", "max_ms", "buckets"}
+
+        reset = await client.post("/metrics/admin/pool/reset")
+        assert reset.status_code == 200
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_requests_report_server_timing_and_route_aggregates(client):
+    response = await client.get("/statistics")
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert "queries" in timing and not timing.endswith('"0 queries"')
+
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=1, is_admin=True
+    )
+    try:
+        response = await client.get("/metrics/admin/routes")
+        assert response.status_code == 200
+        routes = {item["route"]: item for item in response.json()["routes"]}
+        statistics = routes["GET /statistics"]
+        assert statistics["requests"] >= 1
+        assert statistics["queries"] >= 6
+        assert statistics["slowest_sql"]
+
+        reset = await client.post("/metrics/admin/routes/reset")
+        assert reset.status_code == 200
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_slow_query_endpoint_requires_admin(client):
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=1, is_admin=False
+    )
+    try:
+        response = await client.get("/metrics/admin/slow-queries")
+        assert response.status_code == 403
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_slow_query_endpoint_lists_entries(client, monkeypatch):
+    from app.db import slow_queries
+
+    monkeypatch.setattr(slow_queries.settings, "SLOW_QUERY_THRESHOLD_MS", 0.001)
+    monkeypatch.setattr(slow_queries.settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0)
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=1, is_admin=True
+    )
+    try:
+        await client.post("/metrics/admin/slow-queries/reset")
+        await client.get("/statistics")
+        response = await client.get("/metrics/admin/slow-queries")
+        assert response.status_code == 200
+        queries = response.json()["queries"]
+        assert any(entry["route"] == "GET /statistics" for entry in queries)
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        slow_queries.slow_query_log.clear()
+
+
+@pytest.mark.asyncio
+async def test_download_stats_endpoint_reads_rollups(client, session_maker):
+    archive_id = random.randint(10**8, 2 * 10**8)
+    async with session_maker() as session:
+        session.add_all(
+            [
+                ArchiveDownloadDaily(
+                    day=date(2026, 1, 5), archive_id=archive_id, downloads=3
+                ),
+                ArchiveDownloadDaily(
+                    day=date(2026, 1, 7), archive_id=archive_id, downloads=2
+                ),
+                ArchiveDownloadWeekly(
+                    week=date(2026, 1, 5), archive_id=archive_id, downloads=5
+                ),
+            ]
+        )
+        await session.commit()
+
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=1, is_admin=False
+    )
+    try:
+        response = await client.get("/metrics/admin/downloads")
+        assert response.status_code == 403
+
+        app.dependency_overrides[get_current_user] = lambda: UserRoles(
+            user_id=1, is_admin=True
+        )
+        params = {"archive_id": archive_id, "start": "2026-01-05", "end": "2026-01-07"}
+        response = await client.get("/metrics/admin/downloads", params=params)
+        assert response.status_code == 200
+        assert response.json() == {
+            "granularity": "day",
+            "points": [
+                {"period": "2026-01-05", "downloads": 3},
+                {"period": "2026-01-06", "downloads": 0},
+                {"period": "2026-01-07", "downloads": 2},
+            ],
+        }
+
+        # Dates inside a week resolve to that week's Monday.
+        response = await client.get(
+            "/metrics/admin/downloads",
+            params={**params, "granularity": "week", "start": "2026-01-08"},
+        )
+        assert response.json()["points"] == [{"period": "2026-01-05", "downloads": 5}]
+
+        response = await client.get(
+            "/metrics/admin/downloads",
+            params={"start": "2020-01-01", "end": "2026-01-01"},
+        )
+        assert response.status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            for model in (ArchiveDownloadDaily, ArchiveDownloadWeekly):
+                await session.execute(
+                    delete(model).where(model.archive_id == archive_id)
+                )
+            await session.commit()
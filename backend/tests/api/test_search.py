@@ -0,0 +1,137 @@
+import os
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, text
+
+from app.main import app
+from app.models.models import Archive, ArchiveType, Course, CourseCategory, UserRoles
+from app.utils.auth import get_current_user
+
+
+@pytest_asyncio.fixture
+async def search_data(session_maker):
+    async with session_maker() as session:
+        installed = await session.scalar(
+            text("SELECT count(*) FROM pg_extension WHERE extname = 'pg_trgm'")
+        )
+        encoding = await session.scalar(text("SHOW server_encoding"))
+    if not installed or encoding != "UTF8":
+        # CI provides both, so a skip there would hide the ranking tests.
+        if os.environ.get("SEARCH_TESTS_REQUIRED"):
+            pytest.fail("search needs pg_trgm on a UTF8 database")
+        pytest.skip("search needs pg_trgm on a UTF8 database")
+
+    tag = uuid.uuid4().hex[:8]
+    async with session_maker() as session:
+        course = Course(name=f"量子力學 {tag}", category=CourseCategory.GRADUATE)
+        other = Course(name=f"Quantum Lab {tag}", category=CourseCategory.GENERAL)
+        session.add_all([course, other])
+        await session.flush()
+        session.add_all(
+            [
+                Archive(
+                    name=f"{tag} midterm",
+                    academic_year=2024,
+                    archive_type=ArchiveType.MIDTERM,
+                    professor=f"Ｐｒｏｆ {tag}",
+                    object_name=f"archives/{tag}/1.pdf",
+                    course_id=course.id,
+                ),
+                Archive(
+                    name="final",
+                    academic_year=2023,
+                    archive_type=ArchiveType.FINAL,
+                    professor=f"Prof {tag}",
+                    object_name=f"archives/{tag}/2.pdf",
+                    course_id=course.id,
+                ),
+            ]
+        )
+        await session.commit()
+
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=1, is_admin=False
+    )
+    try:
+        yield {"tag": tag, "course": course, "other": other}
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            ids = [course.id, other.id]
+            await session.execute(delete(Archive).where(Archive.course_id.in_(ids)))
+            await session.execute(delete(Course).where(Course.id.in_(ids)))
+            await session.commit()
+
+
+def _archive_id(hits, title):
+    return next(hit["archive_id"] for hit in hits if hit["title"] == title)
+
+
+@pytest.mark.asyncio
+async def test_search_returns_hits_across_entity_types(client, search_data):
+    tag = search_data["tag"]
+    response = await client.get("/search", params={"q": tag.upper()})
+    assert response.status_code == 200
+    hits = response.json()["hits"]
+
+    found = {(hit["type"], hit["course_id"], hit["archive_id"]) for hit in hits}
+    course_id = search_data["course"].id
+    assert ("course", course_id, None) in found
+    assert ("course", search_data["other"].id, None) in found
+    assert ("archive", course_id, _archive_id(hits, f"{tag} midterm")) in found
+    # Fullwidth and ASCII spellings normalize to the same professor.
+    professors = [hit for hit in hits if hit["type"] == "professor"]
+    assert [hit["course_id"] for hit in professors] == [course_id]
+    assert all(hit["score"] >= 1 for hit in hits)
+    assert hits == sorted(hits, key=lambda hit: hit["score"], reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_exact_matches_first(client, search_data):
+    tag = search_data["tag"]
+    course_id = search_data["course"].id
+    # Both spellings of the professor normalize to the same search key.
+    for query in (f"Ｐｒｏｆ {tag}", f"PROF {tag}"):
+        response = await client.get("/search", params={"q": query})
+        assert response.status_code == 200
+        top = response.json()["hits"][0]
+        assert (top["type"], top["course_id"]) == ("professor", course_id)
+        assert top["score"] == 2
+
+    response = await client.get("/search", params={"q": f"quantum lab {tag}"})
+    hits = response.json()["hits"]
+    assert (hits[0]["type"], hits[0]["course_id"]) == (
+        "course",
+        search_data["other"].id,
+    )
+    assert hits[0]["score"] == 2
+    assert all(hit["score"] < 2 for hit in hits[1:])
+
+
+@pytest.mark.asyncio
+async def test_search_paginates(client, search_data):
+    tag = search_data["tag"]
+    first = (await client.get("/search", params={"q": tag, "limit": 2})).json()
+    assert len(first["hits"]) == 2
+    assert first["next_offset"] == 2
+
+    rest = (
+        await client.get("/search", params={"q": tag, "limit": 50, "offset": 2})
+    ).json()
+    assert rest["next_offset"] is None
+    assert len(first["hits"]) + len(rest["hits"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_search_rejects_empty_query(client):
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=1, is_admin=False
+    )
+    try:
+        for blank in ("", "   ", "\t\n"):
+            response = await client.get("/search", params={"q": blank})
+            assert response.status_code == 422
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
@@ -15,6 +15,7 @@ from app.models.models import (
     CourseCategory,
     User,
 )
+from app.utils.downloads import flush_downloads, record_downloads
 
 
 @pytest.fixture
@@ -100,7 +101,7 @@ async def statistics_records(session_maker, statistics_now):
             await session.refresh(deleted_archive)
             archive_ids = [active_archive.id, deleted_archive.id]
 
-        yield
+        yield archive_ids
     finally:
         async with session_maker() as session:
             if archive_ids:
@@ -154,6 +155,12 @@ async def test_statistics_endpoint_handles_errors(monkeypatch, client):
 @pytest.mark.asyncio
 async def test_get_system_statistics_direct_success(session_maker, statistics_records):
     async with session_maker() as session:
+        # Downloads still buffered in Redis count for live archives only.
+        await flush_downloads(session)
+        live_id, deleted_id = statistics_records
+        await record_downloads(session, [live_id, deleted_id])
+        await record_downloads(session, [live_id])
+
         stats = await get_system_statistics(db=session)
 
         assert stats["success"] is True
@@ -175,7 +182,8 @@ async def test_get_system_statistics_direct_success(session_maker, statistics_re
         assert data["totalUsers"] == total_users
         assert data["totalCourses"] == total_courses
         assert data["totalArchives"] == total_archives
-        assert data["totalDownloads"] == total_downloads
+        assert data["totalDownloads"] == total_downloads + 2
+        await flush_downloads(session)
         assert data["onlineUsers"] >= 1
         assert data["activeToday"] >= 1
 
@@ -195,3 +203,57 @@ async def test_get_system_statistics_direct_handles_exception(
         assert stats["success"] is False
         assert stats["error"] == "Failed to fetch statistics."
         assert stats["data"]["totalUsers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_system_statistics_counts_buffered_logins(
+    monkeypatch, make_user, session_maker, statistics_now
+):
+    user = await make_user()
+
+    async with session_maker() as session:
+        before = (await get_system_statistics(db=session))["data"]
+
+    async def fake_pending():
+        return {user.id: (statistics_now, None)}
+
+    monkeypatch.setattr(statistics, "get_pending_activity", fake_pending)
+
+    async with session_maker() as session:
+        after = (await get_system_statistics(db=session))["data"]
+
+    assert after["onlineUsers"] == before["onlineUsers"] + 1
+    assert after["activeToday"] == before["activeToday"] + 1
+
+
+@pytest.mark.asyncio
+async def test_get_system_statistics_batches_buffered_entries(
+    monkeypatch, make_user, session_maker, statistics_now, statistics_records
+):
+    monkeypatch.setattr(statistics, "ACTIVITY_BATCH_SIZE", 1)
+    monkeypatch.setattr(statistics, "DOWNLOAD_BATCH_SIZE", 1)
+    online, logged_out = await make_user(), await make_user()
+    live_id, deleted_id = statistics_records
+
+    async with session_maker() as session:
+        await flush_downloads(session)
+        before = (await get_system_statistics(db=session))["data"]
+
+    async def fake_activity():
+        return {
+            online.id: (statistics_now, None),
+            logged_out.id: (statistics_now, statistics_now + timedelta(minutes=1)),
+        }
+
+    async def fake_downloads():
+        return {live_id: 3, deleted_id: 5, 2**31 - 1: 7}
+
+    monkeypatch.setattr(statistics, "get_pending_activity", fake_activity)
+    monkeypatch.setattr(statistics, "get_pending_downloads", fake_downloads)
+
+    async with session_maker() as session:
+        after = (await get_system_statistics(db=session))["data"]
+
+    assert after["onlineUsers"] == before["onlineUsers"] + 1
+    assert after["activeToday"] == before["activeToday"] + 2
+    assert after["totalDownloads"] == before["totalDownloads"] + 3
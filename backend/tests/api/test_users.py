@@ -1,4 +1,5 @@
 import uuid
+from unittest.mock import AsyncMock
 
 import pytest
 from fastapi import HTTPException
@@ -228,7 +229,7 @@ async def test_get_users_direct_returns_users(session_maker):
             current_user=UserRoles(user_id=2, is_admin=True),
             db=session,
         )
-        assert any(item.id == user.id for item in users)
+        assert any(item["id"] == user.id for item in users)
 
         await session.delete(user)
         await session.commit()
@@ -296,8 +297,8 @@ async def test_create_user_direct_duplicate_name(session_maker):
 async def test_create_user_direct_success(monkeypatch, session_maker):
     async with session_maker() as session:
         monkeypatch.setattr(
-            "app.api.services.users.get_password_hash",
-            lambda password: f"hashed-{password}",
+            "app.api.services.users.get_password_hash_async",
+            AsyncMock(side_effect=lambda password: f"hashed-{password}"),
         )
         created = await create_user(
             user_data=UserCreate(
@@ -409,8 +410,8 @@ async def test_update_user_direct_updates_fields(monkeypatch, session_maker):
         await session.refresh(user)
 
         monkeypatch.setattr(
-            "app.api.services.users.get_password_hash",
-            lambda password: f"hashed-{password}",
+            "app.api.services.users.get_password_hash_async",
+            AsyncMock(side_effect=lambda password: f"hashed-{password}"),
         )
 
         updated = await update_user(
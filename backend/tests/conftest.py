@@ -53,6 +53,39 @@ async def override_db_session(monkeypatch):
     await engine.dispose()
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def override_redis_client(monkeypatch):
+    """Give each test a Redis client bound to its own event loop."""
+    from app.utils import cache
+
+    monkeypatch.setattr(cache, "_redis_client", None)
+
+    yield
+
+    if cache._redis_client is not None:
+        await cache._redis_client.aclose()
+
+
+@pytest.fixture(autouse=True)
+def reset_course_catalog():
+    """Tests insert courses directly, without bumping the catalog version."""
+    from app.utils.catalog import clear_cached_course_catalog
+
+    clear_cached_course_catalog()
+    yield
+    clear_cached_course_catalog()
+
+
+@pytest.fixture(autouse=True)
+def reset_presigned_urls():
+    """Tests swap in fake MinIO clients that sign differently."""
+    from app.utils.storage import clear_presigned_urls
+
+    clear_presigned_urls()
+    yield
+    clear_presigned_urls()
+
+
 @pytest.fixture()
 def session_maker():
     from app.db.session import AsyncSessionLocal
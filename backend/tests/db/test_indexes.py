@@ -0,0 +1,160 @@
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+from app.models.models import (
+    Archive,
+    ArchiveDiscussionMessage,
+    Course,
+    CourseCategory,
+    User,
+)
+
+COURSES = 400
+ARCHIVES_PER_COURSE = 100
+MESSAGES_PER_ARCHIVE = 2000
+DISCUSSED_ARCHIVES = 40
+
+
+async def _seed(session, tag: str) -> dict:
+    """
+    Bulk-insert a realistic amount of data (about 10% soft-deleted) inside the
+    caller's transaction and refresh planner statistics.
+    """
+    user_id = (
+        await session.execute(
+            text(
+                "INSERT INTO users (name, email, is_admin, is_local) "
+                "VALUES (:name, :email, false, true) RETURNING id"
+            ),
+            {"name": f"explain-{tag}", "email": f"explain-{tag}@example.com"},
+        )
+    ).scalar_one()
+    await session.execute(
+        text(
+            "INSERT INTO courses (name, category) "
+            "SELECT 'explain-' || :tag || '-' || g, 'GENERAL' "
+            "FROM generate_series(1, :courses) AS g"
+        ),
+        {"tag": tag, "courses": COURSES},
+    )
+    await session.execute(
+        text(
+            "INSERT INTO archives (name, academic_year, archive_type, professor, "
+            "has_answers, download_count, object_name, uploader_id, course_id, "
+            "created_at, updated_at, deleted_at) "
+            "SELECT 'a' || g, 2024, 'FINAL', 'p' || g % 10, false, 0, 'obj' || g, "
+            ":uid, c.id, now() - g * interval '1 minute', now(), "
+            "CASE WHEN g % 10 = 0 THEN now() END "
+            "FROM courses c, generate_series(1, :per_course) AS g "
+            "WHERE c.name LIKE 'explain-' || :tag || '-%'"
+        ),
+        {"uid": user_id, "per_course": ARCHIVES_PER_COURSE, "tag": tag},
+    )
+    await session.execute(
+        text(
+            "INSERT INTO archive_discussion_messages "
+            "(archive_id, user_id, content, created_at, deleted_at) "
+            "SELECT a.id, :uid, 'm' || g, now(), "
+            "CASE WHEN g % 10 = 0 THEN now() END "
+            "FROM (SELECT id FROM archives WHERE uploader_id = :uid "
+            "      ORDER BY id LIMIT :archives) a, "
+            "generate_series(1, :per_archive) AS g"
+        ),
+        {
+            "uid": user_id,
+            "archives": DISCUSSED_ARCHIVES,
+            "per_archive": MESSAGES_PER_ARCHIVE,
+        },
+    )
+    for table in ("users", "courses", "archives", "archive_discussion_messages"):
+        await session.execute(text(f"ANALYZE {table}"))
+
+    course_id = (
+        await session.execute(
+            select(Course.id).where(Course.name == f"explain-{tag}-{COURSES // 2}")
+        )
+    ).scalar_one()
+    archive_id = (
+        await session.execute(
+            select(Archive.id)
+            .where(Archive.uploader_id == user_id)
+            .order_by(Archive.id)
+            .limit(1)
+        )
+    ).scalar_one()
+    return {"course_id": course_id, "archive_id": archive_id}
+
+
+async def _explain(session, statement) -> str:
+    sql = statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = result.scalar_one()
+    return plan if isinstance(plan, str) else json.dumps(plan)
+
+
+@pytest.mark.asyncio
+async def test_soft_delete_queries_use_partial_indexes(session_maker):
+    tag = uuid.uuid4().hex[:8]
+    async with session_maker() as session:
+        try:
+            ids = await _seed(session, tag)
+
+            # get_course_archives, first page and a later page
+            listing = (
+                select(Archive)
+                .where(
+                    Archive.course_id == ids["course_id"],
+                    Archive.deleted_at.is_(None),
+                )
+                .order_by(Archive.created_at.desc(), Archive.id.desc())
+                .limit(21)
+            )
+            plan = await _explain(session, listing)
+            assert "ix_archives_course_id_created_at_id_active" in plan
+            assert "Sort" not in plan
+
+            cursor = tuple_(Archive.created_at, Archive.id) < tuple_(
+                datetime.now(timezone.utc) - timedelta(minutes=50), 2**31 - 1
+            )
+            plan = await _explain(session, listing.where(cursor))
+            assert "ix_archives_course_id_created_at_id_active" in plan
+            assert "Sort" not in plan
+
+            # ... filtered by professor
+            plan = await _explain(session, listing.where(Archive.professor == "p3"))
+            assert "ix_archives_course_id_professor_created_at_id_active" in plan
+
+            # _fetch_archive_discussion_messages
+            plan = await _explain(
+                session,
+                select(ArchiveDiscussionMessage, User.nickname, User.name)
+                .join(User, User.id == ArchiveDiscussionMessage.user_id)
+                .where(
+                    ArchiveDiscussionMessage.archive_id == ids["archive_id"],
+                    ArchiveDiscussionMessage.deleted_at.is_(None),
+                )
+                .order_by(ArchiveDiscussionMessage.id.desc())
+                .limit(50),
+            )
+            assert "ix_archive_discussion_messages_archive_id_id_active" in plan
+
+            # Course lookup by (name, category) used by uploads and admin edits
+            plan = await _explain(
+                session,
+                select(Course).where(
+                    Course.name == f"explain-{tag}-7",
+                    Course.category == CourseCategory.GENERAL,
+                    Course.deleted_at.is_(None),
+                ),
+            )
+            assert "uq_courses_name_category_active" in plan
+        finally:
+            await session.rollback()
@@ -1,7 +1,10 @@
-import subprocess
+import asyncio
+import uuid
 from contextlib import asynccontextmanager
 
 import pytest
+from sqlalchemy import text
+
 from app.core.config import settings
 from app.db import init_db
 from app.models.models import Course, Meme, User, CourseCategory
@@ -71,6 +74,50 @@ class FakeSession:
         return None
 
 
+class FakeConnection:
+    def __init__(self, tracker, migrate):
+        self.tracker = tracker
+        self.migrate = migrate
+
+    async def execute(self, statement, params=None):
+        self.tracker["locks"].append(str(statement))
+
+    async def scalar(self, statement, params=None):
+        self.tracker["locks"].append(str(statement))
+        return True
+
+    async def commit(self):
+        return None
+
+    async def rollback(self):
+        return None
+
+    async def run_sync(self, fn):
+        if fn is init_db.upgrade_to_head:
+            return self.migrate()
+        self.tracker["create_all"] += 1
+        return None
+
+
+class FakeEngine:
+    def __init__(self, tracker, migrate):
+        self.tracker = tracker
+        self.migrate = migrate
+
+    def connect(self):
+        @asynccontextmanager
+        async def ctx():
+            yield FakeConnection(self.tracker, self.migrate)
+
+        return ctx()
+
+
+def _fake_engine(monkeypatch, migrate):
+    tracker = {"create_all": 0, "locks": []}
+    monkeypatch.setattr(init_db, "engine", FakeEngine(tracker, migrate))
+    return tracker
+
+
 @pytest.mark.asyncio
 async def test_init_db_creates_admin_and_seeds(monkeypatch):
     original_loader = init_db.load_seed_data
@@ -92,23 +139,14 @@ async def test_init_db_creates_admin_and_seeds(monkeypatch):
         ],
     }
 
-    class Result:
-        returncode = 0
-        stdout = ""
-        stderr = ""
-
     fake_session = FakeSession()
+    tracker = _fake_engine(monkeypatch, lambda: True)
 
     @asynccontextmanager
     async def fake_session_factory():
         async with fake_session:
             yield fake_session
 
-    monkeypatch.setattr(
-        subprocess,
-        "run",
-        lambda *args, **kwargs: Result(),
-    )
     monkeypatch.setattr(
         init_db,
         "load_seed_data",
@@ -133,6 +171,9 @@ async def test_init_db_creates_admin_and_seeds(monkeypatch):
     }
     assert len(fake_session.added_memes) == 1
     assert fake_session.added_memes[0].content == "Study hard!"
+    assert tracker["create_all"] == 0
+    assert "pg_try_advisory_lock" in tracker["locks"][0]
+    assert "pg_advisory_unlock" in tracker["locks"][-1]
 
     original_loader.cache_clear()
 
@@ -142,11 +183,6 @@ async def test_init_db_fallback_when_migration_fails(monkeypatch):
     original_loader = init_db.load_seed_data
     original_loader.cache_clear()
 
-    class FailResult:
-        returncode = 1
-        stdout = ""
-        stderr = "boom"
-
     fake_session = FakeSession(admin_exists=True, course_count=1, meme_count=1)
 
     @asynccontextmanager
@@ -154,37 +190,11 @@ async def test_init_db_fallback_when_migration_fails(monkeypatch):
         async with fake_session:
             yield fake_session
 
-    class FakeConnection:
-        def __init__(self, tracker):
-            self.tracker = tracker
+    def failing_migration():
+        raise RuntimeError("boom")
 
-        async def run_sync(self, fn):
-            self.tracker["create_all"] += 1
-            return None
+    tracker = _fake_engine(monkeypatch, failing_migration)
 
-        async def commit(self):
-            return None
-
-    class FakeEngine:
-        def __init__(self, tracker):
-            self.tracker = tracker
-
-        def begin(self):
-            tracker = self.tracker
-
-            @asynccontextmanager
-            async def ctx():
-                yield FakeConnection(tracker)
-
-            return ctx()
-
-    tracker = {"create_all": 0}
-
-    monkeypatch.setattr(
-        subprocess,
-        "run",
-        lambda *args, **kwargs: FailResult(),
-    )
     monkeypatch.setattr(
         init_db,
         "load_seed_data",
@@ -197,14 +207,88 @@ async def test_init_db_fallback_when_migration_fails(monkeypatch):
         lambda: fake_session_factory(),
         raising=False,
     )
-    monkeypatch.setattr(
-        init_db,
-        "engine",
-        FakeEngine(tracker),
-        raising=False,
-    )
-
     await init_db.init_db()
 
     assert tracker["create_all"] == 1
     original_loader.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_init_db_can_skip_migrations(monkeypatch):
+    def unexpected_migration():
+        raise AssertionError("migrations should be skipped")
+
+    tracker = _fake_engine(monkeypatch, unexpected_migration)
+    monkeypatch.setattr(init_db.settings, "RUN_MIGRATIONS_ON_STARTUP", False)
+
+    async def fake_seed():
+        tracker["seeded"] = True
+
+    monkeypatch.setattr(init_db, "seed_db", fake_seed)
+
+    await init_db.init_db()
+
+    assert tracker["seeded"] is True
+    assert tracker["create_all"] == 0
+
+
+@pytest.mark.asyncio
+async def test_upgrade_to_head_is_noop_at_head():
+    from app.db.session import engine
+
+    async with engine.connect() as conn:
+        assert await conn.run_sync(init_db.upgrade_to_head) is False
+
+
+@pytest.mark.asyncio
+async def test_migration_lock_blocks_other_processes():
+    from app.db.session import engine
+
+    async with engine.connect() as holder, engine.connect() as other:
+        async with init_db.migration_lock(holder):
+            acquired = await other.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"),
+                {"key": init_db.MIGRATION_LOCK_KEY},
+            )
+            assert acquired is False
+
+        acquired = await other.scalar(
+            text("SELECT pg_try_advisory_lock(:key)"),
+            {"key": init_db.MIGRATION_LOCK_KEY},
+        )
+        assert acquired is True
+        await other.execute(
+            text("SELECT pg_advisory_unlock(:key)"),
+            {"key": init_db.MIGRATION_LOCK_KEY},
+        )
+
+
+@pytest.mark.asyncio
+async def test_migration_lock_waiter_does_not_block_concurrent_index(monkeypatch):
+    from app.db.session import engine
+
+    monkeypatch.setattr(init_db, "MIGRATION_LOCK_POLL_INTERVAL", 0.05)
+    table = f"lock_probe_{uuid.uuid4().hex[:8]}"
+    async with engine.connect() as holder, engine.connect() as waiter:
+        # Alembic runs CREATE INDEX CONCURRENTLY outside a transaction.
+        holder = await holder.execution_options(isolation_level="AUTOCOMMIT")
+        await holder.execute(text(f"CREATE TABLE {table} (id integer)"))
+        try:
+            async with init_db.migration_lock(holder):
+
+                async def wait_for_lock():
+                    async with init_db.migration_lock(waiter):
+                        return True
+
+                waiting = asyncio.create_task(wait_for_lock())
+                await asyncio.sleep(0.2)
+                assert not waiting.done()
+                await asyncio.wait_for(
+                    holder.execute(
+                        text(f"CREATE INDEX CONCURRENTLY ix_{table} ON {table} (id)")
+                    ),
+                    timeout=10,
+                )
+            assert await asyncio.wait_for(waiting, timeout=5) is True
+        finally:
+            await holder.execute(text(f"DROP TABLE IF EXISTS {table}"))
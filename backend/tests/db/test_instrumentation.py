@@ -0,0 +1,44 @@
+import logging
+
+from app.db import instrumentation
+from app.db.instrumentation import QueryStats, normalize_sql
+
+
+def test_normalize_sql_collapses_parameters():
+    first = normalize_sql(
+        "SELECT archives.id FROM archives\n WHERE archives.id IN "
+        "($1::INTEGER, $2::INTEGER, $3::INTEGER) AND archives.name = $4::VARCHAR"
+    )
+    second = normalize_sql(
+        "SELECT archives.id FROM archives WHERE archives.id IN ($1::INTEGER) "
+        "AND archives.name = $2::VARCHAR"
+    )
+    assert first == second
+    assert first == (
+        "SELECT archives.id FROM archives WHERE archives.id IN (?) "
+        "AND archives.name = ?"
+    )
+
+
+def test_query_stats_warns_once_on_repeated_statement(monkeypatch, caplog):
+    monkeypatch.setattr(instrumentation.settings, "SQL_REPEAT_WARNING_THRESHOLD", 3)
+    stats = QueryStats()
+
+    with caplog.at_level(logging.WARNING, logger=instrumentation.__name__):
+        for user_id in range(6):
+            stats.record(f"SELECT * FROM users WHERE id = ${user_id + 1}", 1.0)
+        stats.record("SELECT 1", 5.0)
+
+    assert stats.count == 7
+    assert stats.slowest_sql == "SELECT 1"
+    assert stats.repeated == {"SELECT * FROM users WHERE id = ?"}
+    assert len([r for r in caplog.records if "N+1" in r.getMessage()]) == 1
+    assert stats.server_timing() == 'db;dur=11.0;desc="7 queries"'
+
+
+def test_query_stats_skips_repeat_check_when_disabled(monkeypatch):
+    monkeypatch.setattr(instrumentation.settings, "SQL_REPEAT_WARNING_THRESHOLD", 1)
+    stats = QueryStats(check_repeats=False)
+    for _ in range(3):
+        stats.record("SELECT 1", 1.0)
+    assert stats.repeated == set()
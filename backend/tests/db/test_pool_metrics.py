@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.middleware import current_request
+from app.db.metrics import (
+    Histogram,
+    InstrumentedAsyncAdaptedQueuePool,
+    instrument_engine,
+    pool_metrics,
+)
+
+DATABASE_URL = (
+    "postgresql+asyncpg://"
+    f"{settings.DB_USER}:{settings.DB_PASSWORD}@"
+    f"{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+)
+
+
+def test_histogram_buckets_observations():
+    histogram = Histogram(buckets=(1, 10))
+    for value in (0.5, 1, 7, 50):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"le_1": 2, "le_10": 1, "inf": 1}
+    assert snapshot["count"] == 4
+    assert snapshot["max_ms"] == 50
+
+
+@pytest.mark.asyncio
+async def test_instrumented_pool_tracks_waits_timeouts_and_holders():
+    engine = create_async_engine(
+        DATABASE_URL,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    metrics = instrument_engine(engine, "test-pool")
+    token = current_request.set("GET /held")
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            snapshot = metrics.snapshot()
+            assert snapshot["checked_out"] == 1
+            assert snapshot["holders"][0]["holder"] == "GET /held"
+
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+
+        snapshot = metrics.snapshot()
+        assert snapshot["checked_out"] == 0
+        assert snapshot["holders"] == []
+        assert snapshot["timeouts"] == 1
+        assert snapshot["wait_ms"]["count"] == 2
+        assert snapshot["hold_ms"]["count"] == 1
+
+        # Pools recreated by dispose() keep reporting into the same metrics.
+        await engine.dispose()
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        assert metrics.snapshot()["wait_ms"]["count"] == 3
+    finally:
+        current_request.reset(token)
+        pool_metrics.pop("test-pool", None)
+        await engine.dispose()
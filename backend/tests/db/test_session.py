@@ -0,0 +1,84 @@
+import pytest
+
+from app.db import session as db_session
+
+
+class FakeSession:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def close(self):
+        self.closed = True
+
+
+async def _read_session_name():
+    generator = db_session.get_read_session()
+    session = await generator.__anext__()
+    await generator.aclose()
+    return session.name
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    monkeypatch.setattr(db_session, "AsyncSessionLocal", lambda: FakeSession("primary"))
+    monkeypatch.setattr(db_session, "ReadSessionLocal", lambda: FakeSession("replica"))
+    monkeypatch.setattr(db_session, "_replica_status", (0.0, False))
+    monkeypatch.setattr(db_session.settings, "DB_REPLICA_MAX_LAG_SECONDS", 5.0)
+    lag = {"seconds": 0.0, "checks": 0}
+
+    async def fake_lag():
+        lag["checks"] += 1
+        if isinstance(lag["seconds"], Exception):
+            raise lag["seconds"]
+        return lag["seconds"]
+
+    monkeypatch.setattr(db_session, "_replica_lag_seconds", fake_lag)
+    return lag
+
+
+@pytest.mark.asyncio
+async def test_read_session_uses_primary_without_replica(monkeypatch):
+    monkeypatch.setattr(db_session, "AsyncSessionLocal", lambda: FakeSession("primary"))
+    monkeypatch.setattr(db_session, "ReadSessionLocal", None)
+
+    assert await _read_session_name() == "primary"
+
+
+@pytest.mark.asyncio
+async def test_read_session_routes_to_fresh_replica(replica):
+    assert await _read_session_name() == "replica"
+    assert await _read_session_name() == "replica"
+    # The lag result is cached for the check interval.
+    assert replica["checks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_read_session_falls_back_when_replica_lags(monkeypatch, replica):
+    replica["seconds"] = 30.0
+    assert await _read_session_name() == "primary"
+
+    monkeypatch.setattr(db_session, "_replica_status", (0.0, False))
+    replica["seconds"] = RuntimeError("replica down")
+    assert await _read_session_name() == "primary"
+
+
+@pytest.mark.asyncio
+async def test_read_session_falls_back_when_replica_is_not_streaming(replica):
+    # A disconnected replica has replayed all it received, so only the WAL
+    # receiver status tells it apart from a caught-up one.
+    replica["seconds"] = None
+    assert await _read_session_name() == "primary"
+
+
+@pytest.mark.asyncio
+async def test_replica_lag_query_is_zero_on_primary(session_maker):
+    async with session_maker() as session:
+        result = await session.execute(db_session.REPLICA_LAG_QUERY)
+        assert float(result.scalar()) == 0
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import select, text
+
+from app.db import slow_queries
+from app.db.instrumentation import QueryStats, current_query_stats
+from app.models.models import User
+
+
+@pytest.fixture
+def slow_log(monkeypatch):
+    log = slow_queries.SlowQueryLog(maxsize=2)
+    monkeypatch.setattr("app.db.instrumentation.slow_query_log", log)
+    monkeypatch.setattr(slow_queries.settings, "SLOW_QUERY_THRESHOLD_MS", 0.001)
+    monkeypatch.setattr(slow_queries.settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 1.0)
+    return log
+
+
+@pytest.mark.asyncio
+async def test_slow_select_is_logged_with_plan(slow_log, session_maker):
+    token = current_query_stats.set(QueryStats(label="GET /slow"))
+    try:
+        async with session_maker() as session:
+            await session.execute(select(User.id).where(User.name == "nobody"))
+    finally:
+        current_query_stats.reset(token)
+
+    entry = slow_log.snapshot()[0]
+    assert entry["route"] == "GET /slow"
+    assert entry["sql"].startswith("SELECT users.id FROM users WHERE users.name = ?")
+    assert "nobody" in entry["parameters"]
+    assert "Execution Time" in entry["plan"]
+
+
+@pytest.mark.asyncio
+async def test_failed_explain_leaves_transaction_usable(
+    monkeypatch, slow_log, session_maker
+):
+    monkeypatch.setattr(slow_queries, "EXPLAIN_OPTIONS", "NOT_AN_OPTION")
+    async with session_maker() as session:
+        await session.execute(select(User.id).where(User.name == "nobody"))
+        assert await session.scalar(text("SELECT 1")) == 1
+
+    assert all(entry["plan"] is None for entry in slow_log.snapshot())
+
+
+@pytest.mark.asyncio
+async def test_side_effect_statements_are_not_explained(slow_log, session_maker):
+    async with session_maker() as session:
+        await session.execute(text("SELECT pg_advisory_lock(42)"))
+        await session.execute(text("SELECT pg_advisory_unlock(42)"))
+        held = await session.scalar(
+            text("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory'")
+        )
+
+    assert held == 0
+    entries = slow_log.snapshot()
+    # Ring buffer keeps the newest two statements.
+    assert len(entries) == 2
+    assert entries[1]["sql"] == "SELECT pg_advisory_unlock(42)"
+    assert entries[1]["plan"] is None
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log_is_opt_in(monkeypatch, session_maker):
+    log = slow_queries.SlowQueryLog(maxsize=10)
+    monkeypatch.setattr("app.db.instrumentation.slow_query_log", log)
+    monkeypatch.setattr(slow_queries.settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+
+    async with session_maker() as session:
+        await session.execute(text("SELECT 1"))
+
+    assert log.snapshot() == []
@@ -0,0 +1,58 @@
+import uuid
+
+import pytest
+from sqlalchemy import delete
+
+from app.db.instrumentation import QueryStats, current_query_stats
+from app.db.writes import insert_returning, update_returning
+from app.models.models import Course, CourseCategory, Notification
+
+
+@pytest.mark.asyncio
+async def test_insert_returning_fills_defaults_in_one_statement(session_maker):
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        async with session_maker() as session:
+            notification = await insert_returning(
+                session, Notification(title="Maintenance", body="Tonight")
+            )
+            await session.commit()
+    finally:
+        current_query_stats.reset(token)
+
+    try:
+        assert stats.count == 1
+        assert notification.id is not None
+        assert notification.is_active is True
+        assert notification.created_at is not None
+    finally:
+        async with session_maker() as session:
+            await session.execute(
+                delete(Notification).where(Notification.id == notification.id)
+            )
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_update_returning_refreshes_loaded_instance(session_maker):
+    name = f"Course {uuid.uuid4().hex[:6]}"
+    async with session_maker() as session:
+        course = await insert_returning(
+            session, Course(name=name, category=CourseCategory.GENERAL)
+        )
+        await session.commit()
+
+        updated = await update_returning(
+            session, Course, Course.id == course.id, name=Course.name + " II"
+        )
+        await session.commit()
+
+        assert updated is course
+        assert course.name == f"{name} II"
+
+        missing = await update_returning(session, Course, Course.id == -1, name="x")
+        assert missing is None
+
+        await session.execute(delete(Course).where(Course.id == course.id))
+        await session.commit()
@@ -4,6 +4,7 @@ import httpx
 import pytest
 from fastapi import HTTPException
 
+from app.services import auth as auth_service
 from app.services.auth import oauth_callback
 
 
@@ -57,7 +58,7 @@ class FakeAsyncClient:
 @pytest.mark.asyncio
 async def test_oauth_callback_valid(monkeypatch):
     fake_client = FakeAsyncClient()
-    monkeypatch.setattr(httpx, "AsyncClient", lambda *_, **__: fake_client)
+    monkeypatch.setattr(auth_service, "get_oauth_http_client", lambda: fake_client)
 
     result = await oauth_callback(
         code="abc",
@@ -67,6 +68,7 @@ async def test_oauth_callback_valid(monkeypatch):
     assert result["provider"] == "nycu"
     assert result["sub"] == "student"
     assert result["email"] == "student@example.com"
+    assert set(result["timings"]) == {"oauth_token", "oauth_userinfo"}
 
 
 @pytest.mark.asyncio
@@ -82,7 +84,7 @@ async def test_oauth_callback_token_request_error(monkeypatch):
     fake_client = FakeAsyncClient(
         token_exc=httpx.RequestError("boom", request=fake_request)
     )
-    monkeypatch.setattr(httpx, "AsyncClient", lambda *_, **__: fake_client)
+    monkeypatch.setattr(auth_service, "get_oauth_http_client", lambda: fake_client)
 
     with pytest.raises(HTTPException) as exc:
         await oauth_callback(code="abc", state="s", stored_state="s")
@@ -92,7 +94,7 @@ async def test_oauth_callback_token_request_error(monkeypatch):
 @pytest.mark.asyncio
 async def test_oauth_callback_token_failure_status(monkeypatch):
     fake_client = FakeAsyncClient(token_status=400)
-    monkeypatch.setattr(httpx, "AsyncClient", lambda *_, **__: fake_client)
+    monkeypatch.setattr(auth_service, "get_oauth_http_client", lambda: fake_client)
 
     with pytest.raises(HTTPException) as exc:
         await oauth_callback(code="abc", state="s", stored_state="s")
@@ -105,7 +107,7 @@ async def test_oauth_callback_profile_request_error(monkeypatch):
     fake_client = FakeAsyncClient(
         profile_exc=httpx.RequestError("oops", request=fake_request)
     )
-    monkeypatch.setattr(httpx, "AsyncClient", lambda *_, **__: fake_client)
+    monkeypatch.setattr(auth_service, "get_oauth_http_client", lambda: fake_client)
 
     with pytest.raises(HTTPException) as exc:
         await oauth_callback(code="abc", state="s", stored_state="s")
@@ -115,8 +117,58 @@ async def test_oauth_callback_profile_request_error(monkeypatch):
 @pytest.mark.asyncio
 async def test_oauth_callback_profile_failure_status(monkeypatch):
     fake_client = FakeAsyncClient(profile_status=500)
-    monkeypatch.setattr(httpx, "AsyncClient", lambda *_, **__: fake_client)
+    monkeypatch.setattr(auth_service, "get_oauth_http_client", lambda: fake_client)
 
     with pytest.raises(HTTPException) as exc:
         await oauth_callback(code="abc", state="s", stored_state="s")
     assert exc.value.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_oauth_callback_retries_reset_connection(monkeypatch):
+    fake_request = httpx.Request("GET", "https://oauth/userinfo")
+    fake_client = FakeAsyncClient()
+    original_get = fake_client.get
+    failures = [httpx.RemoteProtocolError("reset", request=fake_request)]
+
+    async def flaky_get(*args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return await original_get(*args, **kwargs)
+
+    fake_client.get = flaky_get
+    monkeypatch.setattr(auth_service, "get_oauth_http_client", lambda: fake_client)
+
+    result = await oauth_callback(code="abc", state="s", stored_state="s")
+    assert result["sub"] == "student"
+    assert failures == []
+
+
+@pytest.mark.asyncio
+async def test_oauth_callback_does_not_retry_token_exchange(monkeypatch):
+    # The reset arrives after the code was sent; the provider may have
+    # redeemed it already, so the exchange must not be replayed.
+    fake_request = httpx.Request("POST", "https://oauth/token")
+    fake_client = FakeAsyncClient(
+        token_exc=httpx.ReadError("reset after send", request=fake_request)
+    )
+    monkeypatch.setattr(auth_service, "get_oauth_http_client", lambda: fake_client)
+
+    with pytest.raises(HTTPException) as exc:
+        await oauth_callback(code="abc", state="s", stored_state="s")
+    assert exc.value.status_code == 502
+    assert [call[0] for call in fake_client.calls] == ["post"]
+
+
+@pytest.mark.asyncio
+async def test_get_oauth_http_client_is_shared(monkeypatch):
+    monkeypatch.setattr(auth_service, "_http_client", None)
+
+    client = auth_service.get_oauth_http_client()
+    assert auth_service.get_oauth_http_client() is client
+    assert client.timeout.connect == (
+        auth_service.settings.OAUTH_HTTP_CONNECT_TIMEOUT_SECONDS
+    )
+
+    await auth_service.close_oauth_http_client()
+    assert auth_service._http_client is None
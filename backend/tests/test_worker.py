@@ -243,3 +243,95 @@ async def test_get_redis_pool(monkeypatch):
     monkeypatch.setattr(worker, "create_pool", fake_create_pool)
     pool = await worker.get_redis_pool()
     assert pool == f"pool-for-{worker.WorkerSettings.redis_settings}"
+
+
+@pytest.mark.asyncio
+async def test_flush_user_activity_task(monkeypatch):
+    fake_session = FakeSession([])
+    flushed_with = []
+
+    async def fake_flush(db):
+        flushed_with.append(db)
+        return 3
+
+    monkeypatch.setattr(
+        worker,
+        "AsyncSession",
+        lambda *_args, **_kwargs: fake_session,
+    )
+    monkeypatch.setattr(worker, "flush_activity", fake_flush)
+
+    assert await worker.flush_user_activity_task({}) == 3
+    assert flushed_with == [fake_session]
+    assert any(
+        job.coroutine is worker.flush_user_activity_task
+        for job in worker.WorkerSettings.cron_jobs
+    )
+
+
+@pytest.mark.asyncio
+async def test_flush_download_counts_task(monkeypatch):
+    fake_session = FakeSession([])
+    flushed_with = []
+
+    async def fake_flush(db):
+        flushed_with.append(db)
+        return 5
+
+    monkeypatch.setattr(
+        worker,
+        "AsyncSession",
+        lambda *_args, **_kwargs: fake_session,
+    )
+    monkeypatch.setattr(worker, "flush_downloads", fake_flush)
+
+    assert await worker.flush_download_counts_task({}) == 5
+    assert flushed_with == [fake_session]
+    assert any(
+        job.coroutine is worker.flush_download_counts_task
+        for job in worker.WorkerSettings.cron_jobs
+    )
+
+
+@pytest.mark.asyncio
+async def test_rollup_download_stats_task(monkeypatch):
+    fake_session = FakeSession([])
+    calls = []
+
+    async def fake_partitions(db):
+        calls.append(("partitions", db))
+
+    async def fake_rollup(db):
+        calls.append(("rollup", db))
+
+    monkeypatch.setattr(
+        worker,
+        "AsyncSession",
+        lambda *_args, **_kwargs: fake_session,
+    )
+    monkeypatch.setattr(worker, "ensure_event_partitions", fake_partitions)
+    monkeypatch.setattr(worker, "rollup_downloads", fake_rollup)
+
+    await worker.rollup_download_stats_task({})
+    assert calls == [("partitions", fake_session), ("rollup", fake_session)]
+    assert any(
+        job.coroutine is worker.rollup_download_stats_task
+        for job in worker.WorkerSettings.cron_jobs
+    )
+
+
+@pytest.mark.asyncio
+async def test_renormalize_trending_task(monkeypatch):
+    calls = []
+
+    async def fake_renormalize():
+        calls.append(True)
+
+    monkeypatch.setattr(worker, "renormalize_trending", fake_renormalize)
+
+    await worker.renormalize_trending_task({})
+    assert calls == [True]
+    assert any(
+        job.coroutine is worker.renormalize_trending_task
+        for job in worker.WorkerSettings.cron_jobs
+    )
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.models import User
+from app.utils import activity
+from app.utils.cache import get_redis
+
+
+@pytest.mark.asyncio
+async def test_record_login_is_buffered_until_flush(make_user, session_maker):
+    user = await make_user()
+
+    async with session_maker() as session:
+        await activity.record_login(session, user.id)
+        await activity.record_logout(session, user.id)
+
+        pending = await activity.get_pending_activity()
+        assert pending[user.id][0] is not None
+        assert pending[user.id][1] is not None
+        assert (await session.get(User, user.id)).last_login is None
+
+        assert await activity.flush_activity(session) >= 1
+
+    async with session_maker() as session:
+        refreshed = await session.get(User, user.id)
+        assert refreshed.last_login == pending[user.id][0]
+        assert refreshed.last_logout == pending[user.id][1]
+    assert user.id not in await activity.get_pending_activity()
+
+
+@pytest.mark.asyncio
+async def test_flush_keeps_newer_database_value(make_user, session_maker):
+    now = datetime.now(timezone.utc)
+    user = await make_user(last_login=now)
+    await get_redis().hset(
+        activity.LAST_LOGIN_KEY,
+        str(user.id),
+        (now - timedelta(hours=1)).isoformat(),
+    )
+
+    async with session_maker() as session:
+        await activity.flush_activity(session)
+
+    async with session_maker() as session:
+        assert (await session.get(User, user.id)).last_login == now
+
+
+@pytest.mark.asyncio
+async def test_flush_replays_snapshot_left_by_crashed_flush(make_user, session_maker):
+    user = await make_user()
+    crashed_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+    redis = get_redis()
+    await redis.hset(
+        f"{activity.LAST_LOGIN_KEY}:flushing", str(user.id), crashed_at.isoformat()
+    )
+    assert (await activity.get_pending_activity())[user.id][0] == crashed_at
+
+    async with session_maker() as session:
+        await activity.flush_activity(session)
+
+    async with session_maker() as session:
+        assert (await session.get(User, user.id)).last_login == crashed_at
+    assert not await redis.exists(f"{activity.LAST_LOGIN_KEY}:flushing")
+
+
+@pytest.mark.asyncio
+async def test_record_login_falls_back_to_database(
+    monkeypatch, make_user, session_maker
+):
+    user = await make_user()
+
+    class BrokenRedis:
+        async def hset(self, *args):
+            raise ConnectionError("redis down")
+
+    monkeypatch.setattr(activity, "get_redis", lambda: BrokenRedis())
+
+    async with session_maker() as session:
+        await activity.record_login(session, user.id)
+
+    async with session_maker() as session:
+        assert (await session.get(User, user.id)).last_login is not None
@@ -1,5 +1,8 @@
 from datetime import datetime, timedelta, timezone
+import subprocess
+import sys
 import uuid
+from pathlib import Path
 
 import pytest
 from fastapi import HTTPException
@@ -12,13 +15,59 @@ from app.utils import auth as auth_utils
 class FakeRedis:
     def __init__(self):
         self.store: dict[str, str] = {}
+        self.get_calls = 0
+        self.published: list[tuple[str, str]] = []
 
-    def setex(self, key: str, expire: int, value: str):
+        self.expirations: dict[str, int] = {}
+
+    async def setex(self, key: str, expire: int, value: str):
         self.store[key] = value
+        self.expirations[key] = expire
 
-    def get(self, key: str):
+    async def get(self, key: str):
+        self.get_calls += 1
         return self.store.get(key)
 
+    async def mget(self, *keys: str):
+        self.get_calls += 1
+        return [self.store.get(key) for key in keys]
+
+    async def incr(self, key: str):
+        self.store[key] = str(int(self.store.get(key) or 0) + 1)
+        return int(self.store[key])
+
+    async def publish(self, channel: str, message: str):
+        self.published.append((channel, message))
+
+
+@pytest.fixture(autouse=True)
+def clear_auth_caches():
+    caches = (
+        auth_utils._unrevoked_tokens,
+        auth_utils._token_generations,
+        auth_utils._principals,
+    )
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+
+def _make_token(user_id: int, **claims) -> HTTPAuthorizationCredentials:
+    token = auth_utils.jwt.encode(
+        {
+            "uid": user_id,
+            "exp": int(
+                (datetime.now(timezone.utc) + timedelta(minutes=5)).timestamp()
+            ),
+            **claims,
+        },
+        auth_utils.settings.SECRET_KEY,
+        algorithm=auth_utils.settings.ALGORITHM,
+    )
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
 
 @pytest.mark.asyncio
 async def test_password_hash_roundtrip():
@@ -28,14 +77,105 @@ async def test_password_hash_roundtrip():
     assert auth_utils.verify_password("wrong", hashed) is False
 
 
-def test_blacklist_and_check_token(monkeypatch):
+@pytest.mark.asyncio
+async def test_blacklist_and_check_token(monkeypatch):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(auth_utils, "get_redis", lambda: fake_redis)
+
+    token = _make_token(1, jti="a").credentials
+    other = _make_token(1, jti="b").credentials
+    await auth_utils.blacklist_token(token)
+
+    key = f"blacklist:{auth_utils._token_key(token)}"
+    assert len(key) == len("blacklist:") + 32
+    assert 0 < fake_redis.expirations[key] <= 300
+    assert await auth_utils.is_token_revoked(token, {"uid": 1}) is True
+    assert await auth_utils.is_token_revoked(other, {"uid": 1}) is False
+    assert fake_redis.published[0][0] == auth_utils.AUTH_INVALIDATION_CHANNEL
+
+
+@pytest.mark.asyncio
+async def test_is_token_revoked_checks_legacy_blacklist_key(monkeypatch):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(auth_utils, "get_redis", lambda: fake_redis)
+
+    token = _make_token(1).credentials
+    # Revoked before blacklist keys were hashed.
+    fake_redis.store[f"blacklist:{token}"] = "1"
+    assert await auth_utils.is_token_revoked(token, {"uid": 1}) is True
+
+
+@pytest.mark.asyncio
+async def test_blacklist_token_skips_expired_token(monkeypatch):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(auth_utils, "get_redis", lambda: fake_redis)
+
+    expired = auth_utils.jwt.encode(
+        {"uid": 1, "exp": int(datetime.now(timezone.utc).timestamp()) - 10},
+        auth_utils.settings.SECRET_KEY,
+        algorithm=auth_utils.settings.ALGORITHM,
+    )
+    await auth_utils.blacklist_token(expired)
+    assert fake_redis.store == {}
+
+    await auth_utils.blacklist_token("not-a-jwt")
+    key = f"blacklist:{auth_utils._token_key('not-a-jwt')}"
+    assert fake_redis.expirations[key] == (
+        auth_utils.settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    )
+
+
+@pytest.mark.asyncio
+async def test_is_token_revoked_uses_local_cache(monkeypatch):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(auth_utils, "get_redis", lambda: fake_redis)
+
+    assert await auth_utils.is_token_revoked("cached", {"uid": 1}) is False
+    assert await auth_utils.is_token_revoked("cached", {"uid": 1}) is False
+    assert fake_redis.get_calls == 1
+
+    await auth_utils.blacklist_token("cached")
+    assert await auth_utils.is_token_revoked("cached", {"uid": 1}) is True
+
+
+@pytest.mark.asyncio
+async def test_invalidation_message_evicts_cached_token(monkeypatch):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(auth_utils, "get_redis", lambda: fake_redis)
+
+    assert await auth_utils.is_token_revoked("remote", {"uid": 1}) is False
+    # Another worker revokes the token and broadcasts it.
+    key = auth_utils._token_key("remote")
+    fake_redis.store[f"blacklist:{key}"] = "1"
+    auth_utils.handle_invalidation(f'{{"kind": "token", "key": "{key}"}}'.encode())
+
+    assert await auth_utils.is_token_revoked("remote", {"uid": 1}) is True
+    auth_utils.handle_invalidation(b"not-json")
+
+
+@pytest.mark.asyncio
+async def test_revoke_user_tokens_bumps_generation(monkeypatch):
     fake_redis = FakeRedis()
-    monkeypatch.setattr(auth_utils, "redis_client", fake_redis)
+    monkeypatch.setattr(auth_utils, "get_redis", lambda: fake_redis)
+
+    user = User(id=7, name="gen-user", email="gen@example.com", is_admin=False)
+    old_token = await auth_utils.create_access_token(user)
+    old_payload = auth_utils.jwt.get_unverified_claims(old_token)
+    assert old_payload["gen"] == 0
+    assert old_payload["jti"]
+    assert await auth_utils.is_token_revoked(old_token, old_payload) is False
+
+    await auth_utils.revoke_user_tokens(7)
+    assert await auth_utils.is_token_revoked(old_token, old_payload) is True
+
+    new_token = await auth_utils.create_access_token(user)
+    new_payload = auth_utils.jwt.get_unverified_claims(new_token)
+    assert new_payload["gen"] == 1
+    assert await auth_utils.is_token_revoked(new_token, new_payload) is False
 
-    token = "token-abc"
-    auth_utils.blacklist_token(token, expire_seconds=10)
-    assert auth_utils.is_token_blacklisted(token) is True
-    assert auth_utils.is_token_blacklisted("other") is False
+    auth_utils._token_generations.set(7, 5)
+    auth_utils.handle_invalidation('{"kind": "generation", "key": 7}')
+    assert auth_utils._token_generations.get(7) is None
 
 
 @pytest.mark.asyncio
@@ -76,7 +216,7 @@ async def test_authenticate_user_validates_credentials(session_maker):
 @pytest.mark.asyncio
 async def test_get_current_user_success(monkeypatch, session_maker):
     fake_redis = FakeRedis()
-    monkeypatch.setattr(auth_utils, "redis_client", fake_redis)
+    monkeypatch.setattr(auth_utils, "get_redis", lambda: fake_redis)
     suffix = uuid.uuid4().hex[:8]
 
     async with session_maker() as session:
@@ -126,13 +266,11 @@ async def test_get_current_user_success(monkeypatch, session_maker):
 @pytest.mark.asyncio
 async def test_get_current_user_blacklisted(monkeypatch, session_maker):
     fake_redis = FakeRedis()
-    fake_redis.setex("blacklist:blocked", 100, "1")
-    monkeypatch.setattr(auth_utils, "redis_client", fake_redis)
+    credentials = _make_token(1, jti="blocked")
+    key = auth_utils._token_key(credentials.credentials)
+    fake_redis.store[f"blacklist:{key}"] = "1"
+    monkeypatch.setattr(auth_utils, "get_redis", lambda: fake_redis)
 
-    credentials = HTTPAuthorizationCredentials(
-        scheme="Bearer",
-        credentials="blocked",
-    )
     async with session_maker() as session:
         with pytest.raises(HTTPException) as exc:
             await auth_utils.get_current_user(
@@ -140,12 +278,13 @@ async def test_get_current_user_blacklisted(monkeypatch, session_maker):
                 db=session,
             )
         assert exc.value.status_code == 401
+        assert exc.value.detail == "Token has been invalidated"
 
 
 @pytest.mark.asyncio
 async def test_get_current_user_missing_user(monkeypatch, session_maker):
     fake_redis = FakeRedis()
-    monkeypatch.setattr(auth_utils, "redis_client", fake_redis)
+    monkeypatch.setattr(auth_utils, "get_redis", lambda: fake_redis)
 
     token = auth_utils.jwt.encode(
         {
@@ -172,3 +311,105 @@ async def test_get_current_user_missing_user(monkeypatch, session_maker):
                 db=session,
             )
         assert exc.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_caches_principal(monkeypatch, session_maker):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(auth_utils, "get_redis", lambda: fake_redis)
+    suffix = uuid.uuid4().hex[:8]
+
+    async with session_maker() as session:
+        user = User(
+            name=f"principal-user-{suffix}",
+            email=f"principal-user-{suffix}@example.com",
+            is_admin=True,
+        )
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+        user_id = user.id
+
+    credentials = _make_token(user_id)
+    async with session_maker() as session:
+        roles = await auth_utils.get_current_user(token=credentials, db=session)
+        assert roles.is_admin is True
+        # The row is now in the session identity map for the handler.
+        assert await auth_utils.get_request_user(session, user_id) is not None
+
+    async with session_maker() as session:
+        stored = await session.get(User, user_id)
+        stored.deleted_at = datetime.now(timezone.utc)
+        await session.commit()
+
+    async with session_maker() as session:
+        roles = await auth_utils.get_current_user(token=credentials, db=session)
+        assert roles.user_id == user_id
+
+    await auth_utils.invalidate_principal(user_id)
+    assert ("auth:invalidate", f'{{"kind": "user", "key": {user_id}}}') in (
+        fake_redis.published
+    )
+
+    async with session_maker() as session:
+        with pytest.raises(HTTPException) as exc:
+            await auth_utils.get_current_user(token=credentials, db=session)
+        assert exc.value.status_code == 401
+        assert await auth_utils.get_request_user(session, user_id) is None
+        await session.delete(await session.get(User, user_id))
+        await session.commit()
+
+
+def test_user_invalidation_message_evicts_principal():
+    auth_utils._principals.set(42, (True, True))
+    auth_utils.handle_invalidation('{"kind": "user", "key": 42}')
+    assert auth_utils._principals.get(42) is None
+
+
+@pytest.mark.asyncio
+async def test_password_hash_async_roundtrip():
+    hashed = await auth_utils.get_password_hash_async("PoolSecret1!")
+    assert await auth_utils.verify_password_async("PoolSecret1!", hashed) is True
+    assert await auth_utils.verify_password_async("wrong", hashed) is False
+
+
+@pytest.mark.asyncio
+async def test_password_hash_async_rejects_when_queue_full(monkeypatch):
+    monkeypatch.setattr(auth_utils.settings, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(auth_utils.settings, "PASSWORD_HASH_QUEUE_LIMIT", 0)
+    monkeypatch.setattr(auth_utils, "_hash_jobs", 1)
+
+    with pytest.raises(HTTPException) as exc:
+        await auth_utils.get_password_hash_async("busy")
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_start_hash_executor_spawns_every_worker():
+    auth_utils.shutdown_hash_executor()
+    try:
+        await auth_utils.start_hash_executor()
+        executor = auth_utils._get_hash_executor()
+        assert len(executor._processes) == auth_utils.settings.PASSWORD_HASH_WORKERS
+        hashed = await auth_utils.get_password_hash_async("Warm1!")
+        assert await auth_utils.verify_password_async("Warm1!", hashed) is True
+    finally:
+        auth_utils.shutdown_hash_executor()
+
+
+def test_password_module_imports_without_the_app():
+    # Pool children import the hash functions' module; it must stay light.
+    script = (
+        "import sys, app.utils.passwords; "
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in "
+        "('app', 'fastapi', 'sqlalchemy', 'sqlmodel')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[2],
+    )
+    assert result.stdout.strip() == "['app', 'app.utils', 'app.utils.passwords']"
@@ -0,0 +1,47 @@
+from app.utils import cache
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+
+    ttl_cache = cache.TTLCache(maxsize=10, ttl=5)
+    ttl_cache.set("a", 1)
+    assert ttl_cache.get("a") == 1
+
+    now[0] += 6
+    assert ttl_cache.get("a") is None
+    assert len(ttl_cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    ttl_cache = cache.TTLCache(maxsize=2, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    assert ttl_cache.get("a") == 1
+
+    ttl_cache.set("c", 3)
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.pop("c") == 3
+    assert ttl_cache.pop("missing", "default") == "default"
+
+
+def test_get_redis_is_shared(monkeypatch):
+    monkeypatch.setattr(cache, "_redis_client", None)
+    created = []
+
+    class FakeClient:
+        async def aclose(self):
+            return None
+
+    def fake_from_url(url, **kwargs):
+        created.append((url, kwargs))
+        return FakeClient()
+
+    monkeypatch.setattr(cache.aioredis, "from_url", fake_from_url)
+
+    first = cache.get_redis()
+    assert cache.get_redis() is first
+    assert len(created) == 1
+    assert created[0][0] == cache.settings.REDIS_URL
@@ -0,0 +1,150 @@
+import random
+from datetime import date, datetime, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, select, text
+
+from app.models.models import (
+    ArchiveDownloadDaily,
+    ArchiveDownloadEvent,
+    ArchiveDownloadWeekly,
+)
+from app.utils import download_stats
+from app.utils.downloads import flush_downloads, record_downloads
+
+
+@pytest_asyncio.fixture
+async def archive_id(session_maker):
+    # Stats rows carry no foreign key, so any unused id will do.
+    archive_id = random.randint(10**8, 2 * 10**8)
+    yield archive_id
+    async with session_maker() as session:
+        for model in (
+            ArchiveDownloadEvent,
+            ArchiveDownloadDaily,
+            ArchiveDownloadWeekly,
+        ):
+            await session.execute(delete(model).where(model.archive_id == archive_id))
+        await session.commit()
+
+
+async def _partitions(session):
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'archive_download_events'::regclass"
+        )
+    )
+    return set(result.scalars().all())
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_flush_appends_download_events(session_maker, archive_id):
+    async with session_maker() as session:
+        await record_downloads(session, [archive_id])
+        await record_downloads(session, [archive_id])
+        await flush_downloads(session)
+
+        events = (
+            (
+                await session.execute(
+                    select(ArchiveDownloadEvent).where(
+                        ArchiveDownloadEvent.archive_id == archive_id
+                    )
+                )
+            )
+            .scalars()
+            .all()
+        )
+    assert sum(event.downloads for event in events) == 2
+    assert all(event.bucket.second == 0 for event in events)
+
+
+@pytest.mark.asyncio
+async def test_rollup_downloads_builds_daily_and_weekly_totals(
+    session_maker, archive_id
+):
+    async with session_maker() as session:
+        session.add_all(
+            [
+                ArchiveDownloadEvent(
+                    bucket=bucket, archive_id=archive_id, downloads=downloads
+                )
+                for bucket, downloads in [
+                    (_utc(2026, 1, 4, 23, 59), 5),
+                    (_utc(2026, 1, 5, 0, 0), 1),
+                    (_utc(2026, 1, 5, 23, 59), 2),
+                    (_utc(2026, 1, 6, 12, 0), 1),
+                    (_utc(2026, 1, 12, 8, 30), 2),
+                ]
+            ]
+        )
+        await session.commit()
+
+        for _ in range(2):  # reruns replace totals instead of adding
+            await download_stats.rollup_downloads(session, since=_utc(2026, 1, 5, 9))
+
+        daily = dict(
+            (
+                await session.execute(
+                    select(
+                        ArchiveDownloadDaily.day, ArchiveDownloadDaily.downloads
+                    ).where(ArchiveDownloadDaily.archive_id == archive_id)
+                )
+            ).all()
+        )
+        weekly = dict(
+            (
+                await session.execute(
+                    select(
+                        ArchiveDownloadWeekly.week, ArchiveDownloadWeekly.downloads
+                    ).where(ArchiveDownloadWeekly.archive_id == archive_id)
+                )
+            ).all()
+        )
+    # Jan 4 is before ``since`` and its week started before the lookback.
+    assert daily == {date(2026, 1, 5): 3, date(2026, 1, 6): 1, date(2026, 1, 12): 2}
+    assert weekly == {date(2026, 1, 5): 4, date(2026, 1, 12): 2}
+
+
+@pytest.mark.asyncio
+async def test_ensure_event_partitions_moves_rows_and_drops_old_ones(
+    session_maker, archive_id
+):
+    created = {"archive_download_events_203103", "archive_download_events_203104"}
+    async with session_maker() as session:
+        # Landed in the default partition before the monthly one existed.
+        session.add(
+            ArchiveDownloadEvent(
+                bucket=_utc(2031, 3, 9), archive_id=archive_id, downloads=4
+            )
+        )
+        await session.commit()
+        try:
+            await download_stats.ensure_event_partitions(session, now=_utc(2031, 3, 10))
+            assert created <= await _partitions(session)
+            moved = await session.scalar(
+                text(
+                    "SELECT downloads FROM archive_download_events_203103 "
+                    "WHERE archive_id = :archive_id"
+                ),
+                {"archive_id": archive_id},
+            )
+            assert moved == 4
+
+            await download_stats.ensure_event_partitions(session, now=_utc(2031, 8, 1))
+            remaining = await _partitions(session)
+            assert not created & remaining
+            assert "archive_download_events_203108" in remaining
+        finally:
+            for month in ("203103", "203104", "203108", "203109"):
+                await session.execute(
+                    text(f"DROP TABLE IF EXISTS archive_download_events_{month}")
+                )
+            await session.commit()
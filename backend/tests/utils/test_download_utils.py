@@ -0,0 +1,122 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete
+
+from app.models.models import (
+    Archive,
+    ArchiveType,
+    Course,
+    CourseCategory,
+    DownloadCountFlush,
+)
+from app.utils import downloads
+from app.utils.cache import get_redis
+
+FLUSHING_KEY = f"{downloads.DOWNLOAD_COUNTS_KEY}:flushing"
+
+
+@pytest_asyncio.fixture
+async def archive(session_maker):
+    async with session_maker() as session:
+        course = Course(name="Download Counts", category=CourseCategory.GENERAL)
+        session.add(course)
+        await session.flush()
+        archive = Archive(
+            name="Final",
+            academic_year=2024,
+            archive_type=ArchiveType.FINAL,
+            professor="Prof",
+            object_name="archives/downloads.pdf",
+            download_count=10,
+            course_id=course.id,
+        )
+        session.add(archive)
+        await session.commit()
+    try:
+        yield archive
+    finally:
+        async with session_maker() as session:
+            await session.execute(delete(Archive).where(Archive.id == archive.id))
+            await session.execute(delete(Course).where(Course.id == course.id))
+            await session.commit()
+
+
+async def _download_count(session_maker, archive_id):
+    async with session_maker() as session:
+        return (await session.get(Archive, archive_id)).download_count
+
+
+@pytest.mark.asyncio
+async def test_downloads_are_buffered_until_flush(session_maker, archive):
+    async with session_maker() as session:
+        await downloads.record_downloads(session, [archive.id])
+        await downloads.record_downloads(session, [archive.id])
+
+    assert await downloads.get_pending_downloads([archive.id]) == {archive.id: 2}
+    assert await _download_count(session_maker, archive.id) == 10
+
+    async with session_maker() as session:
+        assert await downloads.flush_downloads(session) >= 2
+
+    assert await _download_count(session_maker, archive.id) == 12
+    assert await downloads.get_pending_downloads([archive.id]) == {}
+    assert not await get_redis().exists(FLUSHING_KEY, f"{FLUSHING_KEY}:id")
+
+
+@pytest.mark.asyncio
+async def test_flush_replays_snapshot_left_by_crashed_flush(session_maker, archive):
+    redis = get_redis()
+    await redis.hset(FLUSHING_KEY, str(archive.id), 3)
+    await redis.hincrby(downloads.DOWNLOAD_COUNTS_KEY, str(archive.id), 1)
+    # Both the snapshot and newer downloads count while nothing is flushed.
+    assert await downloads.get_pending_downloads([archive.id]) == {archive.id: 4}
+
+    async with session_maker() as session:
+        await downloads.flush_downloads(session)
+    assert await _download_count(session_maker, archive.id) == 13
+
+    async with session_maker() as session:
+        await downloads.flush_downloads(session)
+    assert await _download_count(session_maker, archive.id) == 14
+
+
+@pytest.mark.asyncio
+async def test_flush_skips_snapshot_that_was_already_applied(session_maker, archive):
+    # A flush that committed but crashed before clearing Redis.
+    redis = get_redis()
+    await redis.hset(FLUSHING_KEY, str(archive.id), 3)
+    await redis.set(f"{FLUSHING_KEY}:id", "applied-snapshot")
+    async with session_maker() as session:
+        session.add(DownloadCountFlush(id="applied-snapshot"))
+        await session.commit()
+
+    try:
+        async with session_maker() as session:
+            await downloads.flush_downloads(session)
+
+        assert await _download_count(session_maker, archive.id) == 10
+        assert not await redis.exists(FLUSHING_KEY, f"{FLUSHING_KEY}:id")
+    finally:
+        async with session_maker() as session:
+            await session.execute(
+                delete(DownloadCountFlush).where(
+                    DownloadCountFlush.id == "applied-snapshot"
+                )
+            )
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_record_downloads_falls_back_to_database(
+    monkeypatch, session_maker, archive
+):
+    class BrokenRedis:
+        def pipeline(self, *args, **kwargs):
+            raise ConnectionError("redis down")
+
+    monkeypatch.setattr(downloads, "get_redis", lambda: BrokenRedis())
+
+    async with session_maker() as session:
+        await downloads.record_downloads(session, [archive.id])
+
+    assert await _download_count(session_maker, archive.id) == 11
@@ -1,4 +1,5 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlsplit
 
 from app.utils import storage
 
@@ -7,6 +8,7 @@ class FakeMinio:
     def __init__(self, *, exists=False):
         self.exists = exists
         self.called_make_bucket = False
+        self.signed = []
 
     def bucket_exists(self, bucket):
         return self.exists
@@ -14,10 +16,20 @@ class FakeMinio:
     def make_bucket(self, bucket):
         self.called_make_bucket = True
 
-    def presigned_get_object(self, bucket_name, object_name, expires):
+    def presigned_get_object(
+        self,
+        bucket_name,
+        object_name,
+        expires,
+        response_headers=None,
+        request_date=None,
+    ):
+        self.signed.append((object_name, request_date))
+        cache_control = (response_headers or {}).get("response-cache-control", "")
         return (
             f"http://{storage.settings.MINIO_ENDPOINT}/{bucket_name}/"
             f"{object_name}?expires={int(expires.total_seconds())}"
+            f"&date={request_date:%Y%m%dT%H%M%S}&cache={cache_control}"
         )
 
 
@@ -41,3 +53,38 @@ def test_presigned_get_url_rewrites_endpoint(monkeypatch):
     )
     assert url.startswith(storage.settings.EXTERNAL_ENDPOINT)
     assert "path/to/file.pdf" in url
+
+
+def test_presigned_get_url_is_stable_within_signing_window(monkeypatch):
+    fake = FakeMinio(exists=True)
+    monkeypatch.setattr(storage, "_minio_client", fake)
+    window = datetime(2026, 1, 1, 12, 15, tzinfo=timezone.utc)
+    monkeypatch.setattr(storage, "_signing_window", lambda: window)
+
+    first = storage.presigned_get_url("a.pdf", expires=timedelta(minutes=30))
+    again = storage.presigned_get_url("a.pdf", expires=timedelta(minutes=30))
+    assert again == first
+    # The second call was answered from the memo.
+    assert fake.signed == [("a.pdf", window)]
+
+    query = parse_qs(urlsplit(first).query)
+    # Valid for the full 30 minutes even when handed out at the window's end.
+    assert query["expires"] == ["2700"]
+    assert query["cache"] == ["private, max-age=2700, immutable"]
+
+    later = window + storage.SIGNING_WINDOW
+    monkeypatch.setattr(storage, "_signing_window", lambda: later)
+    assert storage.presigned_get_url("a.pdf", expires=timedelta(minutes=30)) != first
+    assert fake.signed[-1] == ("a.pdf", later)
+
+
+def test_signing_window_is_aligned(monkeypatch):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2026, 1, 1, 12, 29, 59, 999, tzinfo=tz)
+
+    monkeypatch.setattr(storage, "datetime", FrozenDatetime)
+    assert storage._signing_window() == datetime(
+        2026, 1, 1, 12, 15, tzinfo=timezone.utc
+    )
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+
+from app.models.models import CourseCategory
+from app.utils import trending
+from app.utils.cache import get_redis
+
+DAY = trending.TRENDING_HALF_LIFE.total_seconds()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def clock(monkeypatch):
+    redis = get_redis()
+    keys = [trending.trending_key(c) for c in (None, *CourseCategory)]
+    await redis.delete(
+        trending.TRENDING_EPOCH_KEY, trending.TRENDING_DETAILS_KEY, *keys
+    )
+    now = {"value": 1_000_000.0}
+    monkeypatch.setattr(trending, "_now", lambda: now["value"])
+    yield now
+    await redis.delete(
+        trending.TRENDING_EPOCH_KEY, trending.TRENDING_DETAILS_KEY, *keys
+    )
+
+
+def _archive(archive_id, category=CourseCategory.JUNIOR):
+    return SimpleNamespace(
+        id=archive_id,
+        name=f"Archive {archive_id}",
+        course_id=archive_id * 10,
+        course_name=f"Course {archive_id}",
+        course_category=category,
+    )
+
+
+def _scores(feed):
+    return {archive.id: archive.score for archive in feed}
+
+
+@pytest.mark.asyncio
+async def test_trending_ranks_recent_hits_above_older_ones(clock):
+    await trending.record_archive_hits([_archive(1), _archive(2)])
+    await trending.record_archive_hits([_archive(1)], weight=trending.PREVIEW_WEIGHT)
+    clock["value"] += DAY
+    await trending.record_archive_hits(
+        [_archive(3, CourseCategory.SENIOR)], weight=trending.PREVIEW_WEIGHT
+    )
+
+    feed = await trending.get_trending_archives()
+    # Hits a half-life old count half.
+    assert _scores(feed) == {1: 0.75, 3: 0.5, 2: 0.5}
+    assert feed[0].id == 1
+    assert feed[0].course_name == "Course 1"
+
+    senior = await trending.get_trending_archives(CourseCategory.SENIOR)
+    assert [archive.id for archive in senior] == [3]
+    assert len(await trending.get_trending_archives(limit=1)) == 1
+
+
+@pytest.mark.asyncio
+async def test_renormalize_keeps_decayed_scores_and_prunes(clock):
+    await trending.record_archive_hits([_archive(1)])
+    clock["value"] += 11 * DAY
+    await trending.record_archive_hits([_archive(2)])
+    before = _scores(await trending.get_trending_archives())
+
+    await trending.renormalize_trending()
+
+    # Archive 1 is below TRENDING_MIN_SCORE after eleven half-lives.
+    assert _scores(await trending.get_trending_archives()) == {2: before[2]}
+    assert float(await get_redis().get(trending.TRENDING_EPOCH_KEY)) == clock["value"]
+    assert await get_redis().hkeys(trending.TRENDING_DETAILS_KEY) == [b"2"]
+
+
+@pytest.mark.asyncio
+async def test_forget_trending_archives_removes_every_feed_entry():
+    await trending.record_archive_hits([_archive(1), _archive(2)])
+    await trending.forget_trending_archives(1)
+
+    assert [a.id for a in await trending.get_trending_archives()] == [2]
+    assert [
+        a.id for a in await trending.get_trending_archives(CourseCategory.JUNIOR)
+    ] == [2]
+
+
+@pytest.mark.asyncio
+async def test_refresh_trending_archives_rewrites_details_and_category():
+    await trending.record_archive_hits([_archive(1), _archive(2)])
+    moved = _archive(1, CourseCategory.SENIOR)
+    moved.name = "Renamed"
+    renamed = _archive(2)
+    renamed.name = "Also renamed"
+
+    await trending.refresh_trending_archives([moved, renamed, _archive(3)])
+
+    feed = await trending.get_trending_archives()
+    assert {archive.id: archive.name for archive in feed} == {
+        1: "Renamed",
+        2: "Also renamed",
+    }
+    assert _scores(feed)[1] == _scores(feed)[2]
+    senior = await trending.get_trending_archives(CourseCategory.SENIOR)
+    assert [(archive.id, archive.course_category) for archive in senior] == [
+        (1, CourseCategory.SENIOR)
+    ]
+    junior = await trending.get_trending_archives(CourseCategory.JUNIOR)
+    assert [archive.id for archive in junior] == [2]
+    # Archives that are not trending stay out of the feeds.
+    assert await get_redis().hget(trending.TRENDING_DETAILS_KEY, "3") is None